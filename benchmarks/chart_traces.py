@@ -0,0 +1,105 @@
+"""Trace construction cost of the comparison chart at 100+ traces.
+
+Compares slicing every trace out of one date x (entity, category) pivot with the
+per-entity / per-category boolean masks and groupbys the chart used before, times the
+whole ``create_comparison_chart`` call, and the per-rerun cost of handing the chart to
+``st.plotly_chart`` when it is rebuilt vs. served from the figure cache.
+
+    python benchmarks/chart_traces.py [--entities 30] [--days 1095] [--repeat 3]
+"""
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import plotly
+import plotly.io as pio
+
+from src.visualizations.charts import VehicleDataVisualizer
+from src.visualizations.figure_cache import FigureCache
+
+CATEGORIES = ["2W", "3W", "4W", "EV"]
+STATES = ["Maharashtra", "Karnataka", "Tamil Nadu", "Gujarat", "Uttar Pradesh"]
+
+
+def _frame(entities: List[str], days: int) -> pd.DataFrame:
+    index = pd.MultiIndex.from_product(
+        [pd.date_range('2021-01-01', periods=days, freq='D'), STATES, entities, CATEGORIES],
+        names=['date', 'state', 'manufacturer', 'vehicle_category']
+    )
+    df = index.to_frame(index=False)
+    df['registrations'] = np.random.default_rng(0).poisson(40, len(df))
+    return df
+
+
+def _masked_series(df: pd.DataFrame, entities: List[str]) -> List[np.ndarray]:
+    """Per-trace extraction the way the chart did it before the single pivot."""
+    filtered_df = df[df['manufacturer'].isin(entities)]
+    out = []
+    for entity in entities:
+        entity_data = filtered_df[filtered_df['manufacturer'] == entity]
+        daily_data = entity_data.groupby(['date', 'vehicle_category'])['registrations'].sum().reset_index()
+        for category in daily_data['vehicle_category'].unique():
+            out.append(daily_data[daily_data['vehicle_category'] == category]['registrations'].to_numpy())
+    return out
+
+
+def _pivot_series(df: pd.DataFrame, entities: List[str]) -> List[np.ndarray]:
+    pivot = VehicleDataVisualizer.daily_pivot(df[df['manufacturer'].isin(entities)], ['manufacturer', 'vehicle_category'])
+    values = pivot.to_numpy(dtype=float)
+    return [values[:, i] for i in range(values.shape[1])]
+
+
+def _render(figure_or_spec) -> str:
+    """What ``st.plotly_chart`` does with its argument before sending it to the browser."""
+    figure = plotly.tools.return_figure_from_figure_or_data(figure_or_spec, validate_figure=True)
+    return pio.to_json(figure, validate=False)
+
+
+def _median_ms(func: Callable[[], object], repeat: int) -> float:
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - started)
+    return statistics.median(seconds) * 1000
+
+
+def measure(n_entities: int, days: int, repeat: int) -> Dict[str, float]:
+    entities = [f"Maker {i:02d}" for i in range(n_entities)]
+    df = _frame(entities, days)
+    viz = VehicleDataVisualizer()
+    cached = VehicleDataVisualizer(cache=FigureCache())
+    cached.figure('comparison_chart', df, entities)
+    assert len(_masked_series(df, entities)) == len(_pivot_series(df, entities))
+    return {
+        "rows": len(df),
+        "traces": len(viz.create_comparison_chart(df, entities).data),
+        "masked_extract_ms": _median_ms(lambda: _masked_series(df, entities), repeat),
+        "pivot_extract_ms": _median_ms(lambda: _pivot_series(df, entities), repeat),
+        "comparison_chart_ms": _median_ms(lambda: viz.create_comparison_chart(df, entities), repeat),
+        "rerun_rebuilt_ms": _median_ms(lambda: _render(viz.create_comparison_chart(df, entities)), repeat),
+        "rerun_cached_ms": _median_ms(lambda: _render(cached.figure('comparison_chart', df, entities)), repeat),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entities", type=int, default=30)
+    parser.add_argument("--days", type=int, default=1095)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for name, value in measure(args.entities, args.days, args.repeat).items():
+        print(f"{name:22s} {value:12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
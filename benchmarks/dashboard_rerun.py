@@ -0,0 +1,112 @@
+"""Rerun latency of dashboard interactions: full-script reruns vs. fragment reruns.
+
+Drives ``src/dashboard/main.py`` headlessly with Streamlit's AppTest. AppTest always
+reruns the whole script, which is what every interaction cost before the panels became
+fragments; the fragment numbers come from reruns scoped to the panel's fragment id, the
+way the browser requests them when a widget inside a fragment changes.
+
+    python benchmarks/dashboard_rerun.py [--days 365] [--repeat 5]
+"""
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import streamlit.testing.v1.app_test as app_test_module
+from streamlit.runtime.scriptrunner import RerunData
+from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequests
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+APP = os.path.join(os.path.dirname(__file__), '..', 'src', 'dashboard', 'main.py')
+_FRAGMENT_QUEUE: List[str] = []
+
+
+class _FragmentRunner(LocalScriptRunner):
+    """LocalScriptRunner that, while ``_FRAGMENT_QUEUE`` is set, reruns only those fragments."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if _FRAGMENT_QUEUE:
+            # drop the implicit full-run request so it does not absorb the fragment rerun
+            self._requests = ScriptRequests()
+
+    def request_rerun(self, rerun_data: RerunData) -> bool:
+        if _FRAGMENT_QUEUE:
+            rerun_data = RerunData(widget_states=rerun_data.widget_states, query_string=rerun_data.query_string,
+                                   page_script_hash=rerun_data.page_script_hash,
+                                   fragment_id_queue=list(_FRAGMENT_QUEUE))
+        return super().request_rerun(rerun_data)
+
+
+def _timed_runs(at: AppTest, interact: Callable[[AppTest, int], None], repeat: int) -> List[float]:
+    seconds = []
+    for i in range(repeat):
+        interact(at, i)
+        started = time.perf_counter()
+        at.run()
+        seconds.append(time.perf_counter() - started)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+    return seconds
+
+
+def _select(label: str, options: List[str]) -> Callable[[AppTest, int], None]:
+    def interact(at: AppTest, i: int) -> None:
+        widget = next(w for w in list(at.selectbox) + list(at.radio) if w.label == label)
+        widget.set_value(options[i % len(options)])
+    return interact
+
+
+def _open_view(days: int, view: str, granularity: str) -> AppTest:
+    at = AppTest.from_file(APP, default_timeout=600)
+    at.run()
+    at.sidebar.date_input[0].set_value((date.today() - timedelta(days=days), date.today()))
+    at.sidebar.selectbox[0].select(view)
+    next(r for r in at.sidebar.radio if r.label == "Aggregate by:").set_value(granularity)
+    at.run()
+    return at
+
+
+def measure(days: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    app_test_module.LocalScriptRunner = _FragmentRunner
+    cases = {
+        "growth metric": ("Growth Trends", "Select Growth Metric:", ["qoq_growth", "yoy_growth"],
+                          ("Daily", "Monthly")),
+        "correlation entity": ("Manufacturer Analysis", "Correlate", ["state", "manufacturer"], ("Daily",)),
+    }
+    results = {}
+    for name, (view, label, options, granularities) in cases.items():
+        for granularity in granularities:
+            at = _open_view(days, view, granularity)
+            full = _timed_runs(at, _select(label, options), repeat)
+            _FRAGMENT_QUEUE[:] = list(at._fragment_storage._fragments)
+            try:
+                fragment = _timed_runs(at, _select(label, options), repeat)
+            finally:
+                _FRAGMENT_QUEUE.clear()
+            results[f"{name} ({granularity})"] = {
+                "full_rerun_ms": statistics.median(full) * 1000,
+                "fragment_rerun_ms": statistics.median(fragment) * 1000,
+            }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365, help="length of the selected date range")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(f"{'interaction':34s} {'full rerun':>12s} {'fragment':>12s}")
+    for name, row in measure(args.days, args.repeat).items():
+        print(f"{name:34s} {row['full_rerun_ms']:10.0f}ms {row['fragment_rerun_ms']:10.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Time to build the Overview page's charts: one after another vs. as a chart batch.
+
+The sequential case is what ``render_overview`` did before the batch API: trends, market
+share and heatmap each aggregate the full frame. The batch shares one rollup and one
+latest-date slice and builds the figures on a thread pool (``--workers``).
+
+    python benchmarks/overview_charts.py [--days 730] [--manufacturers 20] [--workers 4]
+"""
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import STATE_RTO_CONFIG, VEHICLE_CATEGORIES
+from src.visualizations.chart_batch import ChartSpec
+from src.visualizations.charts import VehicleDataVisualizer
+
+SPECS = {
+    'trends': ChartSpec('registration_trends_chart', ("Daily Registration Trends",)),
+    'market_share': ChartSpec('market_share_pie_chart'),
+    'heatmap': ChartSpec('heatmap'),
+}
+
+
+def _frame(days: int, n_manufacturers: int) -> pd.DataFrame:
+    index = pd.MultiIndex.from_product(
+        [pd.date_range('2022-01-01', periods=days, freq='D'), list(STATE_RTO_CONFIG)[:10],
+         [f"Maker {i:02d}" for i in range(n_manufacturers)], list(VEHICLE_CATEGORIES)],
+        names=['date', 'state', 'manufacturer', 'vehicle_category']
+    )
+    df = index.to_frame(index=False)
+    rng = np.random.default_rng(0)
+    df['registrations'] = rng.poisson(40, len(df))
+    df['market_share'] = rng.uniform(5, 25, len(df))
+    return df
+
+
+def _median_ms(func: Callable[[], object], repeat: int) -> float:
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - started)
+    return statistics.median(seconds) * 1000
+
+
+def measure(days: int, n_manufacturers: int, workers: int, repeat: int) -> Dict[str, float]:
+    df = _frame(days, n_manufacturers)
+    viz = VehicleDataVisualizer()
+
+    def sequential():
+        viz.create_registration_trends_chart(df[['date', 'vehicle_category', 'registrations']],
+                                             "Daily Registration Trends")
+        viz.create_market_share_pie_chart(df)
+        viz.create_heatmap(df)
+
+    results = {
+        "rows": len(df),
+        "sequential_ms": _median_ms(sequential, repeat),
+        "batch_serial_ms": _median_ms(lambda: viz.build_charts(df, SPECS, max_workers=1), repeat),
+        f"batch_{workers}_threads_ms": _median_ms(lambda: viz.build_charts(df, SPECS, max_workers=workers), repeat),
+    }
+    batch = viz.build_charts(df, SPECS, max_workers=1)  # warm, serial: per-chart split without thread overlap
+    results["batch_shared_ms"] = batch.shared_seconds * 1000
+    results.update({f"chart_{name}_ms": seconds * 1000 for name, seconds in batch.timings.items()})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--manufacturers", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for name, value in measure(args.days, args.manufacturers, args.workers, args.repeat).items():
+        print(f"{name:24s} {value:12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Cost of the trailing rolling statistics behind ``detect_anomalies`` as the window grows.
+
+Times the robust (median/MAD) and z-score modes over the same grouped frame at several
+window lengths, next to pandas' grouped rolling median. Every mode should stay roughly
+flat across windows; a per-row scan of the window would grow linearly with it.
+
+    python benchmarks/rolling_windows.py [--rows 200000] [--groups 200] [--repeat 3]
+"""
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.analytics.advanced_analytics import detect_anomalies
+
+WINDOWS = [7, 30, 90, 365]
+
+
+def _frame(rows: int, groups: int) -> pd.DataFrame:
+    per_group = rows // groups
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'date': np.tile(pd.date_range('2015-01-01', periods=per_group), groups),
+        'manufacturer': np.repeat([f"Maker {i:03d}" for i in range(groups)], per_group),
+        'registrations': rng.poisson(40, per_group * groups).astype(float),
+    })
+
+
+def _median_s(func: Callable[[], object], repeat: int) -> float:
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - started)
+    return statistics.median(seconds)
+
+
+def measure(rows: int, groups: int, repeat: int, windows: List[int]) -> Dict[int, Dict[str, float]]:
+    df = _frame(rows, groups)
+    grouped = df.groupby('manufacturer')['registrations']
+    results = {}
+    for window in windows:
+        results[window] = {
+            "robust_s": _median_s(lambda: detect_anomalies(df, entity_cols=['manufacturer'], rolling_window=window,
+                                                           method='robust'), repeat),
+            "zscore_s": _median_s(lambda: detect_anomalies(df, entity_cols=['manufacturer'], rolling_window=window),
+                                  repeat),
+            "pandas_median_s": _median_s(lambda: grouped.rolling(window, min_periods=window // 2).median(), repeat),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--groups", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--windows", type=int, nargs="+", default=WINDOWS)
+    args = parser.parse_args()
+    results = measure(args.rows, args.groups, args.repeat, args.windows)
+    print(f"{'window':>8s} " + " ".join(f"{name:>16s}" for name in next(iter(results.values()))))
+    for window, row in results.items():
+        print(f"{window:8d} " + " ".join(f"{value:16.3f}" for value in row.values()))
+
+
+if __name__ == "__main__":
+    main()
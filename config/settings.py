@@ -58,6 +58,55 @@ MAJOR_MANUFACTURERS = {
     "4W": ["Maruti Suzuki", "Hyundai", "Tata Motors", "Mahindra", "Kia", "Honda", "Toyota"]
 }
 
+# state -> (registration code prefix, number of RTOs, relative registration volume)
+STATE_RTO_CONFIG = {
+    "Andhra Pradesh": ("AP", 40, 4.0),
+    "Arunachal Pradesh": ("AR", 22, 0.1),
+    "Assam": ("AS", 34, 1.5),
+    "Bihar": ("BR", 57, 3.2),
+    "Chhattisgarh": ("CG", 30, 1.6),
+    "Goa": ("GA", 12, 0.4),
+    "Gujarat": ("GJ", 38, 6.0),
+    "Haryana": ("HR", 99, 3.0),
+    "Himachal Pradesh": ("HP", 95, 0.6),
+    "Jharkhand": ("JH", 24, 1.6),
+    "Karnataka": ("KA", 70, 6.5),
+    "Kerala": ("KL", 86, 3.5),
+    "Madhya Pradesh": ("MP", 71, 4.5),
+    "Maharashtra": ("MH", 50, 9.5),
+    "Manipur": ("MN", 7, 0.1),
+    "Meghalaya": ("ML", 10, 0.1),
+    "Mizoram": ("MZ", 8, 0.1),
+    "Nagaland": ("NL", 10, 0.1),
+    "Odisha": ("OD", 35, 2.2),
+    "Punjab": ("PB", 90, 2.2),
+    "Rajasthan": ("RJ", 59, 5.5),
+    "Sikkim": ("SK", 8, 0.05),
+    "Tamil Nadu": ("TN", 99, 8.0),
+    "Telangana": ("TS", 38, 4.0),
+    "Tripura": ("TR", 8, 0.2),
+    "Uttar Pradesh": ("UP", 94, 12.0),
+    "Uttarakhand": ("UK", 18, 0.9),
+    "West Bengal": ("WB", 76, 3.5),
+    "Andaman and Nicobar Islands": ("AN", 2, 0.03),
+    "Chandigarh": ("CH", 4, 0.3),
+    "Dadra and Nagar Haveli and Daman and Diu": ("DD", 3, 0.1),
+    "Delhi": ("DL", 16, 4.0),
+    "Jammu and Kashmir": ("JK", 22, 0.9),
+    "Ladakh": ("LA", 2, 0.03),
+    "Lakshadweep": ("LD", 1, 0.005),
+    "Puducherry": ("PY", 5, 0.3)
+}
+
+LOAD_TEST_CONFIG = {
+    "output_dir": DATA_DIR / "load_test",
+    "seed": 20240101,
+    "start_year": 2021,
+    "years": 3,
+    "daily_registrations": 60000,
+    "category_mix": {"2W": 0.74, "3W": 0.05, "4W": 0.21}
+}
+
 DASHBOARD_CONFIG = {
     "title": "Vehicle Registration Investor Dashboard",
     "page_icon": "📊",
@@ -68,7 +117,19 @@ DASHBOARD_CONFIG = {
         "background_color": "#ffffff",
         "secondary_background_color": "#f0f2f6",
         "text_color": "#262730"
-    }
+    },
+    "table_page_size": 50,
+    "table_prefetch_pages": 2
+}
+
+CHART_CONFIG = {
+    "max_points_per_trace": 1000,
+    "webgl_threshold": 5000,
+    "marker_threshold": 400,
+    "downsample_method": "lttb",
+    "figure_cache_entries": 128,
+    "figure_cache_bytes": 256 * 1024 * 1024,
+    "figure_disk_tier": False
 }
 
 DATA_CONFIG = {
@@ -83,7 +144,29 @@ ANALYTICS_CONFIG = {
     "growth_metrics": ["YoY", "QoQ", "MoM"],
     "statistical_significance": 0.05,
     "outlier_threshold": 3.0,
-    "smoothing_window": 7
+    "smoothing_window": 7,
+    "max_workers": int(os.getenv("MAX_WORKERS", "4"))
+}
+
+CACHE_CONFIG = {
+    "memo_max_entries": 256,
+    "memo_max_bytes": 512 * 1024 * 1024,
+    "memo_disk_tier": False,
+    "disk_max_bytes": int(os.getenv("CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024))),
+    "disk_eviction_policy": os.getenv("CACHE_EVICTION_POLICY", "lru"),
+    "disk_compression": "zstd",
+    "index_flush_seconds": 5.0
+}
+
+WARMUP_CONFIG = {
+    "enabled": os.getenv("WARMUP_ENABLED", "1") == "1",
+    "usage_file": CACHE_DIR / "warmup_usage.json",
+    "top_combinations": int(os.getenv("WARMUP_TOP_COMBINATIONS", "8")),
+    "budget_seconds": float(os.getenv("WARMUP_BUDGET_SECONDS", "120")),
+    "max_workers": int(os.getenv("WARMUP_MAX_WORKERS", "2")),
+    "min_hits": 2,
+    "max_tracked": 500,
+    "flush_seconds": 30
 }
 
 EXPORT_CONFIG = {
@@ -2,6 +2,7 @@
 Minimal, dependency-light (uses statsmodels if available) so dashboard can call safely.
 """
 from __future__ import annotations
+from bisect import bisect_left, insort
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -15,6 +16,123 @@ except Exception:
 
 # ---------------- Anomaly Detection -----------------
 
+def _group_starts(codes: np.ndarray) -> np.ndarray:
+    """For rows sorted so each group is contiguous: index of the first row of each row's group."""
+    n = len(codes)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    boundary = np.empty(n, dtype=bool)
+    boundary[0] = True
+    boundary[1:] = codes[1:] != codes[:-1]
+    return np.maximum.accumulate(np.where(boundary, np.arange(n), 0))
+
+
+def _grouped_rolling_mean_std(values: np.ndarray, starts: np.ndarray, window: int, min_periods: int):
+    """Trailing rolling mean/std (ddof=1, NaNs skipped) that restarts at group boundaries.
+    Uses prefix sums over the whole sorted array, centred per group for numerical stability.
+    """
+    n = len(values)
+    valid = ~np.isnan(values)
+    gid = np.cumsum(starts == np.arange(n)) - 1
+    counts = np.bincount(gid, weights=valid)
+    sums = np.bincount(gid, weights=np.where(valid, values, 0.0))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centre = np.nan_to_num(sums / counts)[gid]
+        xc = np.where(valid, values - centre, 0.0)
+        c1 = np.concatenate(([0.0], np.cumsum(xc)))
+        c2 = np.concatenate(([0.0], np.cumsum(xc * xc)))
+        cn = np.concatenate(([0], np.cumsum(valid)))
+        hi = np.arange(1, n + 1)
+        lo = np.maximum(hi - window, starts)
+        cnt = cn[hi] - cn[lo]
+        s1 = c1[hi] - c1[lo]
+        s2 = c2[hi] - c2[lo]
+        mean = s1 / cnt
+        var = np.maximum(s2 - s1 * mean, 0.0) / (cnt - 1)
+        enough = cnt >= max(min_periods, 1)
+        mean = np.where(enough, mean + centre, np.nan)
+        std = np.where(enough & (cnt > 1), np.sqrt(var), np.nan)
+    return mean, std
+
+
+def _kth_abs_deviation(window: list, h: int, centre: float, k: int) -> float:
+    """k-th smallest (0-based) ``|x - centre|`` over a sorted window whose first ``h``
+    values lie at or below ``centre`` and the rest at or above it: the deviations are two
+    ascending runs (leftwards from ``h - 1``, rightwards from ``h``), merged by bisection.
+    """
+    n_right = len(window) - h
+    lo, hi = max(0, k + 1 - n_right), min(k + 1, h)
+    while lo < hi:
+        i = (lo + hi) // 2  # take i from the left run and k + 1 - i from the right run
+        if centre - window[h - 1 - i] < window[h + k - i] - centre:
+            lo = i + 1
+        else:
+            hi = i
+    j = k + 1 - lo
+    left = centre - window[h - lo] if lo else -np.inf
+    right = window[h + j - 1] - centre if j else -np.inf
+    return max(left, right)
+
+
+def _grouped_rolling_median_mad(values: np.ndarray, starts: np.ndarray, window: int, min_periods: int):
+    """Trailing rolling median and MAD (NaNs skipped) restarting at group boundaries.
+    Each group keeps its window as a sorted list updated with bisection as rows enter and
+    leave; the median is read off the middle and the MAD is selected from the two sorted
+    halves, so each row costs O(log window) comparisons whatever the window.
+    """
+    n = len(values)
+    med = [np.nan] * n
+    mad = [np.nan] * n
+    window = max(int(window), 1)
+    need = max(min_periods, 1)
+    vals = values.astype(float).tolist()
+    bounds = np.flatnonzero(starts == np.arange(n)).tolist() + [n]
+    for g0, g1 in zip(bounds[:-1], bounds[1:]):
+        sorted_window: list = []
+        for t in range(g0, g1):
+            v = vals[t]
+            if v == v:  # not NaN
+                insort(sorted_window, v)
+            if t - window >= g0:
+                old = vals[t - window]
+                if old == old:
+                    del sorted_window[bisect_left(sorted_window, old)]
+            cnt = len(sorted_window)
+            if cnt < need:
+                continue
+            h = cnt // 2
+            if cnt % 2:
+                centre = sorted_window[h]
+                spread = _kth_abs_deviation(sorted_window, h, centre, h)
+            else:
+                centre = (sorted_window[h - 1] + sorted_window[h]) / 2
+                spread = (_kth_abs_deviation(sorted_window, h, centre, h - 1)
+                          + _kth_abs_deviation(sorted_window, h, centre, h)) / 2
+            med[t] = centre
+            mad[t] = spread
+    return np.array(med, dtype=float), np.array(mad, dtype=float)
+
+
+def _seasonal_component(work: pd.DataFrame, entity_cols: List[str], value_col: str, date_col: str) -> np.ndarray:
+    """Per-row seasonal component. It is fitted on each entity's daily total, so rows finer
+    than ``entity_cols`` get the day's component in proportion to their share of that total.
+    """
+    from src.analytics.decomposition import decompose_frame
+    comp = decompose_frame(work, entity_cols, value_col, date_col).to_frame(entity_cols)
+    rows = work[entity_cols].assign(date=work[date_col].dt.normalize())
+    merged = rows.merge(comp[entity_cols + ["date", "seasonal"]], how="left", on=entity_cols + ["date"])
+    seasonal = merged["seasonal"].fillna(0.0).to_numpy()
+    day = rows.groupby(entity_cols + ["date"], sort=False).ngroup().to_numpy()
+    size = np.bincount(day)[day]
+    if (size == 1).all():
+        return seasonal
+    values = np.nan_to_num(work[value_col].to_numpy(dtype=float))
+    total = np.bincount(day, weights=values)[day]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        share = np.where(total != 0, values / total, 1.0 / size)
+    return seasonal * share
+
+
 def detect_anomalies(
     df: pd.DataFrame,
     value_col: str = "registrations",
@@ -22,25 +140,49 @@ def detect_anomalies(
     date_col: str = "date",
     z_thresh: float = 3.0,
     rolling_window: int = 7,
+    method: str = "zscore",
+    deseasonalize: bool = False,
 ) -> pd.DataFrame:
-    """Flag point anomalies using rolling mean/std z-score.
-    Adds columns: rolling_mean, rolling_std, z_score, is_anomaly.
+    """Flag point anomalies per entity with a trailing rolling window.
+    method='zscore' adds rolling_mean, rolling_std, z_score, is_anomaly.
+    method='robust' adds rolling_median, rolling_mad, z_score (0.6745 * dev / MAD), is_anomaly.
+    deseasonalize=True subtracts the (cached) weekly/yearly seasonal component first and
+    adds it as a 'seasonal' column, so regular weekday peaks are not scored as outliers.
+    All entities are processed in one sorted frame; no per-group frames are built.
     """
+    if method not in ("zscore", "robust"):
+        raise ValueError(f"Unsupported anomaly method: {method}")
     if entity_cols is None:
         entity_cols = []
     work = df.copy()
     work[date_col] = pd.to_datetime(work[date_col])
-    group_cols = entity_cols if entity_cols else [None]
-    results = []
-    for key, g in (work.groupby(entity_cols) if entity_cols else [(None, work)]):
-        g = g.sort_values(date_col)
-        g["rolling_mean"] = g[value_col].rolling(rolling_window, min_periods=rolling_window//2).mean()
-        g["rolling_std"] = g[value_col].rolling(rolling_window, min_periods=rolling_window//2).std()
-        g["z_score"] = (g[value_col] - g["rolling_mean"]) / g["rolling_std"]
-        g["is_anomaly"] = g["z_score"].abs() > z_thresh
-        results.append(g)
-    out = pd.concat(results, ignore_index=True)
-    return out
+    if entity_cols:
+        work = work.dropna(subset=entity_cols)
+        work = work.sort_values(entity_cols + [date_col], kind="mergesort").reset_index(drop=True)
+        codes = work.groupby(entity_cols, sort=False).ngroup().to_numpy()
+    else:
+        work = work.sort_values(date_col, kind="mergesort").reset_index(drop=True)
+        codes = np.zeros(len(work), dtype=np.int64)
+    starts = _group_starts(codes)
+    values = work[value_col].to_numpy(dtype=float)
+    if deseasonalize:
+        work["seasonal"] = _seasonal_component(work, entity_cols, value_col, date_col)
+        values = values - work["seasonal"].to_numpy()
+    min_periods = rolling_window // 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if method == "zscore":
+            centre, spread = _grouped_rolling_mean_std(values, starts, rolling_window, min_periods)
+            work["rolling_mean"] = centre
+            work["rolling_std"] = spread
+            z = (values - centre) / spread
+        else:
+            centre, spread = _grouped_rolling_median_mad(values, starts, rolling_window, min_periods)
+            work["rolling_median"] = centre
+            work["rolling_mad"] = spread
+            z = 0.6745 * (values - centre) / spread
+    work["z_score"] = z
+    work["is_anomaly"] = np.abs(z) > z_thresh
+    return work
 
 # ---------------- Forecasting -----------------
 
@@ -106,8 +248,23 @@ def _naive_forecast(series: pd.Series, category: str, periods: int) -> pd.DataFr
 
 # ---------------- Batch Helper -----------------
 
-def batch_forecast(df: pd.DataFrame, categories: List[str], periods: int = 30) -> Dict[str, pd.DataFrame]:
-    return {c: forecast_category(df, c, periods=periods) for c in categories}
+def batch_forecast(df: pd.DataFrame, categories: List[str], periods: int = 30,
+                   engine: str = "vectorized") -> Dict[str, pd.DataFrame]:
+    """Forecast several categories. engine='vectorized' fits all of them in one batched
+    NumPy Holt-Winters pass; engine='statsmodels' fits one model per category.
+    """
+    if engine == "statsmodels":
+        return {c: forecast_category(df, c, periods=periods) for c in categories}
+    if engine != "vectorized":
+        raise ValueError(f"Unsupported forecast engine: {engine}")
+    from src.analytics.holt_winters import forecast_frame
+    subset = df[df["vehicle_category"].isin(categories)]
+    fc = forecast_frame(subset, ["vehicle_category"], periods=periods)
+    out = {}
+    for c in categories:
+        part = fc[fc["vehicle_category"] == c].reset_index(drop=True)
+        out[c] = part if not part.empty else forecast_category(df, c, periods=periods)
+    return out
 
 __all__ = [
     'detect_anomalies',
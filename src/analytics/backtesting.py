@@ -0,0 +1,168 @@
+"""Rolling-origin backtesting for the forecasting methods.
+
+Series are aggregated into one left-aligned matrix up front and every fold slices it by
+per-series cutoff, so no fold re-aggregates raw rows. (method, fold) tasks run across a
+process pool; each reports MAPE, sMAPE, interval coverage, fit time and peak memory.
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from config.settings import ANALYTICS_CONFIG
+from src.analytics.advanced_analytics import _naive_forecast, forecast_category
+from src.analytics.holt_winters import fit_batch, forecast_batch, series_matrix
+
+METHODS = ("holt_winters", "statsmodels", "naive")
+
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(Y: np.ndarray, first: np.ndarray) -> None:
+    _WORKER["Y"] = Y
+    _WORKER["first"] = first
+
+
+def _per_series(method: str, Y: np.ndarray, first: np.ndarray, cutoffs: np.ndarray, idx: np.ndarray,
+                horizon: int, season_length: int, out: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> None:
+    for i in idx:
+        span = pd.date_range(first[i], periods=int(cutoffs[i]), freq="D")
+        train = pd.Series(Y[i, :cutoffs[i]], index=span)
+        if method == "naive":
+            fc = _naive_forecast(train, None, horizon)
+        else:
+            frame = pd.DataFrame({"date": span, "vehicle_category": "series", "registrations": train.values})
+            fc = forecast_category(frame, "series", periods=horizon, season_length=season_length)
+        for arr, col in zip(out, ("forecast", "lower", "upper")):
+            arr[i] = fc[col].to_numpy(dtype=float)[:horizon]
+
+
+def _forecast(method: str, Y: np.ndarray, first: np.ndarray, cutoffs: np.ndarray, valid: np.ndarray,
+              horizon: int, season_length: int):
+    S = len(Y)
+    out = tuple(np.full((S, horizon), np.nan) for _ in range(3))
+    if method == "holt_winters":
+        long_enough = valid & (cutoffs >= 2 * season_length)
+        idx = np.flatnonzero(long_enough)
+        if len(idx):
+            mean, lower, upper = forecast_batch(fit_batch(Y[idx], cutoffs[idx], season_length), horizon)
+            for arr, part in zip(out, (mean, lower, upper)):
+                arr[idx] = part
+        _per_series("naive", Y, first, cutoffs, np.flatnonzero(valid & ~long_enough), horizon, season_length, out)
+    else:
+        _per_series(method, Y, first, cutoffs, np.flatnonzero(valid), horizon, season_length, out)
+    return out
+
+
+def forecast_errors(actual: np.ndarray, forecast: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> Dict[str, np.ndarray]:
+    """Row-wise MAPE / sMAPE (percent) and interval coverage, ignoring missing actuals."""
+    observed = ~np.isnan(actual)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ape = np.where(observed & (actual != 0), np.abs(actual - forecast) / np.abs(actual), np.nan)
+        denom = np.abs(actual) + np.abs(forecast)
+        sape = np.where(observed & (denom > 0), 2.0 * np.abs(actual - forecast) / denom, np.nan)
+        inside = np.where(observed, (actual >= lower) & (actual <= upper), np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            return {
+                "mape": np.nanmean(ape, axis=1) * 100,
+                "smape": np.nanmean(sape, axis=1) * 100,
+                "coverage": np.nanmean(inside, axis=1),
+            }
+
+
+def _run_task(task: Tuple[str, int, np.ndarray, int, int, bool]) -> Dict[str, Any]:
+    method, fold, cutoffs, horizon, season_length, profile_memory = task
+    Y, first = _WORKER["Y"], _WORKER["first"]
+    valid = cutoffs >= 1
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        started = time.perf_counter()
+        forecast, lower, upper = _forecast(method, Y, first, cutoffs, valid, horizon, season_length)
+        seconds = time.perf_counter() - started
+        peak = np.nan
+        if profile_memory:
+            # tracing slows allocation-heavy methods unevenly, so memory gets its own pass
+            tracemalloc.start()
+            try:
+                _forecast(method, Y, first, cutoffs, valid, horizon, season_length)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    cols = np.clip(cutoffs[:, None] + np.arange(horizon)[None, :], 0, Y.shape[1] - 1)
+    actual = np.take_along_axis(Y, cols, axis=1)
+    actual[~valid] = np.nan
+    return {"method": method, "fold": fold, "valid": valid, "errors": forecast_errors(actual, forecast, lower, upper),
+            "seconds": seconds, "peak_bytes": peak}
+
+
+def backtest(df: pd.DataFrame, key_cols: Optional[List[str]] = None, methods: Sequence[str] = METHODS,
+             horizon: int = 14, n_folds: int = 3, step: Optional[int] = None, season_length: int = 7,
+             max_workers: Optional[int] = None, value_col: str = "registrations",
+             date_col: str = "date", profile_memory: bool = True) -> Dict[str, pd.DataFrame]:
+    """Rolling-origin evaluation of each method over every key's daily series.
+    Fold f trains on each series up to ``len - horizon - (n_folds - 1 - f) * step`` days.
+    Fit time comes from an untraced pass; ``profile_memory`` repeats each fit under
+    tracemalloc for peak memory (NaN when off), doubling the run time.
+    Returns {'folds': per (method, fold, series) metrics, 'summary': per-method accuracy and cost}.
+    """
+    unknown = set(methods) - set(METHODS)
+    if unknown:
+        raise ValueError(f"Unsupported backtest methods: {sorted(unknown)}")
+    key_cols = list(key_cols or [])
+    step = step or horizon
+    max_workers = max_workers if max_workers is not None else ANALYTICS_CONFIG["max_workers"]
+    keys, Y, lengths, first = series_matrix(df, key_cols, value_col, date_col)
+    first = first.to_numpy()
+    tasks = []
+    for fold in range(n_folds):
+        cutoffs = lengths - horizon - (n_folds - 1 - fold) * step
+        tasks += [(method, fold, cutoffs, horizon, season_length, profile_memory) for method in methods]
+    if max_workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks)), initializer=_init_worker,
+                                 initargs=(Y, first)) as pool:
+            results = list(pool.map(_run_task, tasks))
+    else:
+        _init_worker(Y, first)
+        try:
+            results = [_run_task(t) for t in tasks]
+        finally:
+            _WORKER.clear()
+    rows = []
+    for (method, fold, cutoffs, _, _, _), res in zip(tasks, results):
+        valid = res["valid"]
+        n_series = int(valid.sum())
+        part = keys.loc[valid].reset_index(drop=True) if key_cols else pd.DataFrame(index=range(n_series))
+        part.insert(0, "fold", fold)
+        part.insert(0, "method", method)
+        part["cutoff_date"] = pd.to_datetime(first[valid]) + pd.to_timedelta(cutoffs[valid], unit="D")
+        for name, values in res["errors"].items():
+            part[name] = values[valid]
+        part["fit_seconds"] = res["seconds"] / max(n_series, 1)
+        part["peak_memory_mb"] = res["peak_bytes"] / 2 ** 20
+        rows.append(part)
+    folds = pd.concat(rows, ignore_index=True)
+    summary = folds.groupby("method", sort=False).agg(
+        mape=("mape", "mean"),
+        smape=("smape", "mean"),
+        coverage=("coverage", "mean"),
+        series_fits=("fit_seconds", "size"),
+        seconds_per_fit=("fit_seconds", "mean"),
+        peak_memory_mb=("peak_memory_mb", "max"),
+    ).reset_index()
+    summary["fit_seconds_total"] = summary["series_fits"] * summary["seconds_per_fit"]
+    return {"folds": folds, "summary": summary}
+
+
+__all__ = [
+    'backtest',
+    'forecast_errors'
+]
@@ -0,0 +1,216 @@
+"""Cross-entity co-movement: correlation, rolling correlation and lead-lag scans.
+
+Registrations are pivoted once into an aligned (entity x period) matrix; every statistic
+is then matrix math on standardized rows. Full-matrix work is done in row blocks so the
+top-pair search never holds an (entities x entities) array, and lag scans use the FFT.
+Missing periods are handled with pairwise-complete counts.
+"""
+from __future__ import annotations
+import os
+import sys
+import warnings
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+TRANSFORMS = ("level", "growth", "log_diff")
+
+
+def entity_matrix(df: pd.DataFrame, entity_col: str = "manufacturer", value_col: str = "registrations",
+                  date_col: str = "date", freq: str = "W", transform: str = "growth"):
+    """(entities, period starts, X) with X[e, t] the transformed total of entity e in period t.
+    Periods with no rows are NaN; 'growth' is the period-over-period percent change.
+    """
+    if transform not in TRANSFORMS:
+        raise ValueError(f"Unsupported transform: {transform}")
+    work = df[[entity_col, date_col, value_col]].dropna(subset=[entity_col])
+    periods = pd.to_datetime(work[date_col]).dt.to_period(freq)
+    totals = work[value_col].groupby([work[entity_col], periods]).sum()
+    entities = totals.index.get_level_values(0).unique().sort_values()
+    calendar = pd.period_range(totals.index.get_level_values(1).min(), totals.index.get_level_values(1).max(), freq=freq)
+    rows = entities.get_indexer(totals.index.get_level_values(0))
+    cols = calendar.get_indexer(totals.index.get_level_values(1))
+    X = np.full((len(entities), len(calendar)), np.nan)
+    X[rows, cols] = totals.to_numpy(dtype=float)
+    if transform != "level":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if transform == "growth":
+                change = (X[:, 1:] - X[:, :-1]) / X[:, :-1] * 100
+            else:
+                change = np.log(X[:, 1:]) - np.log(X[:, :-1])
+        X = np.where(np.isfinite(change), change, np.nan)
+        calendar = calendar[1:]
+    return entities, calendar.start_time, X
+
+
+def _standardize(X: np.ndarray, dtype=np.float64) -> Tuple[np.ndarray, np.ndarray]:
+    """Row z-scores with NaN set to 0, plus the validity mask as the same dtype."""
+    mask = ~np.isnan(X)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        mean = np.nanmean(X, axis=1, keepdims=True)
+        std = np.nanstd(X, axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        Z = np.where(mask & (std > 0), (X - mean) / std, 0.0)
+    return Z.astype(dtype, copy=False), mask.astype(dtype)
+
+
+def _corr_block(Z: np.ndarray, M: np.ndarray, rows: slice, min_periods: int) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        counts = M[rows] @ M.T
+        block = (Z[rows] @ Z.T) / counts
+    block[counts < min_periods] = np.nan
+    return np.clip(block, -1.0, 1.0)
+
+
+def correlation_matrix(X: np.ndarray, min_periods: int = 8, block_size: int = 1024,
+                       dtype=np.float64) -> np.ndarray:
+    """Pairwise Pearson correlation of the rows of X, computed one row block at a time.
+    Rows are standardized once over their own observed periods; pair sums use only
+    periods both rows observed.
+    """
+    Z, M = _standardize(X, dtype)
+    out = np.empty((len(X), len(X)), dtype=dtype)
+    for lo in range(0, len(X), block_size):
+        rows = slice(lo, min(lo + block_size, len(X)))
+        out[rows] = _corr_block(Z, M, rows, min_periods)
+    return out
+
+
+def top_correlated_pairs(X: np.ndarray, k: int = 20, min_periods: int = 8, block_size: int = 512,
+                         negative: bool = False, dtype=np.float32) -> List[Tuple[int, int, float]]:
+    """The k most (or most negatively) correlated row pairs without materializing the full matrix."""
+    Z, M = _standardize(X, dtype)
+    sign = -1.0 if negative else 1.0
+    best_i = np.empty(0, dtype=np.int64)
+    best_j = np.empty(0, dtype=np.int64)
+    best_v = np.empty(0)
+    for lo in range(0, len(X), block_size):
+        rows = slice(lo, min(lo + block_size, len(X)))
+        block = sign * _corr_block(Z, M, rows, min_periods)
+        upper = np.arange(len(X))[None, :] > np.arange(rows.start, rows.stop)[:, None]
+        block = np.where(upper & ~np.isnan(block), block, -np.inf).ravel()
+        take = min(k, int(np.isfinite(block).sum()))
+        if not take:
+            continue
+        cand = np.argpartition(block, -take)[-take:]
+        best_i = np.concatenate([best_i, cand // len(X) + lo])
+        best_j = np.concatenate([best_j, cand % len(X)])
+        best_v = np.concatenate([best_v, block[cand]])
+        if len(best_v) > k:
+            keep = np.argpartition(best_v, -k)[-k:]
+            best_i, best_j, best_v = best_i[keep], best_j[keep], best_v[keep]
+    order = np.argsort(-best_v, kind="stable")
+    return [(int(best_i[o]), int(best_j[o]), float(sign * best_v[o])) for o in order]
+
+
+def rolling_correlation(reference: np.ndarray, X: np.ndarray, window: int,
+                        min_periods: Optional[int] = None) -> np.ndarray:
+    """Trailing-window Pearson correlation of every row of X with ``reference`` via cumulative sums."""
+    min_periods = min_periods or max(3, window // 2)
+    ref = np.broadcast_to(np.asarray(reference, dtype=float), X.shape)
+    both = ~np.isnan(ref) & ~np.isnan(X)
+    x = np.where(both, ref, 0.0)
+    y = np.where(both, X, 0.0)
+
+    def windowed(a):
+        cs = np.concatenate([np.zeros((len(a), 1)), np.cumsum(a, axis=1)], axis=1)
+        lo = np.maximum(np.arange(1, a.shape[1] + 1) - window, 0)
+        return cs[:, 1:] - cs[:, lo]
+
+    n = windowed(both.astype(float))
+    sx, sy = windowed(x), windowed(y)
+    sxy, sxx, syy = windowed(x * y), windowed(x * x), windowed(y * y)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var = (sxx - sx * sx / n) * (syy - sy * sy / n)
+        corr = cov / np.sqrt(var)
+    corr[(n < min_periods) | ~(var > 1e-12)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def lead_lag(reference: np.ndarray, X: np.ndarray, max_lag: int, min_overlap: int = 8,
+             block_size: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+    """Cross-correlation of every row of X against ``reference`` for lags -max_lag..max_lag.
+
+    Returns (lags, corr) with corr of shape (rows, 2 * max_lag + 1). A peak at lag k > 0
+    means the row follows the reference by k periods (row[t + k] tracks reference[t]).
+    """
+    Z, M = _standardize(X)
+    zr, mr = _standardize(np.asarray(reference, dtype=float)[None, :])
+    T = X.shape[1]
+    n_fft = 1 << int(np.ceil(np.log2(2 * T)))
+    fr_z = np.conj(np.fft.rfft(zr, n_fft))
+    fr_m = np.conj(np.fft.rfft(mr, n_fft))
+    lags = np.arange(-max_lag, max_lag + 1)
+    out = np.empty((len(X), len(lags)))
+    for lo in range(0, len(X), block_size):
+        rows = slice(lo, min(lo + block_size, len(X)))
+        cc = np.fft.irfft(fr_z * np.fft.rfft(Z[rows], n_fft), n_fft)[:, lags % n_fft]
+        counts = np.rint(np.fft.irfft(fr_m * np.fft.rfft(M[rows], n_fft), n_fft)[:, lags % n_fft])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[rows] = np.where(counts >= min_overlap, cc / counts, np.nan)
+    return lags, np.clip(out, -1.0, 1.0)
+
+
+class CorrelationEngine:
+
+    def __init__(self, df: pd.DataFrame, entity_col: str = "manufacturer", value_col: str = "registrations",
+                 date_col: str = "date", freq: str = "W", transform: str = "growth", min_periods: int = 8):
+        self.entity_col = entity_col
+        self.min_periods = min_periods
+        self.entities, self.periods, self.X = entity_matrix(df, entity_col, value_col, date_col, freq, transform)
+
+    def _rows(self, entities: Optional[Sequence[str]]) -> np.ndarray:
+        if entities is None:
+            return np.arange(len(self.entities))
+        idx = self.entities.get_indexer(list(entities))
+        return idx[idx >= 0]
+
+    def _row(self, entity: Union[str, int]) -> np.ndarray:
+        idx = self.entities.get_loc(entity) if isinstance(entity, str) else int(entity)
+        return self.X[idx]
+
+    def matrix(self, entities: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        rows = self._rows(entities)
+        labels = self.entities[rows]
+        return pd.DataFrame(correlation_matrix(self.X[rows], self.min_periods), index=labels, columns=labels)
+
+    def top_pairs(self, k: int = 20, negative: bool = False) -> pd.DataFrame:
+        pairs = top_correlated_pairs(self.X, k, self.min_periods, negative=negative)
+        return pd.DataFrame([(self.entities[i], self.entities[j], c) for i, j, c in pairs],
+                            columns=[f"{self.entity_col}_a", f"{self.entity_col}_b", "correlation"])
+
+    def rolling(self, reference: Union[str, int], window: int = 12,
+                entities: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        rows = self._rows(entities)
+        corr = rolling_correlation(self._row(reference), self.X[rows], window)
+        return pd.DataFrame(corr.T, index=self.periods, columns=self.entities[rows])
+
+    def lead_lag(self, reference: Union[str, int], max_lag: int = 8,
+                 entities: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Best lag per entity against ``reference`` (positive = entity follows)."""
+        rows = self._rows(entities)
+        lags, corr = lead_lag(self._row(reference), self.X[rows], max_lag, self.min_periods)
+        filled = np.where(np.isnan(corr), -np.inf, np.abs(corr))
+        best = filled.argmax(axis=1)
+        peak = corr[np.arange(len(rows)), best]
+        return pd.DataFrame({
+            self.entity_col: self.entities[rows],
+            "best_lag": np.where(np.isnan(peak), np.nan, lags[best]),
+            "correlation": peak,
+            "same_period_correlation": corr[:, max_lag],
+        })
+
+
+__all__ = [
+    'entity_matrix',
+    'correlation_matrix',
+    'top_correlated_pairs',
+    'rolling_correlation',
+    'lead_lag',
+    'CorrelationEngine'
+]
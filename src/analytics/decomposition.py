@@ -0,0 +1,184 @@
+"""Batched additive seasonal decomposition (trend + weekly + yearly + residual).
+
+Works on the left-aligned (series x day) matrix from ``series_matrix``: the trend is a
+centred moving average computed with cumulative sums, seasonal profiles are phase means
+(day of week, day of year) gathered with one ``bincount`` per chunk. Row chunks run on a
+thread pool and results are memoized so anomaly detection and forecasting share them.
+"""
+from __future__ import annotations
+import os
+import sys
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from config.settings import ANALYTICS_CONFIG
+from src.analytics.holt_winters import series_matrix
+from src.utils.memo import MemoCache, frame_fingerprint, shared_memo_cache
+
+WEEK = 7
+YEAR = 365
+_DOY_PHASES = 366
+_YEARLY_SMOOTHING = 15
+
+
+@dataclass
+class Decomposition:
+    """Components share the (series x day) layout of ``series_matrix``; NaN past each length.
+    ``weekly_profile[:, d]`` is the effect of weekday d (Monday = 0); ``yearly_profile`` is
+    indexed by day of year - 1 and is zero for series shorter than two years.
+    """
+    keys: pd.DataFrame
+    first: pd.DatetimeIndex
+    lengths: np.ndarray
+    trend: np.ndarray
+    weekly: np.ndarray
+    yearly: np.ndarray
+    resid: np.ndarray
+    weekly_profile: np.ndarray
+    yearly_profile: np.ndarray
+
+    @property
+    def seasonal(self) -> np.ndarray:
+        return self.weekly + self.yearly
+
+    def initial_season(self, idx: Optional[np.ndarray] = None) -> np.ndarray:
+        """Weekly profile phase-aligned to each series' first day, as ``fit_batch`` expects."""
+        idx = np.arange(len(self.lengths)) if idx is None else np.asarray(idx)
+        dow0 = self.first[idx].dayofweek.to_numpy()
+        phase = (dow0[:, None] + np.arange(WEEK)[None, :]) % WEEK
+        return np.take_along_axis(self.weekly_profile[idx], phase, axis=1)
+
+    def to_frame(self, key_cols: Optional[List[str]] = None) -> pd.DataFrame:
+        """Long frame: <key_cols>, date, trend, weekly, yearly, seasonal, resid."""
+        key_cols = list(key_cols or [])
+        T = self.trend.shape[1]
+        inside = np.arange(T)[None, :] < self.lengths[:, None]
+        rows, cols = np.nonzero(inside)
+        out = pd.DataFrame({
+            "date": self.first.to_numpy()[rows] + cols.astype("timedelta64[D]"),
+            "trend": self.trend[rows, cols],
+            "weekly": self.weekly[rows, cols],
+            "yearly": self.yearly[rows, cols],
+            "resid": self.resid[rows, cols],
+        })
+        out["seasonal"] = out["weekly"] + out["yearly"]
+        for col in reversed(key_cols):
+            out.insert(0, col, self.keys[col].to_numpy()[rows])
+        return out
+
+
+def _centred_mean(X: np.ndarray, window: int) -> np.ndarray:
+    """NaN-aware centred moving average; windows shrink at the edges instead of going NaN."""
+    T = X.shape[1]
+    valid = ~np.isnan(X)
+    sums = np.zeros((len(X), T + 1))
+    counts = np.zeros((len(X), T + 1))
+    np.cumsum(np.where(valid, X, 0.0), axis=1, out=sums[:, 1:])
+    np.cumsum(valid, axis=1, out=counts[:, 1:])
+    t = np.arange(T)
+    lo = np.clip(t - window // 2, 0, T)
+    hi = np.clip(t + window - window // 2, 0, T)
+    n = counts[:, hi] - counts[:, lo]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n > 0, (sums[:, hi] - sums[:, lo]) / n, np.nan)
+
+
+def _phase_profile(X: np.ndarray, phase: np.ndarray, n_phases: int) -> np.ndarray:
+    """Per-row mean of X by phase, centred to sum to zero; unseen phases get 0."""
+    S = len(X)
+    valid = ~np.isnan(X)
+    flat = (np.arange(S)[:, None] * n_phases + phase)[valid]
+    sums = np.bincount(flat, X[valid], minlength=S * n_phases).reshape(S, n_phases)
+    counts = np.bincount(flat, minlength=S * n_phases).reshape(S, n_phases)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        profile = np.where(counts > 0, sums / counts, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        profile = profile - np.nanmean(profile, axis=1, keepdims=True)
+    return np.nan_to_num(profile)
+
+
+def _circular_smooth(profile: np.ndarray, window: int) -> np.ndarray:
+    half = window // 2
+    padded = np.concatenate([profile[:, -half:], profile, profile[:, :half]], axis=1)
+    cs = np.concatenate([np.zeros((len(profile), 1)), np.cumsum(padded, axis=1)], axis=1)
+    return (cs[:, window:] - cs[:, :-window]) / window
+
+
+def _decompose_chunk(Y: np.ndarray, lengths: np.ndarray, first: np.ndarray, yearly: bool):
+    S, T = Y.shape
+    t = np.arange(T)
+    inside = t[None, :] < lengths[:, None]
+    days = first.astype("datetime64[D]")[:, None] + t[None, :]
+    dow = ((days.astype(np.int64) + 3) % WEEK).astype(np.int64)  # 1970-01-01 was a Thursday
+    trend = _centred_mean(Y, WEEK)
+    yearly_rows = (lengths >= 2 * YEAR) if yearly else np.zeros(S, dtype=bool)
+    yearly_part = np.zeros((S, T))
+    yearly_profile = np.zeros((S, _DOY_PHASES))
+    if yearly_rows.any():
+        rows = np.flatnonzero(yearly_rows)
+        long_trend = _centred_mean(Y[rows], YEAR)
+        trend[rows] = long_trend
+        weekly_first = _phase_profile(Y[rows] - long_trend, dow[rows], WEEK)
+        doy = (days[rows] - days[rows].astype("datetime64[Y]").astype("datetime64[D]")).astype(np.int64)
+        detrended = Y[rows] - long_trend - np.take_along_axis(weekly_first, dow[rows], axis=1)
+        profile = _circular_smooth(_phase_profile(detrended, doy, _DOY_PHASES), _YEARLY_SMOOTHING)
+        yearly_profile[rows] = profile
+        yearly_part[rows] = np.take_along_axis(profile, doy, axis=1)
+    weekly_profile = _phase_profile(Y - trend - yearly_part, dow, WEEK)
+    weekly = np.take_along_axis(weekly_profile, dow, axis=1)
+    trend = np.where(inside, trend, np.nan)
+    weekly = np.where(inside, weekly, np.nan)
+    yearly_part = np.where(inside, yearly_part, np.nan)
+    return trend, weekly, yearly_part, Y - trend - weekly - yearly_part, weekly_profile, yearly_profile
+
+
+def decompose_matrix(Y: np.ndarray, lengths: np.ndarray, first: pd.DatetimeIndex, yearly: bool = True,
+                     max_workers: Optional[int] = None, chunk_size: int = 512):
+    """Decompose every row of a left-aligned matrix; returns the component arrays in
+    ``Decomposition`` field order (trend, weekly, yearly, resid, weekly_profile, yearly_profile).
+    """
+    max_workers = max_workers if max_workers is not None else ANALYTICS_CONFIG["max_workers"]
+    first = first.to_numpy()
+    bounds = [(lo, min(lo + chunk_size, len(Y))) for lo in range(0, len(Y), chunk_size)]
+    if max_workers > 1 and len(bounds) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(bounds))) as pool:
+            parts = list(pool.map(lambda b: _decompose_chunk(Y[b[0]:b[1]], lengths[b[0]:b[1]],
+                                                             first[b[0]:b[1]], yearly), bounds))
+    else:
+        parts = [_decompose_chunk(Y[lo:hi], lengths[lo:hi], first[lo:hi], yearly) for lo, hi in bounds]
+    return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+
+def decompose_frame(df: pd.DataFrame, key_cols: Optional[List[str]] = None, value_col: str = "registrations",
+                    date_col: str = "date", yearly: bool = True, cache: Optional[MemoCache] = None,
+                    max_workers: Optional[int] = None) -> Decomposition:
+    """Decompose every key's daily series; memoized per (fingerprint of the key, date and
+    value columns, parameters)."""
+    key_cols = list(key_cols or [])
+    cache = cache if cache is not None else shared_memo_cache()
+    cache.observe_version(df.attrs.get('data_version'))
+    key = cache.make_key('decompose_frame', frame_fingerprint(df, key_cols + [date_col, value_col]),
+                         key_cols, value_col, date_col, yearly)
+    cached = cache.get(key)
+    if cached is not None:
+        return Decomposition(**cached)
+    keys, Y, lengths, first = series_matrix(df, key_cols, value_col, date_col)
+    trend, weekly, yearly_part, resid, weekly_profile, yearly_profile = decompose_matrix(
+        Y, lengths, first, yearly, max_workers)
+    result = Decomposition(keys, first, lengths, trend, weekly, yearly_part, resid, weekly_profile, yearly_profile)
+    cache.put(key, dict(vars(result)))
+    return result
+
+
+__all__ = [
+    'Decomposition',
+    'decompose_matrix',
+    'decompose_frame'
+]
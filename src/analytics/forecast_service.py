@@ -0,0 +1,202 @@
+"""Forecast service on top of the batched Holt-Winters engine.
+
+Fits run in chunks across a process pool, fitted parameters and smoothing states are
+persisted per (series key, data version), and newly arrived days are absorbed by running
+the stored state forward instead of refitting. Repeated requests for the same data
+version and horizon are served from an in-memory result cache.
+"""
+from __future__ import annotations
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from config.settings import ANALYTICS_CONFIG, CACHE_DIR
+from src.analytics.holt_winters import (
+    HoltWintersFit, fit_batch, fit_to_frame, naive_frames, series_matrix, update_fit
+)
+from src.utils.memo import MemoCache, frame_fingerprint
+
+DEFAULT_MODEL_STORE = CACHE_DIR / "forecast_models.parquet"
+_MODEL_COLUMNS = ['series_key', 'data_version', 'season_length', 'last_date', 'alpha', 'beta',
+                  'gamma', 'level', 'trend', 'season', 'sse', 'n_obs']
+
+
+def _fit_chunk(args) -> HoltWintersFit:
+    Y, lengths, season_length, grid = args
+    return fit_batch(Y, lengths, season_length, grid)
+
+
+def _concat_fits(fits: Sequence[HoltWintersFit]) -> HoltWintersFit:
+    return HoltWintersFit(*(np.concatenate([getattr(f, name) for f in fits])
+                            for name in HoltWintersFit.__dataclass_fields__))
+
+
+class ForecastManager:
+
+    def __init__(self, store_path: Optional[Path] = None, season_length: int = 7,
+                 max_workers: Optional[int] = None, chunk_size: int = 1024,
+                 max_incremental_days: int = 31, keep_versions: int = 2,
+                 grid: Optional[Dict[str, Sequence[float]]] = None, cache: Optional[MemoCache] = None):
+        self.store_path = Path(store_path or DEFAULT_MODEL_STORE)
+        self.season_length = season_length
+        self.max_workers = max_workers if max_workers is not None else ANALYTICS_CONFIG["max_workers"]
+        self.chunk_size = chunk_size
+        self.max_incremental_days = max_incremental_days
+        self.keep_versions = keep_versions
+        self.grid = grid
+        self.cache = cache if cache is not None else MemoCache(max_entries=64)
+        self.counters = {'reused': 0, 'incremental': 0, 'full': 0, 'naive': 0, 'horizon_hits': 0}
+        self._models: Optional[pd.DataFrame] = None
+
+    # ---------------- model store -----------------
+
+    def _load_models(self) -> pd.DataFrame:
+        if self._models is None:
+            try:
+                self._models = pd.read_parquet(self.store_path)
+            except Exception:
+                self._models = pd.DataFrame(columns=_MODEL_COLUMNS)
+        return self._models
+
+    def _save_models(self, fresh: pd.DataFrame) -> None:
+        models = pd.concat([df for df in (self._load_models(), fresh) if len(df)], ignore_index=True)
+        models = models.drop_duplicates(['series_key', 'data_version'], keep='last')
+        models = models.sort_values('last_date', kind='mergesort').groupby('series_key').tail(self.keep_versions)
+        self._models = models.reset_index(drop=True)
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.store_path.with_name(self.store_path.name + ".tmp")
+        try:
+            self._models.to_parquet(tmp, index=False)
+            os.replace(tmp, self.store_path)
+        except Exception:
+            tmp.unlink(missing_ok=True)
+
+    @staticmethod
+    def _fit_from_rows(rows: pd.DataFrame) -> HoltWintersFit:
+        return HoltWintersFit(
+            rows['alpha'].to_numpy(float), rows['beta'].to_numpy(float), rows['gamma'].to_numpy(float),
+            rows['level'].to_numpy(float), rows['trend'].to_numpy(float),
+            np.stack([np.asarray(s, dtype=float) for s in rows['season']]),
+            rows['sse'].to_numpy(float), rows['n_obs'].to_numpy(float),
+        )
+
+    @staticmethod
+    def _rows_from_fit(fit: HoltWintersFit, series_keys: Sequence[str], data_version: str,
+                       season_length: int, last: pd.DatetimeIndex) -> pd.DataFrame:
+        return pd.DataFrame({
+            'series_key': list(series_keys), 'data_version': data_version, 'season_length': season_length,
+            'last_date': last, 'alpha': fit.alpha, 'beta': fit.beta, 'gamma': fit.gamma,
+            'level': fit.level, 'trend': fit.trend, 'season': list(fit.season),
+            'sse': fit.sse, 'n_obs': fit.n_obs,
+        })
+
+    # ---------------- fitting -----------------
+
+    def _fit_full(self, Y: np.ndarray, lengths: np.ndarray) -> HoltWintersFit:
+        tasks = [(Y[lo:lo + self.chunk_size], lengths[lo:lo + self.chunk_size], self.season_length, self.grid)
+                 for lo in range(0, len(Y), self.chunk_size)]
+        if self.max_workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as pool:
+                fits = list(pool.map(_fit_chunk, tasks))
+        else:
+            fits = [_fit_chunk(t) for t in tasks]
+        return _concat_fits(fits)
+
+    def forecast(self, df: pd.DataFrame, key_cols: Optional[List[str]] = None, periods: int = 30,
+                 data_version: Optional[str] = None, value_col: str = "registrations",
+                 date_col: str = "date") -> pd.DataFrame:
+        """Forecast every key's daily series, reusing or warm-starting persisted fits.
+        Returns columns: date, <key_cols>, forecast, lower, upper.
+        """
+        key_cols = list(key_cols or [])
+        columns = ["date"] + key_cols + ["forecast", "lower", "upper"]
+        if df.empty:
+            return pd.DataFrame(columns=columns)
+        # stored fits are matched on this token: the content of the columns read, salted
+        # with the caller's version, so a reused version label cannot serve other data
+        data_version = frame_fingerprint(df, key_cols + [date_col, value_col],
+                                         data_version=data_version or df.attrs.get('data_version'))
+        result_key = self.cache.make_key('forecast', key_cols, data_version, periods,
+                                         self.season_length, value_col)
+        cached = self.cache.get(result_key)
+        if cached is not None:
+            self.counters['horizon_hits'] += 1
+            return cached
+        keys, Y, lengths, first = series_matrix(df, key_cols, value_col, date_col)
+        last = first + pd.to_timedelta(lengths - 1, unit="D")
+        series_keys = [json.dumps(dict(zip(key_cols, map(str, k))), sort_keys=True)
+                       for k in keys.itertuples(index=False, name=None)] if key_cols else ['{}']
+        long_enough = lengths >= 2 * self.season_length
+        idx = np.flatnonzero(long_enough)
+        pieces = []
+        if len(idx):
+            fit = self._fit_series(Y[idx], lengths[idx], first[idx], last[idx],
+                                   [series_keys[i] for i in idx], data_version)
+            pieces.append(fit_to_frame(fit, keys.iloc[idx], last[idx], periods, key_cols))
+        short = np.flatnonzero(~long_enough)
+        self.counters['naive'] += len(short)
+        pieces += naive_frames(keys, Y, lengths, first, short, periods, key_cols)
+        result = pd.concat(pieces, ignore_index=True)[columns]
+        self.cache.put(result_key, result)
+        return result
+
+    def _fit_series(self, Y: np.ndarray, lengths: np.ndarray, first: pd.DatetimeIndex,
+                    last: pd.DatetimeIndex, series_keys: List[str], data_version: str) -> HoltWintersFit:
+        models = self._load_models()
+        models = models[(models['series_key'].isin(series_keys))
+                        & (models['season_length'] == self.season_length)]
+        exact = models[models['data_version'] == data_version].set_index('series_key')
+        latest = models.sort_values('last_date', kind='mergesort').groupby('series_key').tail(1).set_index('series_key')
+        mode = np.zeros(len(series_keys), dtype=np.int8)  # 0 full, 1 reuse, 2 incremental
+        stored_rows = [None] * len(series_keys)
+        offsets = np.zeros(len(series_keys), dtype=np.int64)
+        for i, key in enumerate(series_keys):
+            if key in exact.index and exact.at[key, 'last_date'] == last[i]:
+                mode[i], stored_rows[i] = 1, exact.loc[key]
+            elif key in latest.index:
+                prev_last = latest.at[key, 'last_date']
+                gap = (last[i] - prev_last).days
+                if first[i] <= prev_last and 0 < gap <= self.max_incremental_days:
+                    mode[i], stored_rows[i] = 2, latest.loc[key]
+                    offsets[i] = (prev_last - first[i]).days + 1
+        fits: Dict[int, Tuple[np.ndarray, HoltWintersFit]] = {}
+        for code in (1, 2):
+            sel = np.flatnonzero(mode == code)
+            if not len(sel):
+                continue
+            fit = self._fit_from_rows(pd.DataFrame([stored_rows[i] for i in sel]))
+            if code == 2:
+                new_len = lengths[sel] - offsets[sel]
+                cols = offsets[sel][:, None] + np.arange(new_len.max())[None, :]
+                Y_new = np.take_along_axis(Y[sel], np.minimum(cols, Y.shape[1] - 1), axis=1)
+                fit = update_fit(fit, Y_new, new_len)
+            fits[code] = (sel, fit)
+        full = np.flatnonzero(mode == 0)
+        if len(full):
+            fits[0] = (full, self._fit_full(Y[full], lengths[full]))
+        self.counters['reused'] += int((mode == 1).sum())
+        self.counters['incremental'] += int((mode == 2).sum())
+        self.counters['full'] += len(full)
+        order = np.concatenate([fits[c][0] for c in sorted(fits)])
+        combined = _concat_fits([fits[c][1] for c in sorted(fits)]).take(np.argsort(order))
+        refreshed = np.flatnonzero(mode != 1)
+        if len(refreshed):
+            self._save_models(self._rows_from_fit(
+                combined.take(refreshed), [series_keys[i] for i in refreshed], data_version,
+                self.season_length, last[refreshed]))
+        return combined
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters, stored_models=len(self._load_models()))
+
+
+__all__ = [
+    'ForecastManager'
+]
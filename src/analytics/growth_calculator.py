@@ -7,13 +7,17 @@ import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from config.settings import ANALYTICS_CONFIG, EXPORTS_DIR
+from src.analytics.ranking import OVERALL_SCOPE, leaderboard, rank_entities
+from src.utils.memo import MemoCache, memoized
 
 
 class GrowthAnalyzer:
     
-    def __init__(self):
+    def __init__(self, cache: Optional[MemoCache] = None):
         self.exports_dir = EXPORTS_DIR
+        self.cache = cache
         
+    @memoized
     def calculate_yoy_growth(self, df: pd.DataFrame, value_col: str = 'registrations', 
                            date_col: str = 'date', group_cols: List[str] = None) -> pd.DataFrame:
         df_copy = df.copy()
@@ -31,12 +35,13 @@ class GrowthAnalyzer:
             group['yoy_growth'] = ((group[value_col] - group['prev_year_value']) / group['prev_year_value'] * 100)
             return group
         if group_cols:
-            result = monthly_data.groupby(group_cols).apply(calc_yoy).reset_index(drop=True)
+            result = monthly_data.groupby(group_cols)[list(monthly_data.columns)].apply(calc_yoy).reset_index(drop=True)
         else:
             result = calc_yoy(monthly_data)
         result['date'] = pd.to_datetime(result[['year', 'month']].assign(day=1))
         return result
     
+    @memoized
     def calculate_qoq_growth(self, df: pd.DataFrame, value_col: str = 'registrations',
                            date_col: str = 'date', group_cols: List[str] = None) -> pd.DataFrame:
         df_copy = df.copy()
@@ -54,7 +59,7 @@ class GrowthAnalyzer:
             group['qoq_growth'] = ((group[value_col] - group['prev_quarter_value']) / group['prev_quarter_value'] * 100)
             return group
         if group_cols:
-            result = quarterly_data.groupby(group_cols).apply(calc_qoq).reset_index(drop=True)
+            result = quarterly_data.groupby(group_cols)[list(quarterly_data.columns)].apply(calc_qoq).reset_index(drop=True)
         else:
             result = calc_qoq(quarterly_data)
         result['month'] = (result['quarter'] - 1) * 3 + 1
@@ -63,6 +68,7 @@ class GrowthAnalyzer:
         result = result.drop(columns=['month', 'day'])
         return result
     
+    @memoized
     def calculate_mom_growth(self, df: pd.DataFrame, value_col: str = 'registrations',
                            date_col: str = 'date', group_cols: List[str] = None) -> pd.DataFrame:
         df_copy = df.copy()
@@ -80,12 +86,13 @@ class GrowthAnalyzer:
             group['mom_growth'] = ((group[value_col] - group['prev_month_value']) / group['prev_month_value'] * 100)
             return group
         if group_cols:
-            result = monthly_data.groupby(group_cols).apply(calc_mom).reset_index(drop=True)
+            result = monthly_data.groupby(group_cols)[list(monthly_data.columns)].apply(calc_mom).reset_index(drop=True)
         else:
             result = calc_mom(monthly_data)
         result['date'] = pd.to_datetime(result[['year', 'month']].assign(day=1))
         return result
     
+    @memoized
     def calculate_market_share_trends(self, df: pd.DataFrame, entity_col: str,
                                     value_col: str = 'registrations', 
                                     date_col: str = 'date') -> pd.DataFrame:
@@ -107,24 +114,27 @@ class GrowthAnalyzer:
         entity_with_totals = entity_with_totals.drop('year_month', axis=1)
         return entity_with_totals
     
+    @memoized
     def identify_growth_leaders(self, df: pd.DataFrame, metric: str = 'yoy_growth',
                               entity_col: str = 'manufacturer', top_n: int = 5) -> Dict[str, pd.DataFrame]:
         latest_date = df['date'].max()
-        latest_data = df[df['date'] == latest_date].copy()
-        latest_data = latest_data.dropna(subset=[metric])
-        entity_growth = latest_data.groupby([entity_col, 'vehicle_category'])[metric].mean().reset_index()
-        entity_growth = entity_growth.sort_values(metric, ascending=False)
+        latest_data = df[df['date'] == latest_date]
+        ranked = rank_entities(latest_data, [metric], top_n, entity_col, 'vehicle_category')
         results = {}
-        for category in entity_growth['vehicle_category'].unique():
-            category_data = entity_growth[entity_growth['vehicle_category'] == category]
-            results[f'{category}_leaders'] = category_data.head(top_n)
-            results[f'{category}_laggards'] = category_data.tail(top_n)
-        overall_growth = latest_data.groupby(entity_col)[metric].mean().reset_index()
-        overall_growth = overall_growth.sort_values(metric, ascending=False)
-        results['overall_leaders'] = overall_growth.head(top_n)
-        results['overall_laggards'] = overall_growth.tail(top_n)
+        for scope in ranked['scope'].unique():
+            leaders = leaderboard(ranked, metric, 'top', scope)
+            # laggards keep the historical "tail of the descending table" ordering
+            laggards = leaderboard(ranked, metric, 'bottom', scope).iloc[::-1].reset_index(drop=True)
+            cols = [entity_col, metric]
+            if scope != OVERALL_SCOPE:
+                leaders = leaders.assign(vehicle_category=scope)
+                laggards = laggards.assign(vehicle_category=scope)
+                cols = [entity_col, 'vehicle_category', metric]
+            results[f'{scope}_leaders'] = leaders[cols]
+            results[f'{scope}_laggards'] = laggards[cols]
         return results
     
+    @memoized
     def calculate_volatility_metrics(self, df: pd.DataFrame, value_col: str = 'registrations',
                                    date_col: str = 'date', group_cols: List[str] = None) -> pd.DataFrame:
         df_copy = df.copy()
@@ -140,11 +150,12 @@ class GrowthAnalyzer:
             group['max_drawdown_30d'] = drawdown.rolling(window=30).min()
             return group
         if group_cols:
-            result = df_copy.groupby(group_cols).apply(calc_volatility).reset_index(drop=True)
+            result = df_copy.groupby(group_cols)[list(df_copy.columns)].apply(calc_volatility).reset_index(drop=True)
         else:
             result = calc_volatility(df_copy)
         return result
     
+    @memoized
     def generate_investment_signals(self, df: pd.DataFrame) -> pd.DataFrame:
         df_copy = df.copy()
         df_copy['investment_signal'] = 'HOLD'
@@ -202,6 +213,7 @@ class GrowthAnalyzer:
         df_copy['signal_reasoning'] = signal_results[2]
         return df_copy
     
+    @memoized
     def create_comprehensive_analysis(self, df: pd.DataFrame, entity_col: str = 'manufacturer') -> Dict[str, pd.DataFrame]:
         results = {}
         yoy_data = self.calculate_yoy_growth(df, group_cols=[entity_col, 'vehicle_category'])
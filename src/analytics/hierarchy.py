@@ -0,0 +1,184 @@
+"""Hierarchical forecasting over total → state → category → manufacturer.
+
+Bottom series (one per full key) are laid on a shared daily calendar and every aggregate
+node is produced by one sparse product with the summing matrix ``S``. Base forecasts for
+all nodes come from a single batched Holt-Winters fit and are reconciled with sparse
+linear algebra so that any slice of the dashboard adds up.
+"""
+from __future__ import annotations
+import os
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import splu
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.analytics.holt_winters import fit_batch, forecast_batch
+
+DEFAULT_LEVELS = ("state", "vehicle_category", "manufacturer")
+RECONCILIATION_METHODS = ("bottom_up", "ols", "wls_struct", "mint_diag")
+AGGREGATE = "All"
+
+
+@dataclass
+class Hierarchy:
+    """Node labels (``AGGREGATE`` above each node's depth) and the sparse summing matrix."""
+    levels: List[str]
+    nodes: pd.DataFrame
+    S: sparse.csr_matrix
+
+    @property
+    def n_bottom(self) -> int:
+        return self.S.shape[1]
+
+
+def build_hierarchy(bottom_keys: pd.DataFrame, levels: Sequence[str] = DEFAULT_LEVELS) -> Hierarchy:
+    """Summing matrix with rows ordered total, level 1, ..., bottom (identity block last)."""
+    levels = list(levels)
+    n_bottom = len(bottom_keys)
+    cols = np.arange(n_bottom)
+    blocks, labels = [], []
+    for depth in range(len(levels) + 1):
+        fixed = levels[:depth]
+        if fixed:
+            codes = bottom_keys.groupby(fixed, sort=False).ngroup().to_numpy()
+            names = bottom_keys[fixed].drop_duplicates().reset_index(drop=True)
+        else:
+            codes = np.zeros(n_bottom, dtype=np.int64)
+            names = pd.DataFrame(index=[0])
+        for col in levels[depth:]:
+            names[col] = AGGREGATE
+        names["depth"] = depth
+        labels.append(names[levels + ["depth"]])
+        blocks.append(sparse.csr_matrix((np.ones(n_bottom), (codes, cols)), shape=(len(names), n_bottom)))
+    return Hierarchy(levels, pd.concat(labels, ignore_index=True), sparse.vstack(blocks, format="csr"))
+
+
+def bottom_matrix(df: pd.DataFrame, levels: Sequence[str] = DEFAULT_LEVELS, value_col: str = "registrations",
+                  date_col: str = "date"):
+    """Daily sums per bottom key on one calendar; days without rows count as zero registrations.
+    Returns (bottom keys, Y of shape (n_bottom, days), DatetimeIndex of days).
+    """
+    levels = list(levels)
+    work = df[levels + [date_col, value_col]].copy()
+    work[date_col] = pd.to_datetime(work[date_col]).dt.normalize()
+    daily = work.groupby(levels + [date_col], sort=True)[value_col].sum().reset_index()
+    codes = daily.groupby(levels, sort=False).ngroup().to_numpy()
+    keys = daily[levels].drop_duplicates().reset_index(drop=True)
+    calendar = pd.date_range(daily[date_col].min(), daily[date_col].max(), freq="D")
+    offsets = ((daily[date_col].to_numpy() - calendar[0].to_datetime64()) // np.timedelta64(1, "D")).astype(np.int64)
+    Y = np.zeros((len(keys), len(calendar)))
+    Y[codes, offsets] = daily[value_col].to_numpy(dtype=float)
+    return keys, Y, calendar
+
+
+def reconcile(S: sparse.csr_matrix, base: np.ndarray, method: str = "mint_diag",
+              variances: Optional[np.ndarray] = None) -> np.ndarray:
+    """Coherent bottom-level forecasts ``P @ base`` for base forecasts of every node (rows).
+
+    bottom_up keeps the bottom rows; the other methods solve the GLS normal equations
+    (Sᵀ W⁻¹ S) b = Sᵀ W⁻¹ ŷ with W = I (ols), node sizes (wls_struct) or in-sample
+    residual variances (mint_diag) via one sparse LU factorization.
+    """
+    if method not in RECONCILIATION_METHODS:
+        raise ValueError(f"Unsupported reconciliation method: {method}")
+    n_bottom = S.shape[1]
+    if method == "bottom_up":
+        return base[-n_bottom:]
+    if method == "ols":
+        w = np.ones(S.shape[0])
+    elif method == "wls_struct":
+        w = np.asarray(S.sum(axis=1)).ravel()
+    else:
+        if variances is None:
+            raise ValueError("mint_diag reconciliation needs per-node residual variances")
+        w = np.asarray(variances, dtype=float)
+        fallback = np.nanmedian(w[w > 0]) if np.any(w > 0) else 1.0
+        w = np.where(np.isfinite(w) & (w > 0), w, fallback)
+    StWinv = S.T.multiply(1.0 / w[None, :]).tocsr()
+    gram = (StWinv @ S).tocsc()
+    return splu(gram).solve(np.asarray(StWinv @ base))
+
+
+@dataclass
+class HierarchicalForecast:
+    hierarchy: Hierarchy
+    dates: pd.DatetimeIndex
+    base: np.ndarray
+    reconciled: np.ndarray
+    half_width: np.ndarray
+    method: str
+
+    def frame(self) -> pd.DataFrame:
+        """Long frame: date, <levels>, depth, base_forecast, forecast, lower, upper per node."""
+        nodes = self.hierarchy.nodes
+        periods = len(self.dates)
+        out = nodes.loc[nodes.index.repeat(periods)].reset_index(drop=True)
+        out.insert(0, "date", np.tile(self.dates.to_numpy(), len(nodes)))
+        out["base_forecast"] = self.base.ravel()
+        out["forecast"] = self.reconciled.ravel()
+        out["lower"] = (self.reconciled - self.half_width).ravel()
+        out["upper"] = (self.reconciled + self.half_width).ravel()
+        return out
+
+    def view(self, **filters: str) -> pd.DataFrame:
+        """Coherent forecast for any slice, e.g. ``view(state='MH', vehicle_category='2W')``.
+        Exact nodes are returned directly; other slices sum the reconciled bottom series
+        (intervals then assume independent errors).
+        """
+        levels = self.hierarchy.levels
+        unknown = set(filters) - set(levels)
+        if unknown:
+            raise ValueError(f"Unknown hierarchy levels: {sorted(unknown)}")
+        nodes = self.hierarchy.nodes
+        wanted = {col: filters.get(col, AGGREGATE) for col in levels}
+        exact = np.flatnonzero(np.logical_and.reduce([nodes[c].to_numpy() == v for c, v in wanted.items()]))
+        if len(exact):
+            mean, half = self.reconciled[exact[0]], self.half_width[exact[0]]
+        else:
+            bottom = nodes.iloc[-self.hierarchy.n_bottom:]
+            rows = np.flatnonzero(np.logical_and.reduce(
+                [bottom[c].to_numpy() == v for c, v in filters.items()]))
+            if not len(rows):
+                raise KeyError(f"No series match {filters}")
+            rows += len(nodes) - self.hierarchy.n_bottom
+            mean = self.reconciled[rows].sum(axis=0)
+            half = np.sqrt((self.half_width[rows] ** 2).sum(axis=0))
+        return pd.DataFrame({"date": self.dates, "forecast": mean, "lower": mean - half, "upper": mean + half})
+
+
+def forecast_hierarchy(df: pd.DataFrame, levels: Sequence[str] = DEFAULT_LEVELS, periods: int = 30,
+                       method: str = "mint_diag", season_length: int = 7,
+                       grid: Optional[Dict[str, Sequence[float]]] = None, value_col: str = "registrations",
+                       date_col: str = "date") -> HierarchicalForecast:
+    """One batched base fit for every node, then sparse reconciliation to coherent forecasts."""
+    keys, Y_bottom, calendar = bottom_matrix(df, levels, value_col, date_col)
+    hierarchy = build_hierarchy(keys, levels)
+    Y = np.asarray(hierarchy.S @ Y_bottom)
+    n_nodes, n_days = Y.shape
+    if n_days >= 2 * season_length:
+        fit = fit_batch(Y, np.full(n_nodes, n_days), season_length, grid)
+        base, lower, _ = forecast_batch(fit, periods)
+        half = base - lower
+        variances = fit.sigma2
+    else:
+        recent = Y[:, -season_length:]
+        base = np.repeat(recent.mean(axis=1, keepdims=True), periods, axis=1)
+        variances = recent.var(axis=1)
+        half = np.repeat(1.96 * np.sqrt(variances)[:, None], periods, axis=1)
+    reconciled = np.asarray(hierarchy.S @ reconcile(hierarchy.S, base, method, variances))
+    dates = pd.date_range(calendar[-1] + pd.Timedelta(days=1), periods=periods, freq="D")
+    return HierarchicalForecast(hierarchy, dates, base, reconciled, half, method)
+
+
+__all__ = [
+    'Hierarchy',
+    'HierarchicalForecast',
+    'build_hierarchy',
+    'reconcile',
+    'forecast_hierarchy'
+]
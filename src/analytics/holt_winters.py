@@ -0,0 +1,257 @@
+"""Batched additive Holt-Winters for many daily series at once.
+
+The smoothing recursion runs over a (series x time) matrix with NumPy, so thousands of
+manufacturer x state x category series are fitted in one pass. Parameters come from a
+grid evaluated for every series simultaneously (lowest one-step SSE wins) and intervals
+use the residual variance with the additive ETS horizon multipliers.
+Series shorter than two seasons fall back to ``_naive_forecast``.
+"""
+from __future__ import annotations
+import os
+import sys
+from dataclasses import dataclass
+from itertools import product
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.analytics.advanced_analytics import _naive_forecast
+
+DEFAULT_GRID: Dict[str, Tuple[float, ...]] = {
+    "alpha": (0.05, 0.1, 0.2, 0.3, 0.5, 0.8),
+    "beta": (0.0, 0.02, 0.1, 0.3),
+    "gamma": (0.0, 0.05, 0.15, 0.3),
+}
+
+# bound on (grid size x series x season) cells held per chunk during the grid search
+_MAX_GRID_CELLS = 4_000_000
+
+
+@dataclass
+class HoltWintersFit:
+    """Fitted state per series; ``season[:, j]`` is the seasonal term j+1 steps after the last obs."""
+    alpha: np.ndarray
+    beta: np.ndarray
+    gamma: np.ndarray
+    level: np.ndarray
+    trend: np.ndarray
+    season: np.ndarray
+    sse: np.ndarray
+    n_obs: np.ndarray
+
+    @property
+    def sigma2(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.n_obs > 0, self.sse / np.maximum(self.n_obs, 1), np.nan)
+
+    def take(self, idx) -> "HoltWintersFit":
+        return HoltWintersFit(*(getattr(self, f)[idx] for f in self.__dataclass_fields__))
+
+
+def run_recursion(Y: np.ndarray, lengths: np.ndarray, alpha, beta, gamma, level: np.ndarray,
+                  trend: np.ndarray, season: np.ndarray, skip: int = 0):
+    """Advance additive Holt-Winters states over left-aligned observations.
+
+    Y is (S, T) with column 0 the first new step for every series; series i only uses its
+    first ``lengths[i]`` columns. NaN inside that span is a gap (state is propagated).
+    ``season`` is (..., S, m) phase-aligned to column 0. Params and states may carry a
+    leading grid axis that broadcasts against S. Returns (level, trend, season aligned to
+    the step after each series' end, sse, n) where errors count only from column ``skip``.
+    """
+    level = np.array(level, dtype=float, copy=True)
+    trend = np.array(trend, dtype=float, copy=True)
+    season = np.array(season, dtype=float, copy=True)
+    alpha = np.asarray(alpha, dtype=float)
+    beta = np.asarray(beta, dtype=float)
+    gamma = np.asarray(gamma, dtype=float)
+    m = season.shape[-1]
+    sse = np.zeros(level.shape)
+    n = np.zeros(level.shape)
+    for t in range(Y.shape[1]):
+        y = Y[:, t]
+        active = t < lengths
+        if not active.any():
+            break
+        observed = active & ~np.isnan(y)
+        yv = np.where(observed, y, 0.0)
+        s_prev = season[..., t % m]
+        fitted = level + trend
+        err = yv - fitted - s_prev
+        new_level = np.where(observed, alpha * (yv - s_prev) + (1.0 - alpha) * fitted, fitted)
+        new_trend = beta * (new_level - level) + (1.0 - beta) * trend
+        new_season = np.where(observed, gamma * (yv - fitted) + (1.0 - gamma) * s_prev, s_prev)
+        level = np.where(active, new_level, level)
+        trend = np.where(active, new_trend, trend)
+        season[..., t % m] = new_season
+        if t >= skip:
+            counted = observed & np.ones(level.shape, dtype=bool)
+            sse += np.where(counted, err * err, 0.0)
+            n += counted
+    phase = (lengths[:, None] + np.arange(m)[None, :]) % m
+    phase = np.broadcast_to(phase, season.shape)
+    season = np.take_along_axis(season, phase, axis=-1)
+    return level, trend, season, sse, n
+
+
+def initial_states(Y: np.ndarray, season_length: int, initial_season: Optional[np.ndarray] = None):
+    """Heuristic start: level = first-season mean, trend = season-over-season slope / m."""
+    m = season_length
+    with np.errstate(invalid="ignore"):
+        first = np.nanmean(Y[:, :m], axis=1)
+        second = np.nanmean(Y[:, m:2 * m], axis=1)
+    level = np.nan_to_num(first)
+    trend = np.nan_to_num((second - first) / m)
+    if initial_season is not None:
+        season = np.asarray(initial_season, dtype=float).copy()
+    else:
+        season = np.nan_to_num(Y[:, :m] - level[:, None])
+    return level, trend, season
+
+
+def fit_batch(Y: np.ndarray, lengths: np.ndarray, season_length: int = 7,
+              grid: Optional[Dict[str, Sequence[float]]] = None,
+              initial_season: Optional[np.ndarray] = None) -> HoltWintersFit:
+    """Grid-search (alpha, beta, gamma) for every series at once and keep the best final states."""
+    grid = grid or DEFAULT_GRID
+    combos = np.array(list(product(grid["alpha"], grid["beta"], grid["gamma"])), dtype=float)
+    P = len(combos)
+    S = Y.shape[0]
+    m = season_length
+    level0, trend0, season0 = initial_states(Y, m, initial_season)
+    chunk = max(1, _MAX_GRID_CELLS // (P * m))
+    fields = {k: [] for k in HoltWintersFit.__dataclass_fields__}
+    a, b, g = (combos[:, i][:, None] for i in range(3))
+    for lo in range(0, S, chunk):
+        sl = slice(lo, min(lo + chunk, S))
+        cnt = sl.stop - sl.start
+        level, trend, season, sse, n = run_recursion(
+            Y[sl], lengths[sl], a, b, g,
+            np.broadcast_to(level0[sl], (P, cnt)),
+            np.broadcast_to(trend0[sl], (P, cnt)),
+            np.broadcast_to(season0[sl], (P, cnt, m)),
+            skip=m,
+        )
+        best = np.argmin(np.where(n > 0, sse, np.inf), axis=0)
+        cols = np.arange(cnt)
+        fields["alpha"].append(combos[best, 0])
+        fields["beta"].append(combos[best, 1])
+        fields["gamma"].append(combos[best, 2])
+        fields["level"].append(level[best, cols])
+        fields["trend"].append(trend[best, cols])
+        fields["season"].append(season[best, cols])
+        fields["sse"].append(sse[best, cols])
+        fields["n_obs"].append(n[best, cols])
+    return HoltWintersFit(**{k: np.concatenate(v) for k, v in fields.items()})
+
+
+def update_fit(fit: HoltWintersFit, Y_new: np.ndarray, lengths: np.ndarray) -> HoltWintersFit:
+    """Warm start: run stored params/states over new observations only (no re-estimation)."""
+    level, trend, season, sse, n = run_recursion(
+        Y_new, lengths, fit.alpha, fit.beta, fit.gamma, fit.level, fit.trend, fit.season
+    )
+    return HoltWintersFit(fit.alpha, fit.beta, fit.gamma, level, trend, season,
+                          fit.sse + sse, fit.n_obs + n)
+
+
+def forecast_batch(fit: HoltWintersFit, periods: int, z: float = 1.96) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(mean, lower, upper) arrays of shape (S, periods)."""
+    m = fit.season.shape[1]
+    h = np.arange(1, periods + 1)
+    mean = fit.level[:, None] + h[None, :] * fit.trend[:, None] + fit.season[:, (h - 1) % m]
+    j = np.arange(1, periods)
+    c = fit.alpha[:, None] * (1.0 + j[None, :] * fit.beta[:, None]) + fit.gamma[:, None] * (j % m == 0)[None, :]
+    mult = 1.0 + np.concatenate([np.zeros((len(mean), 1)), np.cumsum(c * c, axis=1)], axis=1)
+    half = z * np.sqrt(fit.sigma2[:, None] * mult)
+    return mean, mean - half, mean + half
+
+
+def series_matrix(df: pd.DataFrame, key_cols: List[str], value_col: str = "registrations",
+                  date_col: str = "date"):
+    """Daily sums per key as a left-aligned (series x day) matrix.
+    Returns (keys frame, Y, lengths, first_dates); days with no rows inside a span are NaN.
+    """
+    work = df[key_cols + [date_col, value_col]].copy()
+    work[date_col] = pd.to_datetime(work[date_col]).dt.normalize()
+    daily = work.groupby(key_cols + [date_col], sort=True)[value_col].sum().reset_index()
+    codes = daily.groupby(key_cols, sort=False).ngroup().to_numpy() if key_cols else np.zeros(len(daily), dtype=np.int64)
+    keys = daily[key_cols].drop_duplicates().reset_index(drop=True) if key_cols else pd.DataFrame(index=[0])
+    dates = daily[date_col].to_numpy()
+    first = pd.Series(dates).groupby(codes).min().to_numpy()
+    last = pd.Series(dates).groupby(codes).max().to_numpy()
+    offsets = ((dates - first[codes]) // np.timedelta64(1, "D")).astype(np.int64)
+    lengths = ((last - first) // np.timedelta64(1, "D")).astype(np.int64) + 1
+    Y = np.full((len(keys), int(lengths.max()) if len(lengths) else 0), np.nan)
+    Y[codes, offsets] = daily[value_col].to_numpy(dtype=float)
+    return keys, Y, lengths, pd.to_datetime(first)
+
+
+def fit_to_frame(fit: HoltWintersFit, keys: pd.DataFrame, last: pd.DatetimeIndex, periods: int,
+                 key_cols: List[str]) -> pd.DataFrame:
+    """Long forecast frame (date, keys, forecast, lower, upper) for already fitted series."""
+    mean, lower, upper = forecast_batch(fit, periods)
+    steps = pd.to_timedelta(np.arange(1, periods + 1), unit="D")
+    out = pd.DataFrame({
+        "date": (last.to_numpy()[:, None] + steps.to_numpy()[None, :]).ravel(),
+        "forecast": mean.ravel(),
+        "lower": lower.ravel(),
+        "upper": upper.ravel(),
+    })
+    for col in key_cols:
+        out[col] = np.repeat(keys[col].to_numpy(), periods)
+    return out
+
+
+def naive_frames(keys: pd.DataFrame, Y: np.ndarray, lengths: np.ndarray, first: pd.DatetimeIndex,
+                 idx: np.ndarray, periods: int, key_cols: List[str]) -> List[pd.DataFrame]:
+    """``_naive_forecast`` per short series, labelled with its key columns."""
+    pieces = []
+    for i in idx:
+        span = pd.date_range(first[i], periods=int(lengths[i]), freq="D")
+        series = pd.Series(Y[i, :lengths[i]], index=span)
+        naive = _naive_forecast(series, None, periods).drop(columns=["vehicle_category"])
+        for col in key_cols:
+            naive[col] = keys.at[i, col]
+        pieces.append(naive)
+    return pieces
+
+
+def forecast_frame(df: pd.DataFrame, key_cols: Optional[List[str]] = None, periods: int = 30,
+                   value_col: str = "registrations", date_col: str = "date", season_length: int = 7,
+                   grid: Optional[Dict[str, Sequence[float]]] = None,
+                   use_decomposition: bool = False) -> pd.DataFrame:
+    """Forecast every key's daily series in one batched fit.
+    use_decomposition=True seeds the weekly states from the cached seasonal decomposition
+    instead of the first week's deviations (season_length 7 only).
+    Returns columns: date, <key_cols>, forecast, lower, upper.
+    """
+    key_cols = list(key_cols or [])
+    columns = ["date"] + key_cols + ["forecast", "lower", "upper"]
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+    keys, Y, lengths, first = series_matrix(df, key_cols, value_col, date_col)
+    last = first + pd.to_timedelta(lengths - 1, unit="D")
+    long_enough = lengths >= 2 * season_length
+    pieces = []
+    if long_enough.any():
+        idx = np.flatnonzero(long_enough)
+        initial_season = None
+        if use_decomposition and season_length == 7:
+            from src.analytics.decomposition import decompose_frame
+            initial_season = decompose_frame(df, key_cols, value_col, date_col, yearly=False).initial_season(idx)
+        fit = fit_batch(Y[idx], lengths[idx], season_length, grid, initial_season)
+        pieces.append(fit_to_frame(fit, keys.iloc[idx], last[idx], periods, key_cols))
+    pieces += naive_frames(keys, Y, lengths, first, np.flatnonzero(~long_enough), periods, key_cols)
+    return pd.concat(pieces, ignore_index=True)[columns]
+
+
+__all__ = [
+    'HoltWintersFit',
+    'fit_batch',
+    'update_fit',
+    'forecast_batch',
+    'series_matrix',
+    'fit_to_frame',
+    'forecast_frame'
+]
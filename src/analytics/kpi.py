@@ -0,0 +1,242 @@
+"""Incrementally maintained headline KPIs.
+
+Ingested rows are folded into a small cube: registrations per (category, state) cell
+and day, a bitset of the manufacturers active in each cell on each day, and each
+manufacturer's first active day per cell. Prefix sums over the day axis turn any
+date-range total into two lookups per cell, and OR-ing the bitsets of the selected cells
+and days gives the distinct manufacturers, so a snapshot for a filter combination (date
+range, categories, states) costs O(cells x days x manufacturers / 8), independent of the
+number of rows, and is memoized until the next ingest. Rows at or
+before a cell's last ingested day are skipped, so re-ingesting overlapping history is safe.
+"""
+from __future__ import annotations
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+_NONE = -1
+_DAY = np.timedelta64(1, 'D')
+
+
+@dataclass
+class KPISnapshot:
+    """Growth figures are percentages and None when the comparison period has no data."""
+    start: date
+    end: date
+    total_registrations: int
+    period_change: Optional[float]
+    active_categories: int
+    manufacturers: int
+    new_manufacturers: int
+    yoy_growth: Optional[float]
+    yoy_change: Optional[float]
+
+
+def _growth(current: float, previous: Optional[float]) -> Optional[float]:
+    if previous is None or previous <= 0:
+        return None
+    return (current - previous) / previous * 100
+
+
+class KPIEngine:
+
+    def __init__(self, category_col: str = "vehicle_category", state_col: str = "state",
+                 entity_col: str = "manufacturer", value_col: str = "registrations",
+                 date_col: str = "date", max_snapshots: int = 256):
+        self.category_col = category_col
+        self.state_col = state_col
+        self.entity_col = entity_col
+        self.value_col = value_col
+        self.date_col = date_col
+        self.max_snapshots = max_snapshots
+        self.rows_ingested = 0
+        self._cells: Dict[Tuple[Any, Any], int] = {}
+        self._entities: Dict[Any, int] = {}
+        self._origin: Optional[np.datetime64] = None
+        self._daily = np.zeros((0, 0))
+        self._active = np.zeros((0, 0, 0), dtype=np.uint8)
+        self._first = np.zeros((0, 0), dtype=np.int64)
+        self._ingested = np.zeros(0, dtype=np.int64)
+        self._cum: Optional[np.ndarray] = None
+        self._snapshots: "OrderedDict[tuple, KPISnapshot]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    # ---------------- ingest -----------------
+    def _ids(self, index: Dict[Any, int], keys: Sequence) -> np.ndarray:
+        return np.array([index.setdefault(k, len(index)) for k in keys], dtype=np.int64)
+
+    def _grow(self, n_cells: int, n_entities: int, first_day: int, last_day: int) -> int:
+        """Resize the cube for new cells, entities and days; returns the day shift applied."""
+        shift = max(-first_day, 0)
+        n_days = max(self._daily.shape[1] + shift, last_day + shift + 1)
+        daily = np.zeros((n_cells, n_days))
+        daily[:self._daily.shape[0], shift:shift + self._daily.shape[1]] = self._daily
+        # manufacturers are packed eight to a byte on the last axis, so new ones keep their bits
+        active = np.zeros((n_cells, n_days, -(-n_entities // 8)), dtype=np.uint8)
+        active[:self._active.shape[0], shift:shift + self._active.shape[1], :self._active.shape[2]] = self._active
+        first = np.full((n_cells, n_entities), _NONE, dtype=np.int64)
+        seen = self._first != _NONE
+        first[:self._first.shape[0], :self._first.shape[1]] = np.where(seen, self._first + shift, _NONE)
+        ingested = np.full(n_cells, _NONE, dtype=np.int64)
+        ingested[:len(self._ingested)] = np.where(self._ingested != _NONE, self._ingested + shift, _NONE)
+        self._daily, self._active, self._first, self._ingested = daily, active, first, ingested
+        self._origin = self._origin - shift * _DAY
+        return shift
+
+    def update(self, df: pd.DataFrame) -> int:
+        """Fold new rows into the cube; returns how many rows were absorbed. Rows without a
+        category or state are skipped; rows without a manufacturer count towards totals only.
+        """
+        df = df.dropna(subset=[self.category_col, self.state_col])
+        if df.empty:
+            return 0
+        days = pd.to_datetime(df[self.date_col]).to_numpy().astype('datetime64[D]')
+        with self._lock:
+            if self._origin is None:
+                self._origin = days.min()
+            cells = df.groupby([self.category_col, self.state_col], sort=False).ngroup().to_numpy()
+            cell_keys = list(df[[self.category_col, self.state_col]].drop_duplicates().itertuples(index=False, name=None))
+            cell_ids = self._ids(self._cells, cell_keys)[cells]
+            entity_codes, entity_keys = pd.factorize(df[self.entity_col])
+            entity_ids = np.where(entity_codes == _NONE, _NONE, self._ids(self._entities, list(entity_keys))[entity_codes])
+            day = (days - self._origin).astype(np.int64)
+            shift = self._grow(len(self._cells), len(self._entities), int(day.min()), int(day.max()))
+            day = day + shift
+            fresh = day > self._ingested[cell_ids]
+            cell_ids, entity_ids, day = cell_ids[fresh], entity_ids[fresh], day[fresh]
+            values = df[self.value_col].to_numpy(dtype=float)[fresh]
+            np.add.at(self._daily, (cell_ids, day), values)
+            active = (values > 0) & (entity_ids != _NONE)
+            c, e, d = cell_ids[active], entity_ids[active], day[active]
+            np.bitwise_or.at(self._active, (c, d, e >> 3), np.left_shift(1, e & 7).astype(np.uint8))
+            firsts = pd.DataFrame({'cell': c, 'entity': e, 'day': d}).groupby(['cell', 'entity'])['day'].min()
+            if len(firsts):
+                c = firsts.index.get_level_values('cell').to_numpy()
+                e = firsts.index.get_level_values('entity').to_numpy()
+                current = self._first[c, e]
+                self._first[c, e] = np.where(current == _NONE, firsts.to_numpy(), np.minimum(current, firsts.to_numpy()))
+            np.maximum.at(self._ingested, cell_ids, day)
+            self._cum = None
+            self._snapshots.clear()
+            absorbed = int(fresh.sum())
+            self.rows_ingested += absorbed
+            return absorbed
+
+    # ---------------- reads -----------------
+    @property
+    def last_date(self) -> Optional[date]:
+        if self._origin is None or not self._daily.shape[1]:
+            return None
+        return pd.Timestamp(self._origin + (self._daily.shape[1] - 1) * _DAY).date()
+
+    def _day(self, value: Union[date, str]) -> int:
+        return int((np.datetime64(pd.Timestamp(value).date(), 'D') - self._origin).astype(np.int64))
+
+    def _year_before(self, day: int) -> int:
+        stamp = pd.Timestamp(self._origin + day * _DAY) - pd.DateOffset(years=1)
+        return self._day(stamp)
+
+    def _range_totals(self, cells: np.ndarray, start: int, end: int) -> Optional[np.ndarray]:
+        """Per-cell totals over days [start, end]; None when the range starts before the data."""
+        if start < 0:
+            return None
+        n_days = self._daily.shape[1]
+        start, end = min(start, n_days), min(end, n_days - 1)
+        if end < start:
+            return np.zeros(len(cells))
+        if self._cum is None:
+            self._cum = np.concatenate([np.zeros((self._daily.shape[0], 1)), np.cumsum(self._daily, axis=1)], axis=1)
+        return self._cum[cells, end + 1] - self._cum[cells, start]
+
+    def _entity_counts(self, cells: np.ndarray, start: int, end: int) -> Tuple[int, int]:
+        """Distinct manufacturers active in the cells over days [start, end], and how many of
+        them were first seen in that range.
+        """
+        lo, hi = max(start, 0), min(end, self._active.shape[1] - 1)
+        active = 0
+        if hi >= lo:
+            bits = np.bitwise_or.reduce(self._active[cells, lo:hi + 1].reshape(-1, self._active.shape[2]), axis=0)
+            active = int(np.unpackbits(bits).sum())
+        first = np.where(self._first[cells] == _NONE, np.iinfo(np.int64).max, self._first[cells]).min(axis=0)
+        new = (first >= start) & (first <= end)
+        return active, int(new.sum())
+
+    def snapshot(self, start: Union[date, str], end: Union[date, str],
+                 categories: Optional[Sequence[str]] = None, states: Optional[Sequence[str]] = None) -> KPISnapshot:
+        """KPIs for [start, end] over the selected categories and states (all when None).
+        ``period_change`` compares with the equally long period before ``start``;
+        ``yoy_change`` is the change in YoY growth against that previous period, in points.
+        """
+        key = (str(start), str(end), None if categories is None else tuple(sorted(categories)),
+               None if states is None else tuple(sorted(states)))
+        with self._lock:
+            cached = self._snapshots.get(key)
+            if cached is not None:
+                self._snapshots.move_to_end(key)
+                return cached
+            result = self._compute(start, end, categories, states)
+            self._snapshots[key] = result
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+            return result
+
+    def _compute(self, start, end, categories, states) -> KPISnapshot:
+        selected = [i for (category, state), i in self._cells.items()
+                    if (categories is None or category in categories) and (states is None or state in states)]
+        cells = np.asarray(selected, dtype=np.int64)
+        start_date, end_date = pd.Timestamp(start).date(), pd.Timestamp(end).date()
+        if self._origin is None or not len(cells):
+            return KPISnapshot(start_date, end_date, 0, None, 0, 0, 0, None, None)
+        s, e = self._day(start), self._day(end)
+        length = e - s + 1
+
+        def total(lo: int, hi: int) -> Optional[float]:
+            totals = self._range_totals(cells, lo, hi)
+            return None if totals is None else float(totals.sum())
+
+        current = self._range_totals(cells, max(s, 0), e)
+        current_total = float(current.sum())
+        previous_total = total(s - length, s - 1)
+        yoy = _growth(current_total, total(self._year_before(s), self._year_before(e)))
+        previous_yoy = None
+        if previous_total is not None:
+            previous_yoy = _growth(previous_total, total(self._year_before(s - length), self._year_before(s - 1)))
+        registered = set(cells[current > 0].tolist())
+        categories_active = {category for (category, _), i in self._cells.items() if i in registered}
+        manufacturers, new = self._entity_counts(cells, s, e)
+        return KPISnapshot(
+            start=start_date,
+            end=end_date,
+            total_registrations=int(round(current_total)),
+            period_change=_growth(current_total, previous_total),
+            active_categories=len(categories_active),
+            manufacturers=manufacturers,
+            new_manufacturers=new,
+            yoy_growth=yoy,
+            yoy_change=None if yoy is None or previous_yoy is None else yoy - previous_yoy
+        )
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            'rows_ingested': self.rows_ingested,
+            'cells': len(self._cells),
+            'entities': len(self._entities),
+            'days': int(self._daily.shape[1]),
+            'snapshots': len(self._snapshots),
+            'last_date': self.last_date
+        }
+
+
+__all__ = [
+    'KPISnapshot',
+    'KPIEngine'
+]
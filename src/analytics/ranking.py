@@ -0,0 +1,100 @@
+"""Top-k / bottom-k entity ranking with partial selection.
+
+Entities are aggregated once, then each (scope, metric) pair is ranked with
+``np.argpartition`` on a contiguous slice instead of sorting the whole table.
+"""
+from __future__ import annotations
+import pandas as pd
+import numpy as np
+from typing import List, Optional, Sequence, Tuple, Union
+
+OVERALL_SCOPE = "overall"
+
+
+def _select(values: np.ndarray, k: int, largest: bool, keep: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions of the k best values (ordered) and their competition ranks.
+    keep='first' returns exactly k (ties broken by position); keep='all' also returns ties at the boundary.
+    """
+    n = len(values)
+    if n == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    key = -values if largest else values
+    if k < n:
+        bound = key[np.argpartition(key, k - 1)[:k]].max()
+        if keep == 'all':
+            cand = np.flatnonzero(key <= bound)
+        else:
+            strict = np.flatnonzero(key < bound)
+            ties = np.flatnonzero(key == bound)[: k - len(strict)]
+            cand = np.concatenate([strict, ties])
+    else:
+        cand = np.arange(n)
+    cand = cand[np.lexsort((cand, key[cand]))]
+    ordered = key[cand]
+    ranks = np.searchsorted(ordered, ordered, side='left') + 1
+    return cand, ranks
+
+
+def _rank_table(table: pd.DataFrame, metrics: Sequence[str], k: int, scope_col: Optional[str],
+                keep: str) -> List[pd.DataFrame]:
+    if table.empty:
+        return []
+    if scope_col is None:
+        scopes = np.zeros(len(table), dtype=np.int64)
+        labels = [OVERALL_SCOPE]
+    else:
+        scopes, labels = pd.factorize(table[scope_col], sort=True)
+    order = np.argsort(scopes, kind='stable')
+    bounds = np.searchsorted(scopes[order], np.arange(len(labels) + 1))
+    pieces = []
+    for metric in metrics:
+        values = table[metric].to_numpy(dtype=float)[order]
+        for code, label in enumerate(labels):
+            block = values[bounds[code]:bounds[code + 1]]
+            rows = order[bounds[code]:bounds[code + 1]]
+            valid = np.flatnonzero(~np.isnan(block))
+            for side, largest in (('top', True), ('bottom', False)):
+                pos, ranks = _select(block[valid], k, largest, keep)
+                picked = table.iloc[rows[valid[pos]]]
+                pieces.append(picked.assign(
+                    scope=label, metric=metric, value=block[valid[pos]], rank=ranks, side=side
+                ))
+    return pieces
+
+
+def rank_entities(df: pd.DataFrame, metrics: Union[str, Sequence[str]], k: int = 5,
+                  entity_cols: Union[str, Sequence[str]] = 'manufacturer',
+                  group_col: Optional[str] = 'vehicle_category', keep: str = 'first') -> pd.DataFrame:
+    """Per-group and overall top-k / bottom-k entities for several metrics in one pass.
+    Metrics are averaged per entity (NaNs skipped). Returns a long frame with columns
+    scope, <entity_cols>, metric, value, rank, side ('top' or 'bottom').
+    """
+    if keep not in ('first', 'all'):
+        raise ValueError(f"Unsupported keep mode: {keep}")
+    metrics = [metrics] if isinstance(metrics, str) else list(metrics)
+    entity_cols = [entity_cols] if isinstance(entity_cols, str) else list(entity_cols)
+    pieces = []
+    if group_col is not None and group_col in df.columns and group_col not in entity_cols:
+        grouped = df.groupby(entity_cols + [group_col], sort=False)[metrics].mean().reset_index()
+        pieces += _rank_table(grouped, metrics, k, group_col, keep)
+    overall = df.groupby(entity_cols, sort=False)[metrics].mean().reset_index()
+    pieces += _rank_table(overall, metrics, k, None, keep)
+    columns = ['scope'] + entity_cols + ['metric', 'value', 'rank', 'side']
+    pieces = [p for p in pieces if len(p)]
+    if not pieces:
+        return pd.DataFrame(columns=columns)
+    out = pd.concat(pieces, ignore_index=True)
+    return out[columns]
+
+
+def leaderboard(ranked: pd.DataFrame, metric: str, side: str = 'top', scope: str = OVERALL_SCOPE) -> pd.DataFrame:
+    """Slice one leaderboard out of ``rank_entities`` output, best first."""
+    mask = (ranked['metric'] == metric) & (ranked['side'] == side) & (ranked['scope'] == scope)
+    board = ranked.loc[mask].drop(columns=['scope', 'metric', 'side'])
+    return board.rename(columns={'value': metric}).reset_index(drop=True)
+
+
+__all__ = [
+    'rank_entities',
+    'leaderboard'
+]
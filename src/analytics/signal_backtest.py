@@ -0,0 +1,189 @@
+"""Vectorized replay and evaluation of the investment signal rules.
+
+``score_signals`` reproduces ``GrowthAnalyzer.generate_investment_signals`` with array
+operations and tunable thresholds. ``SignalBacktester`` pairs every (entity, date) row
+with its forward registration growth, computed by grouped cumulative sums, and reports
+outcomes per signal class; threshold sweeps fan out over a process pool.
+"""
+from __future__ import annotations
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from config.settings import ANALYTICS_CONFIG
+
+# thresholds hard-coded in generate_investment_signals
+DEFAULT_SIGNAL_RULES: Dict[str, float] = {
+    "yoy_strong": 20.0,
+    "yoy_good": 10.0,
+    "yoy_negative": -10.0,
+    "qoq_strong": 15.0,
+    "qoq_poor": -15.0,
+    "share_high": 15.0,
+    "cv_high": 0.5,
+}
+
+SIGNAL_CLASSES = ["STRONG_SELL", "SELL", "HOLD", "BUY", "STRONG_BUY"]
+_FEATURES = {"yoy": "yoy_growth", "qoq": "qoq_growth", "share": "market_share", "cv": "cv_30d"}
+
+
+def _feature_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    # a missing column behaves like an all-NaN one: the rule simply never fires
+    return {name: (df[col].to_numpy(dtype=float) if col in df.columns else np.full(len(df), np.nan))
+            for name, col in _FEATURES.items()}
+
+
+def _score(features: Dict[str, np.ndarray], rules: Dict[str, float]) -> np.ndarray:
+    yoy, qoq, share, cv = (features[k] for k in ("yoy", "qoq", "share", "cv"))
+    with np.errstate(invalid="ignore"):
+        score = np.select([yoy > rules["yoy_strong"], yoy > rules["yoy_good"], yoy < rules["yoy_negative"]],
+                          [2, 1, -2], 0)
+        score += np.select([qoq > rules["qoq_strong"], qoq < rules["qoq_poor"]], [1, -1], 0)
+        score += (share > rules["share_high"]).astype(np.int64)
+        score -= (cv > rules["cv_high"]).astype(np.int64)
+    return score
+
+
+def _class_codes(score: np.ndarray) -> np.ndarray:
+    """Index into SIGNAL_CLASSES: <=-2, -1, 0, 1, >=2."""
+    return np.clip(score, -2, 2) + 2
+
+
+def score_signals(df: pd.DataFrame, rules: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """investment_signal and signal_strength for every row, without a per-row apply."""
+    rules = dict(DEFAULT_SIGNAL_RULES, **(rules or {}))
+    score = _score(_feature_arrays(df), rules)
+    return pd.DataFrame({
+        "investment_signal": np.asarray(SIGNAL_CLASSES, dtype=object)[_class_codes(score)],
+        "signal_strength": np.abs(score).astype(float),
+    }, index=df.index)
+
+
+def forward_growth(df: pd.DataFrame, horizon: int = 30, entity_cols: Sequence[str] = ("manufacturer", "vehicle_category"),
+                   value_col: str = "registrations", date_col: str = "date") -> np.ndarray:
+    """Per row: % change of the entity's total over the next ``horizon`` periods vs the
+    trailing ``horizon`` periods ending at the row's date (NaN where either window is short).
+    """
+    entity_cols = [c for c in entity_cols if c in df.columns]
+    dates = pd.to_datetime(df[date_col])
+    totals = df[value_col].groupby([df[c] for c in entity_cols] + [dates], sort=True).sum()
+    values = totals.to_numpy(dtype=float)
+    codes = pd.factorize(totals.index.droplevel(-1))[0] if entity_cols else np.zeros(len(values), dtype=np.int64)
+    starts = np.r_[0, np.flatnonzero(np.diff(codes)) + 1]
+    ends = np.r_[starts[1:], len(values)]
+    group = np.repeat(np.arange(len(starts)), ends - starts)
+    pos = np.arange(len(values))
+    cs = np.r_[0.0, np.cumsum(values)]
+    ok = (pos + horizon < ends[group]) & (pos - horizon + 1 >= starts[group])
+    fwd_hi = np.minimum(pos + 1 + horizon, ends[group])
+    back_lo = np.maximum(pos + 1 - horizon, starts[group])
+    forward = cs[fwd_hi] - cs[pos + 1]
+    trailing = cs[pos + 1] - cs[back_lo]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        growth = np.where(ok & (trailing > 0), (forward / trailing - 1.0) * 100, np.nan)
+    lookup = pd.Series(growth, index=totals.index)
+    row_index = pd.MultiIndex.from_arrays([df[c] for c in entity_cols] + [dates]) if entity_cols else dates
+    return lookup.reindex(row_index).to_numpy()
+
+
+def _evaluate(features: Dict[str, np.ndarray], outcome: np.ndarray, rules: Dict[str, float]) -> Dict[str, np.ndarray]:
+    codes = _class_codes(_score(features, rules))
+    valid = ~np.isnan(outcome)
+    codes, outcome = codes[valid], outcome[valid]
+    n = np.bincount(codes, minlength=5)
+    total = np.bincount(codes, outcome, minlength=5)
+    up = np.bincount(codes, outcome > 0, minlength=5)
+    down = np.bincount(codes, outcome < 0, minlength=5)
+    return {"count": n, "total": total, "up": up, "down": down}
+
+
+def _combo_row(stats: Dict[str, np.ndarray]) -> Dict[str, float]:
+    n, total = stats["count"], stats["total"]
+    n_sell, n_buy = n[:2].sum(), n[3:].sum()
+    buy_mean = total[3:].sum() / n_buy if n_buy else np.nan
+    sell_mean = total[:2].sum() / n_sell if n_sell else np.nan
+    return {
+        "n_buy": int(n_buy),
+        "n_sell": int(n_sell),
+        "buy_forward_growth": buy_mean,
+        "sell_forward_growth": sell_mean,
+        "spread": buy_mean - sell_mean,
+        "buy_hit_rate": stats["up"][3:].sum() / n_buy if n_buy else np.nan,
+        "sell_hit_rate": stats["down"][:2].sum() / n_sell if n_sell else np.nan,
+    }
+
+
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(features: Dict[str, np.ndarray], outcome: np.ndarray) -> None:
+    _WORKER["features"] = features
+    _WORKER["outcome"] = outcome
+
+
+def _sweep_chunk(combos: List[Dict[str, float]]) -> List[Dict[str, float]]:
+    return [_combo_row(_evaluate(_WORKER["features"], _WORKER["outcome"], rules)) for rules in combos]
+
+
+class SignalBacktester:
+
+    def __init__(self, df: pd.DataFrame, horizon: int = 30,
+                 entity_cols: Sequence[str] = ("manufacturer", "vehicle_category"),
+                 value_col: str = "registrations", date_col: str = "date"):
+        self.horizon = horizon
+        self.features = _feature_arrays(df)
+        self.outcome = forward_growth(df, horizon, entity_cols, value_col, date_col)
+
+    def evaluate(self, rules: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+        """Forward-growth outcome per signal class: rows, mean growth, share of rows up/down."""
+        stats = _evaluate(self.features, self.outcome, dict(DEFAULT_SIGNAL_RULES, **(rules or {})))
+        n = stats["count"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return pd.DataFrame({
+                "investment_signal": SIGNAL_CLASSES,
+                "rows": n,
+                "mean_forward_growth": stats["total"] / n,
+                "share_up": stats["up"] / n,
+                "share_down": stats["down"] / n,
+            })
+
+    def sweep(self, grid: Dict[str, Sequence[float]], max_workers: Optional[int] = None,
+              chunk_size: int = 64) -> pd.DataFrame:
+        """Evaluate every threshold combination in ``grid`` (other rules keep their defaults),
+        sorted by BUY-minus-SELL forward growth spread.
+        """
+        unknown = set(grid) - set(DEFAULT_SIGNAL_RULES)
+        if unknown:
+            raise ValueError(f"Unknown signal rules: {sorted(unknown)}")
+        names = list(grid)
+        combos = [dict(DEFAULT_SIGNAL_RULES, **dict(zip(names, values))) for values in product(*grid.values())]
+        chunks = [combos[lo:lo + chunk_size] for lo in range(0, len(combos), chunk_size)]
+        max_workers = max_workers if max_workers is not None else ANALYTICS_CONFIG["max_workers"]
+        if max_workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(chunks)), initializer=_init_worker,
+                                     initargs=(self.features, self.outcome)) as pool:
+                rows = [row for part in pool.map(_sweep_chunk, chunks) for row in part]
+        else:
+            _init_worker(self.features, self.outcome)
+            try:
+                rows = [row for chunk in chunks for row in _sweep_chunk(chunk)]
+            finally:
+                _WORKER.clear()
+        params = pd.DataFrame([{k: c[k] for k in names} for c in combos])
+        result = pd.concat([params, pd.DataFrame(rows)], axis=1)
+        return result.sort_values("spread", ascending=False, kind="mergesort").reset_index(drop=True)
+
+
+__all__ = [
+    'DEFAULT_SIGNAL_RULES',
+    'SIGNAL_CLASSES',
+    'score_signals',
+    'forward_growth',
+    'SignalBacktester'
+]
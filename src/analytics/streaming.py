@@ -0,0 +1,200 @@
+"""Online (streaming) anomaly detection for incrementally ingested registrations.
+Keeps an EWMA mean/variance per entity so each new (entity, date) total is scored and
+absorbed in O(1), and checkpoints that state to disk so a daily ingest never reloads history.
+"""
+from __future__ import annotations
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from config.settings import ANALYTICS_CONFIG, CACHE_DIR
+
+DEFAULT_CHECKPOINT = CACHE_DIR / "online_anomaly_state.json"
+_NO_DATE = np.iinfo(np.int64).min
+
+
+def _encode_key_part(value):
+    # JSON keeps str/int/float/bool/None; timestamps and NumPy scalars need a tag or a cast
+    if isinstance(value, pd.Timestamp):
+        return {"timestamp": value.isoformat()}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _decode_key_part(value):
+    if isinstance(value, dict) and "timestamp" in value:
+        return pd.Timestamp(value["timestamp"])
+    return value
+
+
+class OnlineAnomalyDetector:
+
+    def __init__(self, entity_cols: Optional[List[str]] = None, value_col: str = "registrations",
+                 date_col: str = "date", span: Optional[int] = None, z_thresh: Optional[float] = None,
+                 warmup: int = 7):
+        self.entity_cols = list(entity_cols or [])
+        self.value_col = value_col
+        self.date_col = date_col
+        self.span = span if span is not None else ANALYTICS_CONFIG["smoothing_window"]
+        self.alpha = 2.0 / (self.span + 1.0)
+        self.z_thresh = z_thresh if z_thresh is not None else ANALYTICS_CONFIG["outlier_threshold"]
+        self.warmup = warmup
+        self._index: Dict[Tuple, int] = {}
+        self._keys: List[Tuple] = []
+        self._mean = np.empty(0)
+        self._var = np.empty(0)
+        self._count = np.empty(0, dtype=np.int64)
+        self._last = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _entity_ids(self, work: pd.DataFrame) -> np.ndarray:
+        if not self.entity_cols:
+            codes = np.zeros(len(work), dtype=np.int64)
+            uniques = [()] if len(work) else []
+        else:
+            codes = work.groupby(self.entity_cols, sort=False).ngroup().to_numpy()
+            uniques = list(work[self.entity_cols].drop_duplicates().itertuples(index=False, name=None))
+        ids = np.empty(len(uniques), dtype=np.int64)
+        new = 0
+        for i, key in enumerate(uniques):
+            idx = self._index.get(key)
+            if idx is None:
+                idx = len(self._keys)
+                self._index[key] = idx
+                self._keys.append(key)
+                new += 1
+            ids[i] = idx
+        if new:
+            self._mean = np.concatenate([self._mean, np.zeros(new)])
+            self._var = np.concatenate([self._var, np.zeros(new)])
+            self._count = np.concatenate([self._count, np.zeros(new, dtype=np.int64)])
+            self._last = np.concatenate([self._last, np.full(new, _NO_DATE, dtype=np.int64)])
+        return ids[codes]
+
+    def update(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Score each (entity, date) total against the state so far, then absorb it.
+        Rows sharing an entity and date are summed first, so the result has one row per
+        entity and date (entity columns, date, value) plus expected, expected_std, z_score,
+        is_anomaly. Dates at or before an entity's last seen date are treated as already
+        ingested and left unflagged.
+        """
+        work = df[self.entity_cols + [self.date_col, self.value_col]].copy()
+        work[self.date_col] = pd.to_datetime(work[self.date_col])
+        if self.entity_cols:
+            work = work.dropna(subset=self.entity_cols)
+        work = (work.groupby(self.entity_cols + [self.date_col], sort=False)[self.value_col]
+                .sum(min_count=1).reset_index())
+        work = work.sort_values(self.date_col, kind="mergesort").reset_index(drop=True)
+        n = len(work)
+        expected = np.full(n, np.nan)
+        expected_std = np.full(n, np.nan)
+        z_score = np.full(n, np.nan)
+        if n:
+            ent = self._entity_ids(work)
+            values = work[self.value_col].to_numpy(dtype=float)
+            stamps = work[self.date_col].to_numpy().astype("datetime64[ns]").astype(np.int64)
+            # each wave holds at most one row per entity, so a wave updates in one vector step
+            wave = pd.Series(ent).groupby(ent).cumcount().to_numpy()
+            order = np.argsort(wave, kind="stable")
+            bounds = np.searchsorted(wave[order], np.arange(wave.max() + 2))
+            alpha = self.alpha
+            for w in range(len(bounds) - 1):
+                rows = order[bounds[w]:bounds[w + 1]]
+                rows = rows[(stamps[rows] > self._last[ent[rows]]) & ~np.isnan(values[rows])]
+                if not len(rows):
+                    continue
+                e = ent[rows]
+                x = values[rows]
+                mean, var, count = self._mean[e], self._var[e], self._count[e]
+                std = np.sqrt(var)
+                scored = (count >= self.warmup) & (std > 0)
+                expected[rows] = np.where(count > 0, mean, np.nan)
+                expected_std[rows] = np.where(count > 0, std, np.nan)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    z_score[rows] = np.where(scored, (x - mean) / std, np.nan)
+                diff = x - mean
+                incr = alpha * diff
+                first = count == 0
+                self._mean[e] = np.where(first, x, mean + incr)
+                self._var[e] = np.where(first, 0.0, (1.0 - alpha) * (var + diff * incr))
+                self._count[e] = count + 1
+                self._last[e] = stamps[rows]
+        work["expected"] = expected
+        work["expected_std"] = expected_std
+        work["z_score"] = z_score
+        work["is_anomaly"] = np.abs(z_score) > self.z_thresh
+        return work
+
+    def fit(self, history: pd.DataFrame) -> "OnlineAnomalyDetector":
+        """Warm the state from historical rows (alerts discarded)."""
+        self.update(history)
+        return self
+
+    def state_frame(self) -> pd.DataFrame:
+        state = pd.DataFrame(self._keys, columns=self.entity_cols) if self.entity_cols else pd.DataFrame(index=range(len(self._keys)))
+        state["ewma_mean"] = self._mean
+        state["ewma_std"] = np.sqrt(self._var)
+        state["observations"] = self._count
+        state["last_date"] = pd.to_datetime(self._last.astype("datetime64[ns]"))  # _NO_DATE is NaT
+        return state
+
+    def save(self, path: Optional[Path] = None) -> Path:
+        """Checkpoint params + per-entity state as JSON, written atomically."""
+        path = Path(path or DEFAULT_CHECKPOINT)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "params": {
+                "entity_cols": self.entity_cols,
+                "value_col": self.value_col,
+                "date_col": self.date_col,
+                "span": self.span,
+                "z_thresh": self.z_thresh,
+                "warmup": self.warmup
+            },
+            "keys": [[_encode_key_part(v) for v in k] for k in self._keys],
+            "mean": self._mean.tolist(),
+            "var": self._var.tolist(),
+            "count": self._count.tolist(),
+            "last": self._last.tolist()
+        }
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(payload))
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "OnlineAnomalyDetector":
+        path = Path(path or DEFAULT_CHECKPOINT)
+        payload = json.loads(path.read_text())
+        detector = cls(**payload["params"])
+        detector._keys = [tuple(_decode_key_part(v) for v in k) for k in payload["keys"]]
+        detector._index = {k: i for i, k in enumerate(detector._keys)}
+        detector._mean = np.asarray(payload["mean"], dtype=float)
+        detector._var = np.asarray(payload["var"], dtype=float)
+        detector._count = np.asarray(payload["count"], dtype=np.int64)
+        detector._last = np.asarray(payload["last"], dtype=np.int64)
+        return detector
+
+    @classmethod
+    def load_or_create(cls, path: Optional[Path] = None, **kwargs) -> "OnlineAnomalyDetector":
+        path = Path(path or DEFAULT_CHECKPOINT)
+        if path.exists():
+            try:
+                return cls.load(path)
+            except Exception:
+                path.unlink(missing_ok=True)
+        return cls(**kwargs)
+
+
+__all__ = [
+    'OnlineAnomalyDetector'
+]
@@ -0,0 +1,185 @@
+"""Process-wide, read-only dataset store shared by every dashboard session.
+
+A published dataset becomes an immutable Arrow table, written once as an Arrow IPC
+file and memory-mapped, so all sessions read the same buffers and the OS page cache
+backs them. Sessions hold a ``Lease`` on the version they render; per-session views
+are Arrow filters over the shared table. Publishing a new version never disturbs
+readers: older versions stay alive until their last lease is released (explicitly or
+when the session's state is garbage collected), then their files are removed.
+"""
+from __future__ import annotations
+import os
+import sys
+import threading
+import uuid
+import weakref
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from config.settings import CACHE_DIR
+
+
+@dataclass
+class Snapshot:
+    version: str
+    table: pa.Table
+    path: Optional[Path] = None
+    refs: int = 0
+
+
+class Lease:
+
+    def __init__(self, store: "DatasetStore", snapshot: Snapshot):
+        self.version = snapshot.version
+        self.table = snapshot.table
+        self._finalizer = weakref.finalize(self, store._release, snapshot.version)
+
+    @property
+    def active(self) -> bool:
+        return self._finalizer.alive
+
+    def release(self) -> None:
+        self._finalizer()
+
+    def view(self, start: Union[date, str, None] = None, end: Union[date, str, None] = None,
+             date_col: str = "date", **dims: Sequence[str]) -> pd.DataFrame:
+        """Rows in [start, end] whose ``dims`` columns take one of the given values."""
+        date_type = self.table.schema.field(date_col).type
+        conditions = []
+        if start is not None:
+            conditions.append(pc.greater_equal(self.table[date_col], pa.scalar(pd.Timestamp(start), date_type)))
+        if end is not None:
+            conditions.append(pc.less_equal(self.table[date_col], pa.scalar(pd.Timestamp(end), date_type)))
+        for col, values in dims.items():
+            conditions.append(pc.is_in(self.table[col], value_set=pa.array(list(values), pa.string())))
+        mask = None
+        for condition in conditions:
+            mask = condition if mask is None else pc.and_(mask, condition)
+        table = self.table if mask is None else self.table.filter(mask)
+        return table.to_pandas()
+
+
+class DatasetStore:
+
+    def __init__(self, root: Optional[Path] = None, memory_map: bool = True):
+        self.root = Path(root) if root is not None else Path(CACHE_DIR) / "store"
+        self.memory_map = memory_map
+        self.current: Optional[str] = None
+        self.counters = {"publishes": 0, "leases": 0, "dropped": 0}
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        if memory_map:
+            self.root.mkdir(parents=True, exist_ok=True)
+            # the dashboard runs one server process per cache dir; older files are orphans
+            for stale in self.root.glob("*.arrow"):
+                stale.unlink(missing_ok=True)
+
+    def _materialize(self, table: pa.Table, version: str) -> Snapshot:
+        if not self.memory_map:
+            return Snapshot(version, table)
+        path = self.root / f"{uuid.uuid4().hex[:12]}.arrow"
+        tmp = path.with_name(path.name + ".tmp")
+        with pa.OSFile(str(tmp), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, path)
+        mapped = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        return Snapshot(version, mapped, path)
+
+    def publish(self, data: Union[pd.DataFrame, pa.Table], version: str) -> None:
+        """Make ``data`` the current version; readers of older versions are unaffected."""
+        table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(data, preserve_index=False)
+        snapshot = self._materialize(table.combine_chunks(), version)
+        with self._lock:
+            previous = self._snapshots.get(version)
+            if previous is not None and previous.refs:
+                raise ValueError(f"Version {version} is already published and leased")
+            if previous is not None and previous.path is not None:
+                previous.path.unlink(missing_ok=True)
+            self._snapshots[version] = snapshot
+            old, self.current = self.current, version
+            self.counters["publishes"] += 1
+            if old is not None and old != version:
+                self._maybe_drop(old)
+
+    def ensure(self, version: str, build: Callable[[], Union[pd.DataFrame, pa.Table]]) -> None:
+        """Publish ``build()`` as ``version`` unless it is already current; concurrent
+        sessions asking for the same version build it once.
+        """
+        if self.current == version:
+            return
+        with self._build_lock:
+            if self.current != version:
+                self.publish(build(), version)
+
+    def lease(self, version: Optional[str] = None) -> Lease:
+        with self._lock:
+            version = version or self.current
+            if version not in self._snapshots:
+                raise KeyError(f"No published dataset version {version!r}")
+            snapshot = self._snapshots[version]
+            snapshot.refs += 1
+            self.counters["leases"] += 1
+            return Lease(self, snapshot)
+
+    def renew(self, lease: Optional[Lease]) -> Lease:
+        """``lease`` if it still points at the current version, else a lease on the current one."""
+        if lease is not None and lease.active and lease.version == self.current:
+            return lease
+        fresh = self.lease()
+        if lease is not None:
+            lease.release()
+        return fresh
+
+    def _release(self, version: str) -> None:
+        with self._lock:
+            snapshot = self._snapshots.get(version)
+            if snapshot is None:
+                return
+            snapshot.refs -= 1
+            self._maybe_drop(version)
+
+    def _maybe_drop(self, version: str) -> None:
+        snapshot = self._snapshots[version]
+        if snapshot.refs > 0 or version == self.current:
+            return
+        del self._snapshots[version]
+        self.counters["dropped"] += 1
+        if snapshot.path is not None:
+            # the mapping stays valid for any remaining references on POSIX
+            snapshot.path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return dict(self.counters, current=self.current,
+                        versions={v: s.refs for v, s in self._snapshots.items()},
+                        bytes=sum(s.table.nbytes for s in self._snapshots.values()))
+
+
+_shared_store: Optional[DatasetStore] = None
+_shared_lock = threading.Lock()
+
+
+def shared_dataset_store() -> DatasetStore:
+    """Process-wide store so every Streamlit session reads the same tables."""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = DatasetStore()
+        return _shared_store
+
+
+__all__ = [
+    'Snapshot',
+    'Lease',
+    'DatasetStore',
+    'shared_dataset_store'
+]
@@ -1,11 +1,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+from dataclasses import replace
 from datetime import datetime, timedelta, date
 from typing import Dict, List, Optional
 import sys
 import os
-import hashlib
 from pathlib import Path
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -14,11 +14,22 @@ try:
     from src.data_extraction.vahan_extractor import VahanDataExtractor
     from src.data_processing.data_cleaner import DataProcessor
     from src.analytics.growth_calculator import GrowthAnalyzer
+    from src.analytics.ranking import leaderboard, rank_entities
+    from src.analytics.correlation import CorrelationEngine
+    from src.analytics.kpi import KPIEngine, KPISnapshot
     from src.visualizations.charts import VehicleDataVisualizer
+    from src.visualizations.chart_batch import ChartSpec
+    from src.visualizations.figure_cache import shared_figure_cache
     from src.utils.exporter import build_export_payload
+    from src.utils.cache_manager import shared_cache_manager
+    from src.utils.memo import frame_fingerprint, shared_memo_cache
+    from src.utils.query_cache import SegmentCache
+    from src.dashboard.data_store import shared_dataset_store
+    from src.dashboard.tables import PagedTable, TableQuery
+    from src.dashboard.warmup import FilterCombo, UsageTracker, WarmupScheduler
     from src.utils import exporter as _export_mod
     from config import settings as SETTINGS
-    from config.settings import DASHBOARD_CONFIG, VEHICLE_CATEGORIES, MAJOR_MANUFACTURERS, EXPORT_CONFIG
+    from config.settings import DASHBOARD_CONFIG, DATA_CONFIG, VEHICLE_CATEGORIES, MAJOR_MANUFACTURERS, EXPORT_CONFIG, WARMUP_CONFIG
 except ImportError as e:
     st.error(f"Critical import error: {e}")
     st.stop()
@@ -35,26 +46,62 @@ else:
 
 PDF_AVAILABLE = getattr(_export_mod, 'PDF_AVAILABLE', True)
 
-CACHE_VERSION = "v1"
+SAMPLE_KEY_COLUMNS = ['date', 'state', 'vehicle_category', 'manufacturer']
+ROLLUP_GROUP_COLUMNS = ['state', 'vehicle_category', 'manufacturer']
+DASHBOARD_STATES = ["Maharashtra", "Karnataka", "Tamil Nadu", "Gujarat", "Uttar Pradesh"]
+OVERVIEW_CHARTS = {
+    'trends': ChartSpec('registration_trends_chart', ("Daily Registration Trends",)),
+    'market_share': ChartSpec('market_share_pie_chart'),
+    'heatmap': ChartSpec('heatmap')
+}
 
-def _cache_key(prefix: str, *parts) -> str:
-    h = hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()[:16]
-    return f"{prefix}_{h}_{CACHE_VERSION}"
+def _fragment(func):
+    """Run ``func`` as an ``st.fragment`` (its widgets rerun only it) when Streamlit has one."""
+    decorator = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+    return decorator(func) if decorator is not None else func
 
-@st.cache_data(show_spinner=False, ttl=3600)
-def load_or_generate_sample(start: date, end: date, categories: List[str], states: List[str]) -> pd.DataFrame:
-    dash = VehicleDashboard._get_singleton()
-    return dash._generate_sample_dataframe(start, end, categories, states)
+@st.cache_resource(show_spinner=False)
+def shared_components() -> Dict:
+    """Stateless helpers built once per process and shared by every session."""
+    return {
+        'extractor': VahanDataExtractor(),
+        'processor': DataProcessor(),
+        'analyzer': GrowthAnalyzer(cache=shared_memo_cache()),
+        'visualizer': VehicleDataVisualizer(cache=shared_figure_cache())
+    }
 
-class VehicleDashboard:
-    _singleton = None
+@st.cache_resource(show_spinner=False)
+def sample_segment_cache(root: str) -> SegmentCache:
+    """One segment cache (and manifest lock) per directory, shared by every session."""
+    return SegmentCache(Path(root), "sample", dims=['vehicle_category', 'state'],
+                        key_cols=SAMPLE_KEY_COLUMNS, store=shared_cache_manager())
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def kpi_engine(data_version: str) -> KPIEngine:
+    """KPI cube for one source data version, shared by every session; days published
+    later are folded in incrementally.
+    """
+    return KPIEngine()
+
+@st.cache_resource(show_spinner=False)
+def warmup_scheduler() -> WarmupScheduler:
+    """Usage counts and the background warm-up, one per server process."""
+    return WarmupScheduler(UsageTracker())
 
-    @classmethod
-    def _get_singleton(cls):
-        return cls._singleton
+def _compact(value: float) -> str:
+    for threshold, suffix in ((1e9, 'B'), (1e6, 'M'), (1e3, 'K')):
+        if abs(value) >= threshold:
+            return f"{value / threshold:.1f}{suffix}"
+    return f"{value:,.0f}"
+
+def _percent(value: Optional[float], signed: bool = True, unit: str = "%") -> Optional[str]:
+    if value is None:
+        return None
+    return f"{value:+.1f}{unit}" if signed else f"{value:.1f}{unit}"
+
+class VehicleDashboard:
 
     def __init__(self):
-        VehicleDashboard._singleton = self
         if 'ui_theme' not in st.session_state:
             st.session_state['ui_theme'] = 'Light'
         self.setup_page_config()
@@ -65,6 +112,13 @@ class VehicleDashboard:
         except Exception:
             self.file_cache_dir = Path(__file__).resolve().parents[2] / 'data' / 'cache'
             self.file_cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_manager = shared_cache_manager()
+        # cached samples are derived from these; changing any of them invalidates the cache
+        self.cache_manager.observe_source((
+            SAMPLE_KEY_COLUMNS, VEHICLE_CATEGORIES, MAJOR_MANUFACTURERS,
+            VehicleDashboard._generate_sample_dataframe.__code__.co_code.hex()
+        ))
+        self.sample_cache = sample_segment_cache(str(self.file_cache_dir / "segments"))
         self.apply_theme(st.session_state['ui_theme'])
 
     def apply_theme(self, mode: str):
@@ -227,10 +281,11 @@ class VehicleDashboard:
     
     def initialize_components(self):
         try:
-            self.extractor = VahanDataExtractor()
-            self.processor = DataProcessor()
-            self.analyzer = GrowthAnalyzer()
-            self.visualizer = VehicleDataVisualizer()
+            components = shared_components()
+            self.extractor = components['extractor']
+            self.processor = components['processor']
+            self.analyzer = components['analyzer']
+            self.visualizer = components['visualizer']
         except Exception as e:
             st.error(f"Error initializing components: {e}")
             st.stop()
@@ -248,7 +303,7 @@ class VehicleDashboard:
         date_range = st.sidebar.date_input(
             "Select date range:",
             value=(default_start, default_end),
-            min_value=date(2020, 1, 1),
+            min_value=pd.Timestamp(DATA_CONFIG['default_start_date']).date(),
             max_value=date.today()
         )
         st.sidebar.subheader("🚗 Vehicle Categories")
@@ -276,11 +331,10 @@ class VehicleDashboard:
         else:
             selected_manufacturers = []
         st.sidebar.subheader("🗺️ States")
-        all_states = ["Maharashtra", "Karnataka", "Tamil Nadu", "Gujarat", "Uttar Pradesh"]
         selected_states = st.sidebar.multiselect(
             "Select states:",
-            options=all_states,
-            default=all_states
+            options=DASHBOARD_STATES,
+            default=DASHBOARD_STATES
         )
         st.sidebar.subheader("⏱️ Time Granularity")
         granularity = st.sidebar.radio(
@@ -312,36 +366,53 @@ class VehicleDashboard:
             'granularity': granularity
         }
     
-    def render_header(self):
+    def render_header(self, filters):
         st.markdown('<h1 class="main-header">📊 Vehicle Registration Investor Dashboard</h1>', unsafe_allow_html=True)
+        kpi = self.kpi_snapshot(filters)
         cols = st.columns(4)
         metrics = [
-            ("Total Registrations", "2.4M", "+12.5%"),
-            ("Active Categories", "3", None),
-            ("Manufacturers", "15+", "+2 new"),
-            ("YoY Growth", "18.3%", "+2.1%")
+            ("Total Registrations", _compact(kpi.total_registrations), _percent(kpi.period_change)),
+            ("Active Categories", str(kpi.active_categories), None),
+            ("Manufacturers", str(kpi.manufacturers),
+             f"+{kpi.new_manufacturers} new" if kpi.new_manufacturers else None),
+            ("YoY Growth", _percent(kpi.yoy_growth, signed=False) or "n/a", _percent(kpi.yoy_change, unit=" pts"))
         ]
         for col, (label, value, delta) in zip(cols, metrics):
             with col:
                 st.metric(label=label, value=value, delta=delta)
+
+    def kpi_snapshot(self, filters, lease=None) -> KPISnapshot:
+        """Header KPIs from the shared cube; only days published since the last call are ingested."""
+        engine = kpi_engine(self.cache_manager.data_version)
+        lease = lease or st.session_state['_dataset_lease']
+        last = engine.last_date
+        engine.update(lease.view(start=None if last is None else last + timedelta(days=1)))
+        start, end = filters['date_range']
+        return engine.snapshot(start, end, filters['categories'], filters['states'])
     
     def load_sample_data(self, date_range, categories, states):
         start_date, end_date = date_range
-        cache_fname = _cache_key("sample", start_date, end_date, sorted(categories), sorted(states)) + ".parquet"
-        cache_path = self.file_cache_dir / cache_fname
-        if cache_path.exists():
-            try:
-                return pd.read_parquet(cache_path)
-            except Exception:
-                cache_path.unlink(missing_ok=True)
-        df = load_or_generate_sample(start_date, end_date, categories, states)
-        try:
-            df.to_parquet(cache_path, index=False)
-        except Exception:
-            pass
-        return df
+        store = self._current_store()
+        # the session keeps reading its version until its next run, even if a refresh lands
+        lease = store.renew(st.session_state.get('_dataset_lease'))
+        st.session_state['_dataset_lease'] = lease
+        return lease.view(start_date, end_date, vehicle_category=categories, state=states)
+
+    def _current_store(self):
+        store = shared_dataset_store()
+        store.ensure(f"{self.cache_manager.data_version}:{date.today()}", self._build_dataset)
+        return store
+
+    def _build_dataset(self) -> pd.DataFrame:
+        """Every category and state since the earliest selectable date, via the segment cache."""
+        return self.sample_cache.query(
+            DATA_CONFIG['default_start_date'], date.today(),
+            {'vehicle_category': list(VEHICLE_CATEGORIES), 'state': DASHBOARD_STATES},
+            lambda start, end, dims: self._generate_sample_dataframe(start, end, dims['vehicle_category'], dims['state'])
+        )
     
-    def _generate_sample_dataframe(self, start_date: date, end_date: date, categories: List[str], states: List[str]) -> pd.DataFrame:
+    @staticmethod
+    def _generate_sample_dataframe(start_date: date, end_date: date, categories: List[str], states: List[str]) -> pd.DataFrame:
         dates = pd.date_range(start=start_date, end=end_date, freq='D')
         sample_data = []
         for dt in dates:
@@ -364,18 +435,20 @@ class VehicleDashboard:
     
     def render_overview(self, data, filters):
         st.header("📊 Registration Overview")
+        batch = self.visualizer.build_charts(data, OVERVIEW_CHARTS)
         col1, col2 = st.columns(2)
         with col1:
-            trends_chart = self.visualizer.create_registration_trends_chart(
-                data, "Daily Registration Trends"
+            self._zoomable_chart(
+                data[['date', 'vehicle_category', 'registrations']], 'trends_zoom',
+                lambda frame, x_range: self.visualizer.figure(
+                    'registration_trends_chart', frame, "Daily Registration Trends", x_range=x_range
+                ),
+                initial=batch.figures['trends']
             )
-            st.plotly_chart(trends_chart, use_container_width=True)
         with col2:
-            market_share_chart = self.visualizer.create_market_share_pie_chart(data)
-            st.plotly_chart(market_share_chart, use_container_width=True)
+            st.plotly_chart(batch.figures['market_share'], use_container_width=True)
         st.subheader("🌡️ Registration Heatmap")
-        heatmap_chart = self.visualizer.create_heatmap(data)
-        st.plotly_chart(heatmap_chart, use_container_width=True)
+        st.plotly_chart(batch.figures['heatmap'], use_container_width=True)
         st.subheader("📋 Summary Statistics")
         summary_data = data.groupby('vehicle_category').agg({
             'registrations': ['sum', 'mean', 'std'],
@@ -383,10 +456,79 @@ class VehicleDashboard:
             'market_share': 'mean'
         }).round(2)
         summary_data.columns = ['Total Registrations', 'Avg Daily', 'Std Dev', 'Avg YoY Growth (%)', 'Market Share (%)']
-        st.dataframe(summary_data, use_container_width=True)
+        self._paged_table(summary_data, 'overview_summary')
+        with st.expander("🔎 Records"):
+            self._paged_table(data, 'overview_records')
     
+    @_fragment
+    def _zoomable_chart(self, data, key, build, initial=None):
+        """Plot ``build(data, x_range)`` above a window slider; narrowing the window
+        rebuilds only this chart, at full detail for the selected dates. ``initial`` is
+        an already built figure for the full range.
+        """
+        chart_slot = st.container()
+        start, end = data['date'].min().date(), data['date'].max().date()
+        x_range = None
+        if start < end:
+            window = st.slider("Zoom", min_value=start, max_value=end, value=(start, end),
+                               format="YYYY-MM-DD", key=key)
+            if tuple(window) != (start, end):
+                x_range = tuple(window)
+        with chart_slot:
+            figure = initial if x_range is None and initial is not None else build(data, x_range)
+            st.plotly_chart(figure, use_container_width=True)
+
+    @_fragment
+    def _paged_table(self, frame, key, page_size=None):
+        """Show ``frame`` one page at a time; sorting, filtering and paging run on the
+        server over a per-session ``PagedTable``, so the browser only receives the page.
+        """
+        page_size = page_size or DASHBOARD_CONFIG["table_page_size"]
+        if len(frame) <= page_size:
+            st.dataframe(frame, use_container_width=True)
+            return
+        tables = st.session_state.setdefault('_paged_tables', {})
+        token, table = tables.get(key, (None, None))
+        if table is None or table.source is not frame:
+            fingerprint = frame_fingerprint(frame, list(frame.columns))
+            if fingerprint != token:
+                table = PagedTable(frame)
+            table.source = frame
+            tables[key] = (fingerprint, table)
+        col1, col2, col3 = st.columns([3, 2, 1])
+        with col1:
+            search = st.text_input("Filter rows", key=f"{key}_search", placeholder="Contains…")
+        with col2:
+            sort_by = st.selectbox("Sort by", [None] + table.columns, key=f"{key}_sort",
+                                   format_func=lambda c: "—" if c is None else str(c))
+        with col3:
+            descending = st.toggle("Descending", key=f"{key}_desc")
+        query = TableQuery(sort_by, not descending, search, 0, page_size)
+        shape = (query.sort_by, query.ascending, query.search)
+        if st.session_state.get(f"{key}_shape") != shape:
+            st.session_state[f"{key}_shape"] = shape
+            st.session_state[f"{key}_page"] = 1
+        pages = max(-(-len(table.rows(query)) // page_size), 1)
+        number = st.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+        page = table.page(replace(query, page=int(number) - 1))
+        st.dataframe(page.rows, use_container_width=True, hide_index=True)
+        last_row = page.first_row + len(page.rows)
+        caption = f"Rows {page.first_row + 1:,}–{last_row:,} of {page.matched_rows:,}"
+        if page.matched_rows != page.total_rows:
+            caption += f" (filtered from {page.total_rows:,})"
+        st.caption(caption)
+
     def render_growth_analysis(self, data, filters):
         st.header("📈 Growth Analysis")
+        self._growth_panel(self._growth_frame(data))
+
+    @staticmethod
+    def _growth_frame(data):
+        growth_cols = [c for c in ['yoy_growth', 'qoq_growth', 'mom_growth'] if c in data.columns]
+        return data[['date', 'manufacturer', 'vehicle_category'] + growth_cols]
+
+    @_fragment
+    def _growth_panel(self, data):
         col1, col2 = st.columns([1, 3])
         with col1:
             growth_metric = st.selectbox(
@@ -396,19 +538,21 @@ class VehicleDashboard:
             )
         with col2:
             if growth_metric in data.columns:
-                growth_chart = self.visualizer.create_growth_metrics_chart(data, growth_metric)
+                growth_chart = self.visualizer.figure('growth_metrics_chart', data, growth_metric)
                 st.plotly_chart(growth_chart, use_container_width=True)
         st.subheader("🏆 Growth Leaders & Laggards")
         if growth_metric in data.columns:
-            latest_data = data[data['date'] == data['date'].max()].dropna(subset=[growth_metric])
+            latest_data = data[data['date'] == data['date'].max()]
+            board_cols = ['manufacturer', 'vehicle_category']
+            ranked = rank_entities(latest_data, [growth_metric], 5, board_cols, group_col=None)
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown("### 🚀 Top Performers")
-                top_performers = latest_data.nlargest(5, growth_metric)[['manufacturer', 'vehicle_category', growth_metric]]
+                top_performers = leaderboard(ranked, growth_metric, 'top')[board_cols + [growth_metric]]
                 st.dataframe(top_performers, use_container_width=True)
             with col2:
                 st.markdown("### 📉 Bottom Performers")
-                bottom_performers = latest_data.nsmallest(5, growth_metric)[['manufacturer', 'vehicle_category', growth_metric]]
+                bottom_performers = leaderboard(ranked, growth_metric, 'bottom')[board_cols + [growth_metric]]
                 st.dataframe(bottom_performers, use_container_width=True)
     
     def render_manufacturer_analysis(self, data, filters):
@@ -417,10 +561,10 @@ class VehicleDashboard:
             st.warning("Please select manufacturers from the sidebar to view analysis.")
             return
         manufacturer_data = data[data['manufacturer'].isin(filters['manufacturers'])]
-        comparison_chart = self.visualizer.create_comparison_chart(
-            manufacturer_data, filters['manufacturers'], 'manufacturer'
+        self._zoomable_chart(
+            manufacturer_data[['date', 'manufacturer', 'vehicle_category', 'registrations']], 'comparison_zoom',
+            lambda frame, x_range: self._comparison_chart(frame, filters['manufacturers'], x_range)
         )
-        st.plotly_chart(comparison_chart, use_container_width=True)
         st.subheader("📊 Manufacturer Performance Summary")
         perf_summary = manufacturer_data.groupby(['manufacturer', 'vehicle_category']).agg({
             'registrations': 'sum',
@@ -428,18 +572,36 @@ class VehicleDashboard:
             'qoq_growth': 'mean',
             'market_share': 'mean'
         }).round(2)
-        st.dataframe(perf_summary, use_container_width=True)
+        self._paged_table(perf_summary, 'manufacturer_summary')
+        self._comovement_panel(data[['date', 'manufacturer', 'state', 'registrations']], filters['manufacturers'])
+
+    def _comparison_chart(self, frame, manufacturers, x_range=None):
+        return self.visualizer.figure('comparison_chart', frame, manufacturers, 'manufacturer', x_range=x_range)
+
+    @_fragment
+    def _comovement_panel(self, data, manufacturers):
+        st.subheader("🔗 Co-movement")
+        entity_col = st.radio("Correlate", ['manufacturer', 'state'], horizontal=True, key='corr_entity')
+        engine = CorrelationEngine(data, entity_col=entity_col, freq='W', transform='growth')
+        if len(engine.entities) < 2:
+            st.info("Need at least two entities with weekly history to compare.")
+            return
+        shown = manufacturers if entity_col == 'manufacturer' else None
+        heatmap = self.visualizer.figure(
+            'correlation_heatmap', engine.matrix(shown), f"Weekly Growth Correlation by {entity_col.title()}"
+        )
+        st.plotly_chart(heatmap, use_container_width=True)
+        with st.expander("Lead / lag vs. reference"):
+            reference = st.selectbox("Reference", list(engine.entities), key='corr_reference')
+            st.dataframe(engine.lead_lag(reference, entities=shown).round(3), use_container_width=True)
     
     def render_investment_insights(self, data, filters):
         st.header("💰 Investment Insights")
         if 'investment_signal' in data.columns:
             st.subheader("🎯 Investment Signals")
             signal_summary = data.groupby(['investment_signal', 'vehicle_category']).size().unstack(fill_value=0)
-            st.dataframe(signal_summary, use_container_width=True)
-            signal_chart = self.visualizer.create_growth_metrics_chart(
-                data.groupby('investment_signal').size().reset_index().rename(columns={0: 'Count'}),
-                'Count'
-            )
+            self._paged_table(signal_summary, 'investment_signals')
+            signal_chart = self._signal_chart(data)
             st.plotly_chart(signal_chart, use_container_width=True)
         st.subheader("⚠️ Risk Assessment")
         volatility_data = data.groupby('vehicle_category')['registrations'].agg(['std', 'mean']).reset_index()
@@ -447,7 +609,7 @@ class VehicleDashboard:
         volatility_data['risk_level'] = pd.cut(volatility_data['cv'], 
                                              bins=[0, 0.2, 0.4, float('inf')], 
                                              labels=['Low', 'Medium', 'High'])
-        st.dataframe(volatility_data[['vehicle_category', 'cv', 'risk_level']], use_container_width=True)
+        self._paged_table(volatility_data[['vehicle_category', 'cv', 'risk_level']], 'investment_risk')
         st.subheader("💡 Investment Recommendations")
         recommendations = [
             "🚀 **Strong Buy**: 2W segment showing consistent 20%+ YoY growth",
@@ -459,21 +621,23 @@ class VehicleDashboard:
         for rec in recommendations:
             st.markdown(f"- {rec}")
     
+    def _signal_chart(self, data):
+        counts = data.groupby('investment_signal').size().reset_index().rename(columns={0: 'Count'})
+        return self.visualizer.figure('growth_metrics_chart', counts, 'Count')
+
     def refresh_data(self, date_range):
         try:
-            for fp in self.file_cache_dir.glob("sample_*.parquet"):
-                fp.unlink()
+            self.cache_manager.bump_version()
         except Exception:
             pass
-        load_or_generate_sample.clear()
         with st.spinner("Refreshing data..."):
-            st.success("Cache cleared. Fresh data will be generated on next load.")
+            st.success("Cached data invalidated. Fresh data will be generated on next load.")
             st.rerun()
     
     def export_data(self, df: pd.DataFrame, fmt: str):
         try:
             base_name = f"vehicle_registrations_{fmt.lower()}"
-            payload = build_export_payload(df, fmt, base_name)
+            payload = build_export_payload(df, fmt, base_name, cache=self.cache_manager)
             return payload
         except RuntimeError as pdf_err:
             st.error(str(pdf_err))
@@ -482,16 +646,22 @@ class VehicleDashboard:
             st.error(f"Export failed: {e}")
             return None
     
-    def aggregate_data(self, df: pd.DataFrame, granularity: str) -> pd.DataFrame:
-        if granularity == "Daily" or df.empty:
-            return df
-        group_cols = ['state', 'vehicle_category', 'manufacturer']
-        if granularity == "Monthly":
-            agg_df = self.processor.aggregate_daily_to_monthly(df, group_cols)
-        elif granularity == "Quarterly":
-            agg_df = self.processor.aggregate_daily_to_quarterly(df, group_cols)
-        else:
-            return df
+    def _rollups(self, lease) -> Dict[str, pd.DataFrame]:
+        """Monthly and quarterly rollups, with growth, of the whole published dataset; built once
+        per dataset version and shared by every session, which only filters them.
+        """
+        cache = shared_memo_cache()
+        key = cache.make_key('dashboard_rollups', lease.version)
+        rollups = cache.get(key)
+        if rollups is None:
+            monthly = self.processor.aggregate_daily_to_monthly(lease.view(), ROLLUP_GROUP_COLUMNS)
+            quarterly = self.processor.rollup_monthly_to_quarterly(monthly, ROLLUP_GROUP_COLUMNS)
+            rollups = {'Monthly': self._with_growth(monthly), 'Quarterly': self._with_growth(quarterly)}
+            cache.put(key, rollups)
+        return rollups
+
+    def _with_growth(self, agg_df: pd.DataFrame) -> pd.DataFrame:
+        group_cols = ROLLUP_GROUP_COLUMNS
         try:
             yoy = self.analyzer.calculate_yoy_growth(agg_df, group_cols=group_cols)
             qoq = self.analyzer.calculate_qoq_growth(agg_df, group_cols=group_cols)
@@ -503,13 +673,63 @@ class VehicleDashboard:
         except Exception as e:
             st.warning(f"Growth recomputation failed: {e}")
         return agg_df
+
+    def aggregate_data(self, df: pd.DataFrame, granularity: str, filters: Dict, lease=None) -> pd.DataFrame:
+        """The session's slice of the shared rollup: every period overlapping the date range."""
+        if granularity not in ("Monthly", "Quarterly") or df.empty:
+            return df
+        lease = lease or st.session_state['_dataset_lease']
+        agg_df = self._rollups(lease)[granularity]
+        start, end = filters['date_range']
+        first = pd.Timestamp(start).to_period('M' if granularity == "Monthly" else 'Q').start_time
+        mask = (agg_df['date'].between(first, pd.Timestamp(end))
+                & agg_df['vehicle_category'].isin(filters['categories'])
+                & agg_df['state'].isin(filters['states']))
+        return agg_df[mask].reset_index(drop=True)
     
+    def warm(self, combo: FilterCombo) -> None:
+        """Compute what rendering ``combo`` needs (dataset view, header KPIs, aggregates and
+        the view's default figures) so it lands in the shared caches. Safe off the script thread.
+        """
+        filters = combo.filters()
+        start, end = filters['date_range']
+        lease = self._current_store().lease()
+        try:
+            self.kpi_snapshot(filters, lease)
+            data = lease.view(start, end, vehicle_category=filters['categories'], state=filters['states'])
+            data = self.aggregate_data(data, filters['granularity'], filters, lease)
+        finally:
+            lease.release()
+        view = filters['analysis_type']
+        if view == "Overview":
+            self.visualizer.build_charts(data, OVERVIEW_CHARTS)
+        elif view == "Growth Trends":
+            frame = self._growth_frame(data)
+            if 'yoy_growth' in frame.columns:
+                self.visualizer.figure('growth_metrics_chart', frame, 'yoy_growth')
+        elif view == "Manufacturer Analysis" and filters['manufacturers']:
+            frame = data[data['manufacturer'].isin(filters['manufacturers'])]
+            self._comparison_chart(frame[['date', 'manufacturer', 'vehicle_category', 'registrations']],
+                                   filters['manufacturers'])
+        elif view == "Investment Insights" and 'investment_signal' in data.columns:
+            self._signal_chart(data)
+
+    def schedule_warmup(self, filters) -> None:
+        """Count this run's filters; once per data version (startup, then after each
+        refresh) warm the most used combinations in the background.
+        """
+        if not WARMUP_CONFIG["enabled"]:
+            return
+        scheduler = warmup_scheduler()
+        scheduler.tracker.record(FilterCombo.from_filters(filters))
+        scheduler.schedule(self.cache_manager.data_version, self.warm)
+
     def run(self):
         try:
             filters = self.render_sidebar()
-            self.render_header()
             data = self.load_sample_data(filters['date_range'], filters['categories'], filters['states'])
-            data = self.aggregate_data(data, filters['granularity'])
+            self.render_header(filters)
+            data = self.aggregate_data(data, filters['granularity'], filters)
             if st.session_state.get("_trigger_export"):
                 payload = self.export_data(data, filters['export_format'])
                 if payload:
@@ -532,6 +752,7 @@ class VehicleDashboard:
                 self.render_investment_insights(data, filters)
             else:
                 st.info(f"{filters['analysis_type']} coming soon!")
+            self.schedule_warmup(filters)
             st.markdown("---")
             st.markdown("*Dashboard powered by Streamlit & Plotly | Data source: Vahan Dashboard*")
         except Exception as e:
@@ -0,0 +1,152 @@
+"""Server-side sorting, filtering and paging for large result tables.
+
+A ``PagedTable`` wraps one result frame for the lifetime of a view. Sorting keeps a
+stable argsort per (column, direction); the text filter matches each column's distinct
+values (through its factorization) and maps the hits back to rows; numeric columns are
+only searched for numeric text. The row order
+for a (sort, filter) pair is cached, so turning pages is a positional take of
+``page_size`` rows. After serving a page the next few pages of the same query are
+materialized too, so paging forward is a cache hit. Only the page itself is handed to
+the browser.
+"""
+from __future__ import annotations
+import math
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from config.settings import DASHBOARD_CONFIG
+
+
+@dataclass(frozen=True)
+class TableQuery:
+    """``page`` is zero-based; ``search`` is a case-insensitive substring over all columns."""
+    sort_by: Optional[str] = None
+    ascending: bool = True
+    search: str = ""
+    page: int = 0
+    page_size: int = 50
+
+
+@dataclass
+class TablePage:
+    """``first_row`` is the zero-based position of the page's first row among the matches."""
+    rows: pd.DataFrame
+    page: int
+    pages: int
+    first_row: int
+    matched_rows: int
+    total_rows: int
+
+
+class PagedTable:
+
+    def __init__(self, df: pd.DataFrame, prefetch_pages: Optional[int] = None,
+                 max_pages: int = 64, max_queries: int = 8):
+        # named or multi-level indexes (grouped summaries) become sortable columns
+        self.frame = df if isinstance(df.index, pd.RangeIndex) and df.index.name is None else df.reset_index()
+        self.source = df
+        self.prefetch_pages = prefetch_pages if prefetch_pages is not None else DASHBOARD_CONFIG["table_prefetch_pages"]
+        self.max_pages = max_pages
+        self.max_queries = max_queries
+        self.counters = {"hits": 0, "misses": 0, "prefetched": 0}
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._values: Dict[str, Tuple[np.ndarray, pd.Series]] = {}
+        self._rows: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._pages: "OrderedDict[TableQuery, pd.DataFrame]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    @property
+    def columns(self):
+        return list(self.frame.columns)
+
+    # ---------------- row selection -----------------
+    def _order(self, column: str, ascending: bool) -> np.ndarray:
+        key = (column, ascending)
+        if key not in self._orders:
+            values = self.frame[column].reset_index(drop=True)
+            self._orders[key] = values.sort_values(ascending=ascending, kind='stable',
+                                                   na_position='last').index.to_numpy()
+        return self._orders[key]
+
+    def _matches(self, search: str) -> np.ndarray:
+        needle = search.lower()
+        numeric_needle = needle.lstrip('+-').replace('.', '', 1).replace(',', '').isdigit()
+        mask = np.zeros(len(self.frame), dtype=bool)
+        for column in self.frame.columns:
+            if pd.api.types.is_numeric_dtype(self.frame[column]) and not numeric_needle:
+                continue  # text never matches a number's digits
+            if column not in self._values:
+                codes, uniques = pd.factorize(self.frame[column])
+                self._values[column] = (codes, pd.Series(pd.Index(uniques).astype(str)).str.lower())
+            codes, lowered = self._values[column]
+            hits = lowered.str.contains(needle, regex=False).to_numpy(dtype=bool)
+            if hits.any():
+                mask |= np.append(hits, False)[codes]  # code -1 (missing) never matches
+        return mask
+
+    def rows(self, query: TableQuery) -> np.ndarray:
+        """Positions of the matching rows in display order."""
+        key = (query.sort_by, query.ascending, query.search.strip())
+        with self._lock:
+            cached = self._rows.get(key)
+            if cached is not None:
+                self._rows.move_to_end(key)
+                return cached
+            sort_by, ascending, search = key
+            order = self._order(sort_by, ascending) if sort_by in self.frame.columns else np.arange(len(self.frame))
+            if search:
+                order = order[self._matches(search)[order]]
+            self._rows[key] = order
+            while len(self._rows) > self.max_queries:
+                self._rows.popitem(last=False)
+            return order
+
+    # ---------------- pages -----------------
+    def _materialize(self, query: TableQuery, rows: np.ndarray) -> pd.DataFrame:
+        start = query.page * query.page_size
+        return self.frame.iloc[rows[start:start + query.page_size]]
+
+    def _remember(self, query: TableQuery, rows: pd.DataFrame) -> None:
+        self._pages[query] = rows
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+    def page(self, query: TableQuery) -> TablePage:
+        """One page of the query (clamped to the last page), prefetching the pages after it."""
+        with self._lock:
+            rows = self.rows(query)
+            pages = max(math.ceil(len(rows) / query.page_size), 1)
+            query = replace(query, search=query.search.strip(), page=min(max(query.page, 0), pages - 1))
+            frame = self._pages.get(query)
+            if frame is None:
+                self.counters["misses"] += 1
+                frame = self._materialize(query, rows)
+                self._remember(query, frame)
+            else:
+                self.counters["hits"] += 1
+                self._pages.move_to_end(query)
+            for ahead in range(query.page + 1, min(query.page + 1 + self.prefetch_pages, pages)):
+                upcoming = replace(query, page=ahead)
+                if upcoming not in self._pages:
+                    self._remember(upcoming, self._materialize(upcoming, rows))
+                    self.counters["prefetched"] += 1
+            return TablePage(frame, query.page, pages, query.page * query.page_size, len(rows), len(self.frame))
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "rows": len(self.frame), "cached_pages": len(self._pages),
+                "cached_queries": len(self._rows)}
+
+
+__all__ = [
+    'TableQuery',
+    'TablePage',
+    'PagedTable'
+]
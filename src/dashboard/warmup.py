@@ -0,0 +1,234 @@
+"""Background pre-warming of the most used filter combinations.
+
+Every full dashboard run records its filter combination (date preset x categories x
+states x granularity x view) in a ``UsageTracker``, persisted as JSON so popularity
+survives restarts. Dates are stored relative to the day of use (window length and how
+many days before today it ends), so "last 90 days" stays the same combination tomorrow.
+
+After startup and after each data refresh, the ``WarmupScheduler`` replays the top
+combinations through a caller-supplied ``warm`` function on a background worker pool,
+which fills the shared dataset store, memo and figure caches before a user asks. A run
+is bounded by a combination count and a wall-clock budget; a run for an older data
+version is abandoned when a newer one is scheduled.
+"""
+from __future__ import annotations
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from config.settings import WARMUP_CONFIG
+
+
+@dataclass(frozen=True)
+class FilterCombo:
+    """``span_days``/``end_offset_days`` describe the date range relative to today."""
+    span_days: int
+    end_offset_days: int
+    categories: Tuple[str, ...]
+    states: Tuple[str, ...]
+    granularity: str
+    view: str
+    manufacturers: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_filters(cls, filters: Dict, today: Optional[date] = None) -> "FilterCombo":
+        today = today or date.today()
+        start, end = filters['date_range']
+        return cls(
+            span_days=(end - start).days,
+            end_offset_days=(today - end).days,
+            categories=tuple(sorted(filters['categories'])),
+            states=tuple(sorted(filters['states'])),
+            granularity=filters['granularity'],
+            view=filters['analysis_type'],
+            manufacturers=tuple(filters.get('manufacturers') or ())  # order is part of the chart
+        )
+
+    @classmethod
+    def from_dict(cls, values: Dict) -> "FilterCombo":
+        return cls(**{k: tuple(v) if isinstance(v, list) else v for k, v in values.items()})
+
+    def filters(self, today: Optional[date] = None) -> Dict:
+        """Dashboard filters for this combination as of ``today``."""
+        end = (today or date.today()) - timedelta(days=self.end_offset_days)
+        return {
+            'date_range': (end - timedelta(days=self.span_days), end),
+            'categories': list(self.categories),
+            'states': list(self.states),
+            'granularity': self.granularity,
+            'analysis_type': self.view,
+            'manufacturers': list(self.manufacturers)
+        }
+
+    def token(self) -> str:
+        return json.dumps(asdict(self), sort_keys=True)
+
+
+class UsageTracker:
+
+    def __init__(self, path: Optional[Path] = None, max_entries: Optional[int] = None,
+                 flush_seconds: Optional[float] = None):
+        self.path = Path(path) if path is not None else Path(WARMUP_CONFIG["usage_file"])
+        self.max_entries = max_entries or WARMUP_CONFIG["max_tracked"]
+        self.flush_seconds = flush_seconds if flush_seconds is not None else WARMUP_CONFIG["flush_seconds"]
+        self._counts: Dict[str, Dict] = {}
+        self._dirty = False
+        self._flushed_at = 0.0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            entries = json.loads(self.path.read_text())
+            self._counts = {FilterCombo.from_dict(entry['combo']).token(): entry for entry in entries}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable usage file {self.path}: {e}")
+
+    def record(self, combo: FilterCombo) -> None:
+        """Count one use of ``combo``; the file is rewritten at most every ``flush_seconds``."""
+        with self._lock:
+            entry = self._counts.setdefault(combo.token(), {'combo': asdict(combo), 'hits': 0})
+            entry['hits'] += 1
+            entry['last_used'] = time.time()
+            if len(self._counts) > self.max_entries:
+                # forget the least used, oldest first
+                coldest = min(self._counts, key=lambda t: (self._counts[t]['hits'], self._counts[t]['last_used']))
+                del self._counts[coldest]
+            self._dirty = True
+            due = time.monotonic() - self._flushed_at >= self.flush_seconds
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps(list(self._counts.values()))
+            self._dirty = False
+            self._flushed_at = time.monotonic()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(payload)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Could not persist usage to {self.path}: {e}")
+
+    def top(self, n: int, min_hits: int = 1) -> List[FilterCombo]:
+        """The ``n`` most used combinations, most recent first among ties."""
+        with self._lock:
+            entries = sorted(self._counts.values(), key=lambda e: (e['hits'], e['last_used']), reverse=True)
+        return [FilterCombo.from_dict(e['combo']) for e in entries if e['hits'] >= min_hits][:n]
+
+
+@dataclass
+class WarmupRun:
+    version: str
+    reason: str
+    started: float
+    finished: Optional[float] = None
+    warmed: List[FilterCombo] = field(default_factory=list)
+    failed: List[FilterCombo] = field(default_factory=list)
+    skipped: int = 0
+
+
+class WarmupScheduler:
+
+    def __init__(self, tracker: UsageTracker, top_n: Optional[int] = None,
+                 budget_seconds: Optional[float] = None, max_workers: Optional[int] = None,
+                 min_hits: Optional[int] = None):
+        self.tracker = tracker
+        self.top_n = top_n if top_n is not None else WARMUP_CONFIG["top_combinations"]
+        self.budget_seconds = budget_seconds if budget_seconds is not None else WARMUP_CONFIG["budget_seconds"]
+        self.max_workers = max_workers if max_workers is not None else WARMUP_CONFIG["max_workers"]
+        self.min_hits = min_hits if min_hits is not None else WARMUP_CONFIG["min_hits"]
+        self.last_run: Optional[WarmupRun] = None
+        self._scheduled: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def schedule(self, version: str, warm: Callable[[FilterCombo], None]) -> bool:
+        """Warm the top combinations for ``version`` in the background, once per version.
+        Returns whether a run was started.
+        """
+        with self._lock:
+            if version == self._scheduled or self.top_n <= 0:
+                return False
+            reason = "startup" if self._scheduled is None else "refresh"
+            self._scheduled = version
+            self.tracker.flush()
+            combos = self.tracker.top(self.top_n, self.min_hits)
+            if not combos:
+                return False
+            run = WarmupRun(version, reason, time.monotonic())
+            self._thread = threading.Thread(target=self._run, args=(run, combos, warm),
+                                            name=f"warmup-{version[:8]}", daemon=True)
+            self._thread.start()
+            return True
+
+    def join(self, timeout: Optional[float] = None) -> Optional[WarmupRun]:
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.last_run
+
+    def _run(self, run: WarmupRun, combos: Sequence[FilterCombo], warm: Callable[[FilterCombo], None]) -> None:
+        deadline = run.started + self.budget_seconds
+
+        def task(combo: FilterCombo) -> None:
+            # popularity order; later combinations give way to the budget or a newer version
+            if time.monotonic() > deadline or self._scheduled != run.version:
+                run.skipped += 1
+                return
+            try:
+                warm(combo)
+                run.warmed.append(combo)
+            except Exception as e:
+                run.failed.append(combo)
+                logger.warning(f"Warm-up of {combo} failed: {e}")
+
+        if self.max_workers > 1 and len(combos) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(combos))) as pool:
+                list(pool.map(task, combos))
+        else:
+            for combo in combos:
+                task(combo)
+        run.finished = time.monotonic()
+        self.last_run = run
+        logger.info(f"Warm-up ({run.reason}, {run.version}) warmed {len(run.warmed)} combinations "
+                    f"in {run.finished - run.started:.1f}s; {run.skipped} skipped, {len(run.failed)} failed")
+
+    def stats(self) -> Dict[str, object]:
+        run = self.last_run
+        return {
+            'running': self.running,
+            'scheduled_version': self._scheduled,
+            'warmed': len(run.warmed) if run else 0,
+            'failed': len(run.failed) if run else 0,
+            'skipped': run.skipped if run else 0,
+            'seconds': (run.finished - run.started) if run and run.finished else None
+        }
+
+
+__all__ = [
+    'FilterCombo',
+    'UsageTracker',
+    'WarmupRun',
+    'WarmupScheduler'
+]
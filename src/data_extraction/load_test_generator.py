@@ -0,0 +1,249 @@
+"""Deterministic synthetic national registration data for load tests and benchmarks.
+
+Rows are (date, state, RTO, category, manufacturer) daily counts drawn from a Poisson
+whose mean combines state and RTO size, category mix, manufacturer share, a per-state
+growth trend, weekly and yearly seasonality and festival / fiscal-year spikes. Each
+(year, state) partition is generated from its own ``SeedSequence`` child and written
+to ``year=<y>/state_code=<code>/part-0.parquet``, so output is identical whatever the
+number of worker processes. A ``_manifest.json`` records parameters and partitions.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from config.settings import ANALYTICS_CONFIG, LOAD_TEST_CONFIG, MAJOR_MANUFACTURERS, STATE_RTO_CONFIG
+
+MANIFEST_NAME = "_manifest.json"
+DATA_COLUMNS = ["date", "state", "rto_code", "vehicle_category", "manufacturer", "registrations"]
+
+_TREND_EPOCH = np.datetime64("2020-01-01")
+_CATEGORY_GROWTH = {"2W": 0.05, "3W": 0.12, "4W": 0.08}
+# Monday .. Sunday; most RTOs are shut on Sundays
+_WEEKLY = np.array([1.05, 1.02, 1.0, 1.0, 1.05, 1.12, 0.55])
+# Diwali; Dhanteras, Dussehra and Navratri are placed relative to it
+_DIWALI = {
+    2018: "2018-11-07", 2019: "2019-10-27", 2020: "2020-11-14", 2021: "2021-11-04", 2022: "2022-10-24",
+    2023: "2023-11-12", 2024: "2024-11-01", 2025: "2025-10-20", 2026: "2026-11-08", 2027: "2027-10-29",
+    2028: "2028-10-17",
+}
+
+
+def _manufacturer_axis():
+    """(category, manufacturer, share within category) for every MAJOR_MANUFACTURERS entry."""
+    cats, names, shares = [], [], []
+    for category, manufacturers in MAJOR_MANUFACTURERS.items():
+        weights = 1.0 / np.arange(1, len(manufacturers) + 1) ** 0.8  # lists are ordered by size
+        cats += [category] * len(manufacturers)
+        names += list(manufacturers)
+        shares += list(weights / weights.sum())
+    return np.array(cats, dtype=object), np.array(names, dtype=object), np.array(shares)
+
+
+def rto_codes(state: str, scale: float = 1.0) -> List[str]:
+    """RTO codes of ``state`` (e.g. MH-01); ``scale`` < 1 keeps a leading fraction of them."""
+    code, n_rto, _ = STATE_RTO_CONFIG[state]
+    keep = max(1, int(round(n_rto * scale)))
+    return [f"{code}-{i:02d}" for i in range(1, keep + 1)]
+
+
+def holiday_multiplier(days: np.ndarray, categories: np.ndarray) -> np.ndarray:
+    """(days, categories) demand multiplier for festivals, national holidays and fiscal year end."""
+    days = days.astype("datetime64[D]")
+    out = np.ones((len(days), len(categories)))
+    years = days.astype("datetime64[Y]").astype(int) + 1970
+    month_day = (days - days.astype("datetime64[M]")).astype(int) + 1
+    month = days.astype("datetime64[M]").astype(int) % 12 + 1
+    personal = np.isin(categories, ["2W", "4W"])
+    for year in np.unique(years):
+        diwali = np.datetime64(_DIWALI.get(int(year), f"{year}-11-01"))
+        offset = (days - diwali).astype(int)[:, None]
+        out *= np.where((offset >= -29) & (offset <= -21), 1.4, 1.0)       # Navratri
+        out *= np.where(offset == -20, 2.0, 1.0)                            # Dussehra
+        out *= np.where((offset == -2) & personal, 3.0, 1.0)                # Dhanteras
+        out *= np.where((offset == -1) & personal, 1.6, 1.0)
+        out *= np.where(offset == 0, 0.4, 1.0)                              # Diwali, offices shut
+    commercial = ~personal
+    out *= np.where(((month == 3) & (month_day >= 25))[:, None], np.where(commercial, 1.5, 1.25), 1.0)
+    out *= np.where(((month == 1) & (month_day == 26))[:, None] | ((month == 8) & (month_day == 15))[:, None],
+                    0.3, 1.0)
+    return out
+
+
+def _state_params(state: str, seed: int, n_rto: int, n_mfr: int) -> Dict[str, np.ndarray]:
+    # drawn from a per-state stream so RTO sizes and trends agree across year partitions
+    index = list(STATE_RTO_CONFIG).index(state)
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+    rto_weight = rng.lognormal(0.0, 0.6, size=STATE_RTO_CONFIG[state][1])
+    return {
+        "rto_share": (rto_weight / rto_weight.sum())[:n_rto],
+        "growth_noise": rng.normal(0.0, 0.04, size=n_mfr),
+        "mfr_tilt": rng.lognormal(0.0, 0.25, size=n_mfr),
+    }
+
+
+def generate_partition(state: str, year: int, seed: Optional[int] = None, scale: float = 1.0,
+                       daily_registrations: Optional[float] = None,
+                       start: Optional[date] = None, end: Optional[date] = None) -> pd.DataFrame:
+    """All rows of one (state, year) partition, optionally clipped to [start, end]."""
+    seed = seed if seed is not None else LOAD_TEST_CONFIG["seed"]
+    daily = daily_registrations if daily_registrations is not None else LOAD_TEST_CONFIG["daily_registrations"]
+    lo = max(np.datetime64(f"{year}-01-01"), np.datetime64(start, "D") if start else np.datetime64(f"{year}-01-01"))
+    hi = min(np.datetime64(f"{year}-12-31"), np.datetime64(end, "D") if end else np.datetime64(f"{year}-12-31"))
+    days = np.arange(lo, hi + 1, dtype="datetime64[D]")
+    categories, manufacturers, mfr_share = _manufacturer_axis()
+    rtos = rto_codes(state, scale)
+    params = _state_params(state, seed, len(rtos), len(manufacturers))
+    weights = np.array([w for _, _, w in STATE_RTO_CONFIG.values()])
+    state_share = STATE_RTO_CONFIG[state][2] / weights.sum()
+    mix = np.array([LOAD_TEST_CONFIG["category_mix"][c] for c in categories])
+
+    years_in = (days - _TREND_EPOCH).astype(int) / 365.25
+    growth = np.array([_CATEGORY_GROWTH[c] for c in categories]) + params["growth_noise"]
+    trend = np.exp(years_in[:, None] * growth[None, :])
+    doy = (days - days.astype("datetime64[Y]")).astype(int)
+    yearly = 1.0 + 0.12 * np.cos(2 * np.pi * (doy - 300) / 365.25)
+    weekly = _WEEKLY[(days.astype(int) + 3) % 7]  # 1970-01-01 was a Thursday
+    day_factor = trend * (yearly * weekly)[:, None] * holiday_multiplier(days, categories)
+    mfr_factor = mix * mfr_share * params["mfr_tilt"]
+    lam = daily * state_share * day_factor[:, None, :] * params["rto_share"][None, :, None] * mfr_factor[None, None, :]
+
+    index = list(STATE_RTO_CONFIG).index(state)
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index, int(year))))
+    counts = rng.poisson(lam).astype(np.int32)
+    D, R, M = counts.shape
+    cat_codes, cat_labels = pd.factorize(categories)
+    mfr_codes, mfr_labels = pd.factorize(manufacturers)
+    return pd.DataFrame({
+        "date": np.repeat(days.astype("datetime64[ns]"), R * M),
+        "state": pd.Categorical.from_codes(np.zeros(D * R * M, dtype=np.int8), [state]),
+        "rto_code": pd.Categorical.from_codes(np.tile(np.repeat(np.arange(R, dtype=np.int16), M), D), rtos),
+        "vehicle_category": pd.Categorical.from_codes(np.tile(cat_codes, D * R), cat_labels),
+        "manufacturer": pd.Categorical.from_codes(np.tile(mfr_codes, D * R), mfr_labels),
+        "registrations": counts.ravel(),
+    })
+
+
+def _partition_path(root: Path, state: str, year: int) -> Path:
+    return Path(root) / f"year={year}" / f"state_code={STATE_RTO_CONFIG[state][0]}" / "part-0.parquet"
+
+
+def _write_partition(task: Dict[str, Any]) -> Dict[str, Any]:
+    frame = generate_partition(task["state"], task["year"], task["seed"], task["scale"], task["daily_registrations"])
+    path = _partition_path(task["root"], task["state"], task["year"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    frame.to_parquet(tmp, index=False, compression="zstd")
+    os.replace(tmp, path)
+    return {"state": task["state"], "year": task["year"], "path": str(path.relative_to(task["root"])),
+            "rows": len(frame), "registrations": int(frame["registrations"].sum())}
+
+
+def estimate_rows(states: Optional[Sequence[str]] = None, start_year: Optional[int] = None,
+                  years: Optional[int] = None, scale: float = 1.0) -> int:
+    start_year = start_year or LOAD_TEST_CONFIG["start_year"]
+    years = years or LOAD_TEST_CONFIG["years"]
+    days = (date(start_year + years, 1, 1) - date(start_year, 1, 1)).days
+    n_rto = sum(len(rto_codes(s, scale)) for s in (states or STATE_RTO_CONFIG))
+    return days * n_rto * len(_manufacturer_axis()[0])
+
+
+def generate_dataset(root: Optional[Path] = None, states: Optional[Sequence[str]] = None,
+                     start_year: Optional[int] = None, years: Optional[int] = None, seed: Optional[int] = None,
+                     scale: float = 1.0, daily_registrations: Optional[float] = None,
+                     max_workers: Optional[int] = None, overwrite: bool = False) -> pd.DataFrame:
+    """Write every (year, state) partition under ``root`` and return the partition table.
+    An existing dataset generated with the same parameters is reused unless ``overwrite``.
+    """
+    root = Path(root) if root is not None else Path(LOAD_TEST_CONFIG["output_dir"])
+    params = {
+        "states": sorted(states or STATE_RTO_CONFIG),
+        "start_year": start_year or LOAD_TEST_CONFIG["start_year"],
+        "years": years or LOAD_TEST_CONFIG["years"],
+        "seed": seed if seed is not None else LOAD_TEST_CONFIG["seed"],
+        "scale": float(scale),
+        "daily_registrations": float(daily_registrations or LOAD_TEST_CONFIG["daily_registrations"]),
+    }
+    unknown = set(params["states"]) - set(STATE_RTO_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown states: {sorted(unknown)}")
+    manifest_path = root / MANIFEST_NAME
+    if not overwrite and manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        if manifest.get("params") == params and all((root / p["path"]).exists() for p in manifest["partitions"]):
+            return pd.DataFrame(manifest["partitions"])
+    tasks = [{"root": root, "state": state, "year": year, "seed": params["seed"], "scale": params["scale"],
+              "daily_registrations": params["daily_registrations"]}
+             for year in range(params["start_year"], params["start_year"] + params["years"])
+             for state in params["states"]]
+    max_workers = max_workers if max_workers is not None else ANALYTICS_CONFIG["max_workers"]
+    started = time.perf_counter()
+    if max_workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks))) as pool:
+            partitions = list(pool.map(_write_partition, tasks))
+    else:
+        partitions = [_write_partition(task) for task in tasks]
+    root.mkdir(parents=True, exist_ok=True)
+    tmp = manifest_path.with_name(MANIFEST_NAME + ".tmp")
+    tmp.write_text(json.dumps({"params": params, "partitions": partitions,
+                               "seconds": round(time.perf_counter() - started, 2)}, indent=1))
+    os.replace(tmp, manifest_path)
+    return pd.DataFrame(partitions)
+
+
+def load_dataset(root: Optional[Path] = None, states: Optional[Sequence[str]] = None,
+                 years: Optional[Sequence[int]] = None, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Read a generated dataset back, pruning partitions by state and year."""
+    root = Path(root) if root is not None else Path(LOAD_TEST_CONFIG["output_dir"])
+    filters = []
+    if states is not None:
+        filters.append(("state_code", "in", [STATE_RTO_CONFIG[s][0] for s in states]))
+    if years is not None:
+        filters.append(("year", "in", [int(y) for y in years]))
+    frame = pd.read_parquet(root, columns=list(columns or DATA_COLUMNS), filters=filters or None)
+    return frame.sort_values(["date", "state", "rto_code"], kind="mergesort").reset_index(drop=True)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic national registration dataset")
+    parser.add_argument("--out", type=Path, default=Path(LOAD_TEST_CONFIG["output_dir"]))
+    parser.add_argument("--states", nargs="*", default=None, help="state names (default: all)")
+    parser.add_argument("--start-year", type=int, default=LOAD_TEST_CONFIG["start_year"])
+    parser.add_argument("--years", type=int, default=LOAD_TEST_CONFIG["years"])
+    parser.add_argument("--seed", type=int, default=LOAD_TEST_CONFIG["seed"])
+    parser.add_argument("--scale", type=float, default=1.0, help="fraction of each state's RTOs to include")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args(argv)
+    print(f"Generating ~{estimate_rows(args.states, args.start_year, args.years, args.scale):,} rows into {args.out}")
+    started = time.perf_counter()
+    partitions = generate_dataset(args.out, args.states, args.start_year, args.years, args.seed, args.scale,
+                                  max_workers=args.workers, overwrite=args.overwrite)
+    print(f"{len(partitions)} partitions, {partitions['rows'].sum():,} rows, "
+          f"{partitions['registrations'].sum():,} registrations in {time.perf_counter() - started:.1f}s")
+
+
+__all__ = [
+    'DATA_COLUMNS',
+    'rto_codes',
+    'holiday_multiplier',
+    'generate_partition',
+    'estimate_rows',
+    'generate_dataset',
+    'load_dataset',
+    'main'
+]
+
+
+if __name__ == "__main__":
+    main()
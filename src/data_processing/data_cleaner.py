@@ -54,7 +54,15 @@ class DataProcessor:
         quarterly_df['date'] = quarterly_df['year_quarter'].dt.to_timestamp()
         quarterly_df = quarterly_df.drop('year_quarter', axis=1)
         return quarterly_df
-    
+
+    def rollup_monthly_to_quarterly(self, monthly_df: pd.DataFrame, group_cols: List[str]) -> pd.DataFrame:
+        """Same result as aggregate_daily_to_quarterly, summed from a monthly rollup."""
+        year_quarter = monthly_df['date'].dt.to_period('Q').rename('year_quarter')
+        quarterly_df = monthly_df.groupby([year_quarter] + group_cols)['registrations'].sum().reset_index()
+        quarterly_df['date'] = quarterly_df['year_quarter'].dt.to_timestamp()
+        quarterly_df = quarterly_df.drop('year_quarter', axis=1)
+        return quarterly_df
+
     def calculate_market_share(self, df: pd.DataFrame, group_col: str, date_col: str = 'date') -> pd.DataFrame:
         df_copy = df.copy()
         total_by_date = df_copy.groupby([date_col, 'vehicle_category'])['registrations'].sum().reset_index()
@@ -0,0 +1,313 @@
+"""Incremental analytics pipeline as a DAG of month x entity partitioned artifacts.
+
+Each artifact declares its inputs, the entity column it is partitioned by (or none for
+cross-entity artifacts such as market share) and the window of input months one output
+month reads. When a batch lands, the scheduler derives the dirty (month, entity)
+partitions of every downstream artifact, recomputes each artifact once over just the
+input months it needs and rewrites only those partitions in a Parquet store with a JSON
+manifest. ``dry_run=True`` returns the same plan without touching anything.
+"""
+from __future__ import annotations
+import json
+import os
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from config.settings import CACHE_DIR
+
+DEFAULT_PIPELINE_DIR = CACHE_DIR / "pipeline"
+ALL_ENTITIES = "*"
+WHOLE_MONTH = "_all"
+
+Dirty = Dict[pd.Period, Set[str]]
+
+
+@dataclass
+class Artifact:
+    """A named stage. Sources have no ``compute``; derived artifacts get their inputs as
+    keyword frames. Output month o reads input months [o - months_before, o + months_after].
+    """
+    name: str
+    inputs: Tuple[str, ...] = ()
+    compute: Optional[Callable[..., pd.DataFrame]] = None
+    entity_col: Optional[str] = None
+    months_before: int = 0
+    months_after: int = 0
+    key_cols: Optional[Sequence[str]] = None
+    date_col: str = "date"
+
+    @property
+    def is_source(self) -> bool:
+        return self.compute is None
+
+
+def _months(frame: pd.DataFrame, date_col: str) -> pd.Series:
+    return pd.to_datetime(frame[date_col]).dt.to_period("M")
+
+
+def _entities(frame: pd.DataFrame, artifact: Artifact) -> pd.Series:
+    if artifact.entity_col is None:
+        return pd.Series(WHOLE_MONTH, index=frame.index)
+    return frame[artifact.entity_col].astype(str)
+
+
+def partitions_of(frame: pd.DataFrame, artifact: Artifact) -> Dirty:
+    parts: Dirty = {}
+    if frame.empty:
+        return parts
+    keys = pd.DataFrame({"m": _months(frame, artifact.date_col), "e": _entities(frame, artifact)}).drop_duplicates()
+    for month, entity in keys.itertuples(index=False, name=None):
+        parts.setdefault(month, set()).add(entity)
+    return parts
+
+
+class PartitionStore:
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.manifest_path = self.root / "manifest.json"
+        try:
+            self.manifest: Dict[str, Dict[str, dict]] = json.loads(self.manifest_path.read_text())
+        except Exception:
+            self.manifest = {}
+
+    def _path(self, name: str, month: pd.Period, entity: str) -> Path:
+        return self.root / name / str(month) / f"{quote(entity, safe='')}.parquet"
+
+    def partitions(self, name: str) -> Dirty:
+        parts: Dirty = {}
+        for key in self.manifest.get(name, {}):
+            month, entity = key.split("/", 1)
+            parts.setdefault(pd.Period(month, freq="M"), set()).add(unquote(entity))
+        return parts
+
+    def read(self, name: str, months: Optional[Iterable[pd.Period]] = None,
+             entities: Optional[Set[str]] = None) -> pd.DataFrame:
+        wanted = None if months is None else {str(m) for m in months}
+        frames = []
+        for key in sorted(self.manifest.get(name, {})):
+            month, entity = key.split("/", 1)
+            if wanted is not None and month not in wanted:
+                continue
+            if entities is not None and unquote(entity) not in entities:
+                continue
+            try:
+                frames.append(pd.read_parquet(self.root / name / month / f"{entity}.parquet"))
+            except Exception:
+                continue
+        frames = [f for f in frames if len(f)]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def replace(self, name: str, frame: pd.DataFrame, artifact: Artifact, dirty: Dirty) -> int:
+        """Write ``frame``'s rows for the dirty partitions; dirty partitions it lacks are dropped."""
+        entries = self.manifest.setdefault(name, {})
+        written = 0
+        produced: Dict[Tuple[pd.Period, str], pd.DataFrame] = {}
+        if len(frame):
+            for (month, entity), part in frame.groupby([_months(frame, artifact.date_col), _entities(frame, artifact)],
+                                                       sort=False):
+                ents = dirty.get(month)
+                if ents is not None and (ALL_ENTITIES in ents or entity in ents):
+                    produced[(month, entity)] = part
+        for month, ents in dirty.items():
+            stale = [e for e in self.partitions(name).get(month, set())
+                     if (ALL_ENTITIES in ents or e in ents) and (month, e) not in produced]
+            for entity in stale:
+                self._path(name, month, entity).unlink(missing_ok=True)
+                entries.pop(f"{month}/{quote(entity, safe='')}", None)
+        for (month, entity), part in produced.items():
+            path = self._path(name, month, entity)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            try:
+                part.reset_index(drop=True).to_parquet(tmp, index=False)
+                os.replace(tmp, path)
+            except Exception:
+                tmp.unlink(missing_ok=True)
+                continue
+            entries[f"{month}/{quote(entity, safe='')}"] = {"rows": len(part), "updated": datetime.now().isoformat()}
+            written += 1
+        self._save_manifest()
+        return written
+
+    def _save_manifest(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        tmp.write_text(json.dumps(self.manifest, indent=1, sort_keys=True))
+        os.replace(tmp, self.manifest_path)
+
+
+class Pipeline:
+
+    def __init__(self, root: Optional[Path] = None):
+        self.store = PartitionStore(Path(root or DEFAULT_PIPELINE_DIR))
+        self.artifacts: Dict[str, Artifact] = {}
+        self.counters = {"computes": 0, "partitions_written": 0}
+
+    def add(self, artifact: Artifact) -> "Pipeline":
+        missing = [i for i in artifact.inputs if i not in self.artifacts]
+        if missing:
+            raise ValueError(f"{artifact.name} depends on unregistered artifacts: {missing}")
+        if artifact.is_source == bool(artifact.inputs):
+            raise ValueError(f"{artifact.name}: sources take no inputs and derived artifacts need some")
+        self.artifacts[artifact.name] = artifact
+        return self
+
+    # ---------------- planning -----------------
+
+    def _latest_month(self, name: str, extra: Dirty) -> Optional[pd.Period]:
+        months = set(self.store.partitions(name)) | set(extra)
+        return max(months) if months else None
+
+    def plan(self, touched: Dict[str, Dirty]) -> List[Tuple[str, Dirty]]:
+        """Dirty partitions per artifact in build order (registration order is topological)."""
+        dirty: Dict[str, Dirty] = {name: {m: set(e) for m, e in parts.items()} for name, parts in touched.items()}
+        order = []
+        for name, art in self.artifacts.items():
+            if not art.is_source:
+                out: Dirty = {}
+                for src in art.inputs:
+                    src_dirty = dirty.get(src)
+                    if not src_dirty:
+                        continue
+                    same_entity = art.entity_col is not None and art.entity_col == self.artifacts[src].entity_col
+                    latest = self._latest_month(src, src_dirty)
+                    for month, ents in src_dirty.items():
+                        affected = ents if same_entity and ALL_ENTITIES not in ents else {ALL_ENTITIES}
+                        for k in range(-art.months_after, art.months_before + 1):
+                            target = month + k
+                            if latest is not None and target > latest:
+                                continue
+                            out.setdefault(target, set()).update(affected)
+                if out:
+                    dirty[name] = out
+            if dirty.get(name):
+                order.append((name, dirty[name]))
+        return order
+
+    @staticmethod
+    def plan_frame(plan: List[Tuple[str, Dirty]]) -> pd.DataFrame:
+        rows = [(name, str(month), entity) for name, parts in plan
+                for month in sorted(parts) for entity in sorted(parts[month])]
+        return pd.DataFrame(rows, columns=["artifact", "month", "entity"])
+
+    # ---------------- execution -----------------
+
+    def _inputs_for(self, art: Artifact, parts: Dirty) -> Dict[str, pd.DataFrame]:
+        months = {month + k for month in parts for k in range(-art.months_before, art.months_after + 1)}
+        explicit = set().union(*parts.values())
+        frames = {}
+        for src in art.inputs:
+            filtered = art.entity_col is not None and art.entity_col == self.artifacts[src].entity_col
+            ents = None if (not filtered or ALL_ENTITIES in explicit) else explicit
+            frames[src] = self.store.read(src, months, ents)
+        return frames
+
+    def _execute(self, plan: List[Tuple[str, Dirty]], batches: Dict[str, pd.DataFrame]) -> None:
+        for name, parts in plan:
+            art = self.artifacts[name]
+            if art.is_source:
+                existing = self.store.read(name, parts.keys())
+                frame = pd.concat([f for f in (existing, batches[name]) if len(f)], ignore_index=True)
+                keys = [c for c in (art.key_cols or []) if c in frame.columns]
+                if keys:
+                    frame[art.date_col] = pd.to_datetime(frame[art.date_col])
+                    frame = frame.drop_duplicates(keys, keep="last")
+            else:
+                inputs = self._inputs_for(art, parts)
+                if any(f.empty for f in inputs.values()):
+                    frame = pd.DataFrame()
+                else:
+                    frame = art.compute(**inputs)
+                    self.counters["computes"] += 1
+            self.counters["partitions_written"] += self.store.replace(name, frame, art, parts)
+
+    def ingest(self, batch: pd.DataFrame, source: str = "raw", dry_run: bool = False) -> pd.DataFrame:
+        """Merge a batch into ``source`` and rebuild only the affected downstream partitions.
+        Returns the plan (artifact, month, entity; '*' = every entity of that month).
+        """
+        art = self.artifacts[source]
+        if not art.is_source:
+            raise ValueError(f"{source} is not a source artifact")
+        plan = self.plan({source: partitions_of(batch, art)})
+        if not dry_run:
+            self._execute(plan, {source: batch})
+        return self.plan_frame(plan)
+
+    def rebuild(self, dry_run: bool = False) -> pd.DataFrame:
+        """Recompute every derived artifact from the stored source partitions."""
+        touched = {name: {m: {ALL_ENTITIES} for m in self.store.partitions(name)}
+                   for name, art in self.artifacts.items() if art.is_source}
+        plan = [(name, parts) for name, parts in self.plan(touched) if not self.artifacts[name].is_source]
+        if not dry_run:
+            self._execute(plan, {})
+        return self.plan_frame(plan)
+
+    def load(self, name: str, months: Optional[Iterable[str]] = None,
+             entities: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        months = None if months is None else [pd.Period(m, freq="M") for m in months]
+        return self.store.read(name, months, None if entities is None else set(map(str, entities)))
+
+
+def build_default_pipeline(root: Optional[Path] = None, processor=None, analyzer=None) -> Pipeline:
+    """raw -> cleaned -> daily market share, monthly totals, YoY / QoQ growth, volatility,
+    monthly market share trends -> monthly investment signals.
+    """
+    from src.analytics.growth_calculator import GrowthAnalyzer
+    from src.analytics.signal_backtest import score_signals
+    from src.data_processing.data_cleaner import DataProcessor
+    processor = processor or DataProcessor()
+    analyzer = analyzer or GrowthAnalyzer()
+    entity = "manufacturer"
+    groups = [entity, "vehicle_category"]
+    raw_keys = ["date", "state", "vehicle_category", "manufacturer"]
+
+    def signals(yoy_growth: pd.DataFrame, market_share_trends: pd.DataFrame) -> pd.DataFrame:
+        merged = yoy_growth[["date"] + groups + ["registrations", "yoy_growth"]].merge(
+            market_share_trends[["date"] + groups + ["market_share"]], on=["date"] + groups, how="left")
+        return pd.concat([merged, score_signals(merged)], axis=1)
+
+    def cleaned(raw: pd.DataFrame) -> pd.DataFrame:
+        # rolling stages depend on row order, so pin it regardless of which partitions were read
+        order = [c for c in raw_keys if c in raw.columns]
+        return processor.clean_raw_data(raw).sort_values(order, kind="mergesort")
+
+    def daily_totals(cleaned: pd.DataFrame) -> pd.DataFrame:
+        return cleaned.groupby(["date"] + groups, as_index=False)["registrations"].sum()
+
+    pipeline = Pipeline(root)
+    pipeline.add(Artifact("raw", entity_col=entity, key_cols=raw_keys))
+    pipeline.add(Artifact("cleaned", ("raw",), cleaned, entity))
+    pipeline.add(Artifact("daily_market_share", ("cleaned",),
+                          lambda cleaned: processor.calculate_market_share(cleaned, entity)))
+    pipeline.add(Artifact("monthly", ("cleaned",),
+                          lambda cleaned: processor.aggregate_daily_to_monthly(cleaned, groups), entity))
+    pipeline.add(Artifact("yoy_growth", ("cleaned",),
+                          lambda cleaned: analyzer.calculate_yoy_growth(cleaned, group_cols=groups),
+                          entity, months_before=12))
+    pipeline.add(Artifact("qoq_growth", ("cleaned",),
+                          lambda cleaned: analyzer.calculate_qoq_growth(cleaned, group_cols=groups),
+                          entity, months_before=3, months_after=2))
+    pipeline.add(Artifact("volatility", ("cleaned",),
+                          lambda cleaned: analyzer.calculate_volatility_metrics(daily_totals(cleaned), group_cols=groups),
+                          entity, months_before=2))
+    pipeline.add(Artifact("market_share_trends", ("cleaned",),
+                          lambda cleaned: analyzer.calculate_market_share_trends(cleaned, entity)))
+    pipeline.add(Artifact("signals", ("yoy_growth", "market_share_trends"), signals, entity))
+    return pipeline
+
+
+__all__ = [
+    'Artifact',
+    'PartitionStore',
+    'Pipeline',
+    'build_default_pipeline',
+    'ALL_ENTITIES'
+]
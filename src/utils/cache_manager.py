@@ -0,0 +1,260 @@
+"""Size-bounded, versioned on-disk cache shared by the dashboard, memoization and exports.
+
+Entries are Parquet frames (zstd) or raw bytes under ``root/<namespace>/``, written to a
+temp file and renamed into place. A JSON index records size, last access and hit count
+per entry; when the total passes the byte budget the least recently (LRU) or least
+frequently (LFU) used entries are deleted. Versioned entries are stamped with the data
+version, which is derived from a source signature plus a refresh generation: a changed
+signature or ``bump_version()`` drops every entry written against an older version.
+"""
+from __future__ import annotations
+import atexit
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from config.settings import CACHE_CONFIG, CACHE_DIR
+
+POLICIES = ("lru", "lfu")
+INDEX_NAME = "cache_index.json"
+
+
+def _entry_id(namespace: str, key: str) -> str:
+    return f"{namespace}/{key}"
+
+
+def _safe_name(key: str) -> str:
+    # keys are free-form; anything that is not a plain token is hashed into a file name
+    if key.replace("_", "").replace("-", "").isalnum() and len(key) <= 96:
+        return key
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+class CacheManager:
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: Optional[int] = None,
+                 policy: Optional[str] = None, compression: Optional[str] = None,
+                 flush_seconds: Optional[float] = None):
+        self.root = Path(root) if root is not None else Path(CACHE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else CACHE_CONFIG["disk_max_bytes"]
+        self.policy = policy or CACHE_CONFIG["disk_eviction_policy"]
+        if self.policy not in POLICIES:
+            raise ValueError(f"Unsupported eviction policy: {self.policy}")
+        self.compression = compression or CACHE_CONFIG["disk_compression"]
+        self.flush_seconds = flush_seconds if flush_seconds is not None else CACHE_CONFIG["index_flush_seconds"]
+        self.index_path = self.root / INDEX_NAME
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self._dirty = False
+        self._flushed_at = 0.0
+        self._lock = threading.RLock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    # ---------------- index -----------------
+
+    def _load_index(self) -> None:
+        try:
+            index = json.loads(self.index_path.read_text())
+        except Exception:
+            index = {}
+        self.source = index.get("source")
+        self.generation = int(index.get("generation", 0))
+        self.entries: Dict[str, dict] = {eid: e for eid, e in index.get("entries", {}).items()
+                                         if (self.root / e["file"]).exists()}
+
+    def _save_index(self) -> None:
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        tmp.write_text(json.dumps({"source": self.source, "generation": self.generation,
+                                   "entries": self.entries}, indent=1))
+        os.replace(tmp, self.index_path)
+        self._dirty = False
+        self._flushed_at = time.monotonic()
+
+    def flush(self) -> None:
+        """Persist recency updates from hits that are still held in memory."""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    # ---------------- versions -----------------
+
+    @property
+    def data_version(self) -> str:
+        token = f"{self.source}|{self.generation}"
+        return hashlib.blake2b(token.encode(), digest_size=8).hexdigest()
+
+    def observe_source(self, signature: Any) -> bool:
+        """Record what the cached data was derived from; a new signature invalidates it."""
+        signature = hashlib.blake2b(repr(signature).encode(), digest_size=8).hexdigest()
+        with self._lock:
+            if signature == self.source:
+                return False
+            self.source = signature
+            self.generation = 0
+            self._drop_stale()
+            return True
+
+    def bump_version(self) -> str:
+        """Start a new data generation (e.g. after a manual refresh) and drop older entries."""
+        with self._lock:
+            self.generation += 1
+            self._drop_stale()
+            return self.data_version
+
+    def _drop_stale(self) -> None:
+        version = self.data_version
+        for eid in [eid for eid, e in self.entries.items() if e.get("version") not in (None, version)]:
+            self._remove(eid)
+            self.counters["invalidations"] += 1
+        self._save_index()
+
+    # ---------------- entries -----------------
+
+    def path_for(self, namespace: str, key: str) -> Optional[Path]:
+        entry = self.entries.get(_entry_id(namespace, key))
+        return self.root / entry["file"] if entry is not None else None
+
+    def _remove(self, eid: str) -> None:
+        entry = self.entries.pop(eid, None)
+        if entry is not None:
+            (self.root / entry["file"]).unlink(missing_ok=True)
+
+    def _write(self, namespace: str, key: str, kind: str, writer, versioned: bool) -> Optional[Path]:
+        rel = Path(namespace) / f"{_safe_name(key)}.{'parquet' if kind == 'frame' else 'bin'}"
+        path = self.root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        try:
+            writer(tmp)
+            os.replace(tmp, path)
+        except Exception:
+            tmp.unlink(missing_ok=True)
+            return None
+        now = time.time()
+        with self._lock:
+            self.entries[_entry_id(namespace, key)] = {
+                "file": rel.as_posix(), "kind": kind, "bytes": path.stat().st_size,
+                "version": self.data_version if versioned else None,
+                "created": now, "last_access": now, "hits": 0,
+            }
+            self._evict()
+            self._save_index()
+        return path
+
+    def _touch(self, eid: str) -> Optional[dict]:
+        with self._lock:
+            entry = self.entries.get(eid)
+            if entry is None or entry.get("version") not in (None, self.data_version):
+                self.counters["misses"] += 1
+                return None
+            entry["last_access"] = time.time()
+            entry["hits"] += 1
+            self.counters["hits"] += 1
+            # hits only move recency; the index is rewritten at most every ``flush_seconds``
+            self._dirty = True
+            if time.monotonic() - self._flushed_at >= self.flush_seconds:
+                self._save_index()
+            return entry
+
+    def _evict(self) -> None:
+        total = sum(e["bytes"] for e in self.entries.values())
+        if total <= self.max_bytes:
+            return
+        if self.policy == "lfu":
+            order = sorted(self.entries, key=lambda eid: (self.entries[eid]["hits"], self.entries[eid]["last_access"]))
+        else:
+            order = sorted(self.entries, key=lambda eid: self.entries[eid]["last_access"])
+        for eid in order:
+            if total <= self.max_bytes:
+                break
+            total -= self.entries[eid]["bytes"]
+            self._remove(eid)
+            self.counters["evictions"] += 1
+
+    def put_frame(self, namespace: str, key: str, frame: pd.DataFrame, versioned: bool = True,
+                  keep_index: bool = False) -> Optional[Path]:
+        """Store ``frame`` as zstd Parquet; returns its path, or None if the write failed.
+        With ``keep_index`` the frame's index is stored too and comes back on read.
+        """
+        index = None if keep_index else False
+        return self._write(namespace, key, "frame",
+                           lambda tmp: frame.to_parquet(tmp, index=index, compression=self.compression), versioned)
+
+    def get_frame(self, namespace: str, key: str, filters: Optional[List[tuple]] = None) -> Optional[pd.DataFrame]:
+        """The stored frame (optionally with Parquet filters pushed down), or None on a miss."""
+        eid = _entry_id(namespace, key)
+        entry = self._touch(eid)
+        if entry is None:
+            return None
+        try:
+            return pd.read_parquet(self.root / entry["file"], filters=filters)
+        except Exception:
+            with self._lock:
+                self._remove(eid)
+                self._save_index()
+            return None
+
+    def put_bytes(self, namespace: str, key: str, data: bytes, versioned: bool = True) -> Optional[Path]:
+        return self._write(namespace, key, "bytes", lambda tmp: Path(tmp).write_bytes(data), versioned)
+
+    def get_bytes(self, namespace: str, key: str) -> Optional[bytes]:
+        eid = _entry_id(namespace, key)
+        entry = self._touch(eid)
+        if entry is None:
+            return None
+        try:
+            return (self.root / entry["file"]).read_bytes()
+        except Exception:
+            with self._lock:
+                self._remove(eid)
+                self._save_index()
+            return None
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._remove(_entry_id(namespace, key))
+            self._save_index()
+
+    def invalidate(self, namespace: Optional[str] = None) -> int:
+        """Delete every entry (of ``namespace``, if given); returns how many were removed."""
+        with self._lock:
+            doomed = [eid for eid in self.entries if namespace is None or eid.startswith(namespace + "/")]
+            for eid in doomed:
+                self._remove(eid)
+            self.counters["invalidations"] += len(doomed)
+            self._save_index()
+            return len(doomed)
+
+    def stats(self) -> Dict[str, Union[int, str]]:
+        with self._lock:
+            return dict(self.counters, entries=len(self.entries),
+                        bytes=sum(e["bytes"] for e in self.entries.values()),
+                        max_bytes=self.max_bytes, policy=self.policy, data_version=self.data_version)
+
+
+_shared_manager: Optional[CacheManager] = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache_manager() -> CacheManager:
+    """Process-wide manager over ``CACHE_DIR`` so every cache draws on one disk budget."""
+    global _shared_manager
+    with _shared_lock:
+        if _shared_manager is None:
+            _shared_manager = CacheManager()
+            atexit.register(_shared_manager.flush)
+        return _shared_manager
+
+
+__all__ = [
+    'CacheManager',
+    'shared_cache_manager'
+]
@@ -1,9 +1,10 @@
 from __future__ import annotations
+import hashlib
 import pandas as pd
 from io import BytesIO
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Dict, Optional
 
 try:
     from fpdf import FPDF
@@ -69,22 +70,38 @@ def export_to_pdf(df: pd.DataFrame) -> bytes:
     return bytes(pdf.output(dest="S"))
 
 
-def build_export_payload(df: pd.DataFrame, fmt: str, base_name: str) -> Dict[str, Any]:
+def _export_cache_key(df: pd.DataFrame, fmt: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr([fmt] + [(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def build_export_payload(df: pd.DataFrame, fmt: str, base_name: str, cache: Optional[Any] = None) -> Dict[str, Any]:
+    """Export bytes, mime type and a timestamped file name. With ``cache`` (a CacheManager)
+    CSV and Excel bytes are reused for identical frames; PDFs embed their generation time.
+    """
     fmt_lower = fmt.lower()
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     if fmt_lower in ("csv",):
-        data = export_to_csv(df)
+        writer = export_to_csv
         mime = "text/csv"
         ext = "csv"
     elif fmt_lower in ("xlsx", "excel"):
-        data = export_to_excel(df)
+        writer = export_to_excel
         mime = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         ext = "xlsx"
     elif fmt_lower in ("pdf",):
-        data = export_to_pdf(df)
+        writer = export_to_pdf
         mime = "application/pdf"
         ext = "pdf"
     else:
         raise ValueError(f"Unsupported export format: {fmt}")
+    key = _export_cache_key(df, ext) if cache is not None and ext != "pdf" else None
+    data = cache.get_bytes("export", key) if key else None
+    if data is None:
+        data = writer(df)
+        if key:
+            cache.put_bytes("export", key, data)
     filename = f"{base_name}_{timestamp}.{ext}"
     return {"data": data, "mime": mime, "filename": filename}
@@ -0,0 +1,288 @@
+"""Content-fingerprinted memoization for analytics results.
+
+Results are keyed by a frame fingerprint (schema, row count and a hash of the index
+and every column, salted with the ``data_version`` when one is known) plus the call
+parameters.
+Entries live in a size-bounded in-memory LRU with an optional Parquet tier on disk,
+either a plain directory or a shared, budgeted ``CacheManager``.
+"""
+from __future__ import annotations
+import hashlib
+import inspect
+import sys
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from config.settings import CACHE_CONFIG
+from src.utils.cache_manager import CacheManager, shared_cache_manager
+
+_MISSING = object()
+
+
+def frame_fingerprint(df: pd.DataFrame, key_cols: Optional[Sequence[str]] = None,
+                      data_version: Optional[str] = None) -> str:
+    """Identity of a frame: schema + row count + a hash of the index and of ``key_cols``
+    (every column when None). A ``data_version`` (argument or ``df.attrs['data_version']``)
+    is mixed in as well, never in place of the content: derived frames keep the attrs.
+    """
+    version = data_version if data_version is not None else df.attrs.get('data_version')
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    h.update(str(len(df)).encode())
+    if version is not None:
+        h.update(f"version={version}".encode())
+    if len(df):
+        if isinstance(df.index, pd.RangeIndex):
+            h.update(repr(df.index).encode())
+        else:
+            for level in range(df.index.nlevels):
+                _update_column(h, df.index.get_level_values(level).to_series())
+        for col in (list(df.columns) if key_cols is None else [c for c in key_cols if c in df.columns]):
+            h.update(repr(col).encode())
+            _update_column(h, df[col])
+    return h.hexdigest()
+
+
+def _update_column(h: "hashlib._Hash", values: pd.Series) -> None:
+    # numeric and datetime buffers hash as raw bytes; anything else (strings, categoricals,
+    # nullable types) through its factorization, which is far cheaper than hashing each value
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biufcmM':
+        h.update(np.ascontiguousarray(values.to_numpy()).tobytes())
+        return
+    codes, uniques = pd.factorize(values)
+    h.update(codes.tobytes())
+    h.update(pd.util.hash_array(np.asarray(uniques, dtype=object)).tobytes())
+
+
+def _param_token(value: Any) -> str:
+    if isinstance(value, pd.DataFrame):
+        return f"df:{frame_fingerprint(value)}"
+    if isinstance(value, pd.Series):
+        return f"series:{frame_fingerprint(value.to_frame())}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_param_token(v) for v in value) + "]"
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{k!r}:{_param_token(v)}" for k, v in sorted(value.items(), key=lambda kv: repr(kv[0]))) + "}"
+    return repr(value)
+
+
+def _nbytes(value: Any) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _copy_value(value: Any) -> Any:
+    # callers mutate returned frames freely, so never hand out the cached object
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return value.copy()
+    if isinstance(value, dict):
+        return {k: _copy_value(v) for k, v in value.items()}
+    return value
+
+
+class MemoCache:
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 disk_dir: Optional[Path] = None, store: Optional[CacheManager] = None):
+        self.max_entries = max_entries if max_entries is not None else CACHE_CONFIG["memo_max_entries"]
+        self.max_bytes = max_bytes if max_bytes is not None else CACHE_CONFIG["memo_max_bytes"]
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self.store = store
+        self.data_version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.bytes_held = 0
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def make_key(self, namespace: str, *parts: Any) -> str:
+        token = "|".join([namespace, str(self.data_version)] + [_param_token(p) for p in parts])
+        return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy_value(entry[0])
+        value = self._read_disk(key)
+        with self._lock:
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.disk_hits += 1
+            self._store(key, value)
+        return _copy_value(value)
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._store(key, _copy_value(value))
+        self._write_disk(key, value)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def observe_version(self, version: Optional[str]) -> bool:
+        """Switch to ``version``; drops every entry computed against another version."""
+        if version is None or version == self.data_version:
+            return False
+        with self._lock:
+            self.data_version = version
+            self._entries.clear()
+            self.bytes_held = 0
+        if self.store is not None:
+            self.store.invalidate("memo")
+        if self.disk_dir is not None:
+            tag = self._version_tag()
+            for fp in self.disk_dir.glob("*.parquet"):
+                if not fp.name.startswith(tag + "__"):
+                    fp.unlink(missing_ok=True)
+        return True
+
+    def clear(self, disk: bool = True) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes_held = 0
+        if disk and self.store is not None:
+            self.store.invalidate("memo")
+        if disk and self.disk_dir is not None:
+            for fp in self.disk_dir.glob("*.parquet"):
+                fp.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'disk_hits': self.disk_hits,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'bytes_held': self.bytes_held,
+            'max_bytes': self.max_bytes,
+            'data_version': self.data_version
+        }
+
+    def _store(self, key: str, value: Any) -> None:
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes_held -= old[1]
+        self._entries[key] = (value, size)
+        self.bytes_held += size
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes_held > self.max_bytes):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes_held -= evicted
+
+    def _version_tag(self) -> str:
+        return hashlib.blake2b(str(self.data_version).encode(), digest_size=6).hexdigest()
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{self._version_tag()}__{key}.parquet"
+
+    def _read_disk(self, key: str) -> Any:
+        if self.store is not None:
+            frame = self.store.get_frame("memo", f"{self._version_tag()}__{key}")
+            return _MISSING if frame is None else frame
+        if self.disk_dir is None:
+            return _MISSING
+        path = self._disk_path(key)
+        if not path.exists():
+            return _MISSING
+        try:
+            return pd.read_parquet(path)
+        except Exception:
+            path.unlink(missing_ok=True)
+            return _MISSING
+
+    def _write_disk(self, key: str, value: Any) -> None:
+        # only frames go to the Parquet tier; dicts and scalars stay in memory
+        if not isinstance(value, pd.DataFrame):
+            return
+        if self.store is not None:
+            # the store key carries this cache's own version tag and observe_version clears the
+            # namespace, so the store's generation counter is not consulted
+            self.store.put_frame("memo", f"{self._version_tag()}__{key}", value, versioned=False, keep_index=True)
+            return
+        if self.disk_dir is None:
+            return
+        try:
+            value.to_parquet(self._disk_path(key))
+        except Exception:
+            pass
+
+
+def memoized(method: Callable) -> Callable:
+    """Memoize a method through ``self.cache`` (a MemoCache); no-op when it is None."""
+    signature = inspect.signature(method)
+    namespace = method.__qualname__
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = getattr(self, 'cache', None)
+        if cache is None:
+            return method(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        params = list(bound.arguments.items())[1:]
+        for _, value in params:
+            if isinstance(value, pd.DataFrame):
+                cache.observe_version(value.attrs.get('data_version'))
+        key = cache.make_key(namespace, params)
+        result = cache.get(key, _MISSING)
+        if result is not _MISSING:
+            return result
+        result = method(self, *args, **kwargs)
+        cache.put(key, result)
+        return result
+
+    return wrapper
+
+
+_shared_cache: Optional[MemoCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_memo_cache() -> MemoCache:
+    """Process-wide cache used by the dashboard so reruns and sessions share results."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            store = shared_cache_manager() if CACHE_CONFIG.get("memo_disk_tier") else None
+            _shared_cache = MemoCache(store=store)
+        return _shared_cache
+
+
+__all__ = [
+    'frame_fingerprint',
+    'MemoCache',
+    'memoized',
+    'shared_memo_cache'
+]
@@ -0,0 +1,233 @@
+"""Superset-aware Parquet segment cache for (date range x dimension filter) queries.
+
+Every cached segment records its date span and the dimension values it holds. A query
+is answered from segments whose dimensions are a superset of the request: their files
+are read with Parquet filters on date and dimensions (predicate pushdown), and only the
+date gaps no segment covers are loaded. Segments with identical dimensions that overlap
+or touch are merged into one deduplicated file. With a ``CacheManager`` as ``store`` the
+segment files live under its byte budget and the cache follows its data version.
+"""
+from __future__ import annotations
+import json
+import os
+import sys
+import threading
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.utils.cache_manager import CacheManager
+
+Loader = Callable[[date, date, Dict[str, List[str]]], pd.DataFrame]
+
+
+def _as_date(value) -> date:
+    return pd.Timestamp(value).date()
+
+
+class SegmentCache:
+
+    def __init__(self, root: Path, namespace: str, dims: Sequence[str], key_cols: Optional[Sequence[str]] = None,
+                 date_col: str = "date", version: str = "v1", store: Optional[CacheManager] = None):
+        self.root = Path(root)
+        self.namespace = namespace
+        self.dims = list(dims)
+        self.key_cols = list(key_cols) if key_cols else None
+        self.date_col = date_col
+        self.store = store
+        self.version = store.data_version if store is not None else str(version)
+        self.manifest_path = self.root / f"{namespace}_segments.json"
+        self.counters = {"hits": 0, "partial": 0, "misses": 0, "merges": 0}
+        self._lock = threading.RLock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.segments: List[dict] = self._load_manifest()
+
+    # ---------------- manifest -----------------
+
+    def _load_manifest(self) -> List[dict]:
+        try:
+            manifest = json.loads(self.manifest_path.read_text())
+        except Exception:
+            return []
+        if manifest.get("version") != self.version:
+            for seg in manifest.get("segments", []):
+                self._delete(seg)
+            return []
+        return [s for s in manifest.get("segments", []) if self._exists(s)]
+
+    def _save_manifest(self) -> None:
+        tmp = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        tmp.write_text(json.dumps({"version": self.version, "segments": self.segments}, indent=1))
+        os.replace(tmp, self.manifest_path)
+
+    # ---------------- segment files -----------------
+
+    def _exists(self, seg: dict) -> bool:
+        if self.store is not None:
+            return self.store.path_for(self.namespace, seg["file"]) is not None
+        return (self.root / seg["file"]).exists()
+
+    def _delete(self, seg: dict) -> None:
+        if self.store is not None:
+            self.store.delete(self.namespace, seg["file"])
+        else:
+            (self.root / seg["file"]).unlink(missing_ok=True)
+
+    def _read_file(self, seg: dict, filters: Optional[list] = None) -> pd.DataFrame:
+        if self.store is None:
+            return pd.read_parquet(self.root / seg["file"], filters=filters)
+        frame = self.store.get_frame(self.namespace, seg["file"], filters=filters)
+        if frame is None:
+            raise FileNotFoundError(seg["file"])
+        return frame
+
+    def _sync_version(self) -> None:
+        # the store may have moved to a new data version since the manifest was loaded
+        if self.store is not None and self.store.data_version != self.version:
+            self.version = self.store.data_version
+            self.segments = []
+            self._save_manifest()
+
+    # ---------------- segments -----------------
+
+    def _covers_dims(self, seg: dict, dims: Dict[str, List[str]]) -> bool:
+        return all(set(values) <= set(seg["dims"].get(dim, [])) for dim, values in dims.items())
+
+    @staticmethod
+    def _gaps(start: date, end: date, spans: List[Tuple[date, date]]) -> List[Tuple[date, date]]:
+        gaps, cursor = [], start
+        for lo, hi in sorted(spans):
+            if hi < cursor:
+                continue
+            if lo > end:
+                break
+            if lo > cursor:
+                gaps.append((cursor, lo - timedelta(days=1)))
+            cursor = max(cursor, hi + timedelta(days=1))
+            if cursor > end:
+                break
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def _read(self, seg: dict, start: date, end: date, dims: Dict[str, List[str]]) -> pd.DataFrame:
+        filters = [(self.date_col, ">=", pd.Timestamp(start)), (self.date_col, "<=", pd.Timestamp(end))]
+        filters += [(dim, "in", list(values)) for dim, values in dims.items()]
+        return self._read_file(seg, filters)
+
+    def _dedupe(self, frame: pd.DataFrame) -> pd.DataFrame:
+        keys = [c for c in (self.key_cols or []) if c in frame.columns]
+        frame = frame.drop_duplicates(keys or None, keep="last")
+        if self.date_col in frame.columns:
+            # Parquet round trips may change the datetime unit; hits and misses should match
+            frame[self.date_col] = pd.to_datetime(frame[self.date_col]).astype("datetime64[ns]")
+        return frame.sort_values(keys or [self.date_col], kind="mergesort").reset_index(drop=True)
+
+    def _write(self, frame: pd.DataFrame, start: date, end: date, dims: Dict[str, List[str]]) -> Optional[dict]:
+        seg = {"file": f"{self.namespace}_{uuid.uuid4().hex[:12]}.parquet", "start": str(start), "end": str(end),
+               "dims": {d: sorted(map(str, v)) for d, v in dims.items()}, "rows": len(frame)}
+        if self.store is not None:
+            return seg if self.store.put_frame(self.namespace, seg["file"], frame) is not None else None
+        path = self.root / seg["file"]
+        tmp = path.with_name(path.name + ".tmp")
+        try:
+            frame.to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+        except Exception:
+            tmp.unlink(missing_ok=True)
+            return None
+        return seg
+
+    def _span(self, seg: dict) -> Tuple[date, date]:
+        return date.fromisoformat(seg["start"]), date.fromisoformat(seg["end"])
+
+    def _merge_equal_dims(self, seg: dict) -> None:
+        """Fold every segment with the same dims that overlaps or touches ``seg`` into one file."""
+        while True:
+            lo, hi = self._span(seg)
+            partner = next((s for s in self.segments if s is not seg and s["dims"] == seg["dims"]
+                            and self._span(s)[0] <= hi + timedelta(days=1)
+                            and self._span(s)[1] >= lo - timedelta(days=1)), None)
+            if partner is None:
+                return
+            p_lo, p_hi = self._span(partner)
+            try:
+                # the newer segment wins on duplicate keys
+                frame = self._dedupe(pd.concat([self._read_file(partner), self._read_file(seg)], ignore_index=True))
+            except Exception:
+                return
+            merged = self._write(frame, min(lo, p_lo), max(hi, p_hi), seg["dims"])
+            if merged is None:
+                return
+            for old in (seg, partner):
+                self.segments.remove(old)
+                self._delete(old)
+            self.segments.append(merged)
+            self.counters["merges"] += 1
+            seg = merged
+
+    # ---------------- public -----------------
+
+    def query(self, start, end, dims: Dict[str, Sequence[str]], loader: Loader) -> pd.DataFrame:
+        """Rows in [start, end] whose dims are in the requested values, loading only uncovered days.
+        ``loader(start, end, dims)`` must return the rows for that span and dims.
+        """
+        start, end = _as_date(start), _as_date(end)
+        dims = {d: sorted(map(str, dims.get(d, []))) for d in self.dims}
+        if start > end or any(not v for v in dims.values()):
+            return loader(start, end, dims)
+        with self._lock:
+            self._sync_version()
+            supersets = [s for s in self.segments if self._covers_dims(s, dims)
+                         and self._span(s)[0] <= end and self._span(s)[1] >= start]
+            gaps = self._gaps(start, end, [self._span(s) for s in supersets])
+            if not gaps:
+                self.counters["hits"] += 1
+            elif supersets:
+                self.counters["partial"] += 1
+            else:
+                self.counters["misses"] += 1
+            frames = []
+            dropped = False
+            for seg in supersets:
+                try:
+                    frames.append(self._read(seg, start, end, dims))
+                except Exception:
+                    # unreadable segment: forget it and reload its days
+                    self.segments.remove(seg)
+                    self._delete(seg)
+                    dropped = True
+                    gaps = self._gaps(start, end, [self._span(s) for s in supersets if s in self.segments])
+            for lo, hi in gaps:
+                fresh = loader(lo, hi, dims)
+                frames.append(fresh)
+                seg = self._write(fresh, lo, hi, dims)
+                if seg is not None:
+                    self.segments.append(seg)
+                    self._merge_equal_dims(seg)
+            if gaps or dropped:
+                self._save_manifest()
+        non_empty = [f for f in frames if len(f)]
+        if not non_empty:
+            return frames[0] if frames else pd.DataFrame()
+        return self._dedupe(pd.concat(non_empty, ignore_index=True))
+
+    def clear(self) -> None:
+        with self._lock:
+            for seg in self.segments:
+                self._delete(seg)
+            self.segments = []
+            self._save_manifest()
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters, segments=len(self.segments),
+                    rows_cached=sum(int(s.get("rows", 0)) for s in self.segments))
+
+
+__all__ = [
+    'SegmentCache'
+]
@@ -0,0 +1,129 @@
+"""Concurrent assembly of several charts over one frame.
+
+Each chart in a batch reads the frame at some grain: additive charts (trends, heatmap)
+only need registrations summed over a few dimensions, snapshot charts (market share,
+growth) only the latest date. The batch computes one rollup over the union of the
+additive grains and one latest-date slice, hands every chart the smallest shared input
+that still gives it identical results, then builds the figures on a thread pool (the
+pandas/NumPy work releases the GIL). Timings are reported per chart.
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from config.settings import ANALYTICS_CONFIG
+
+LATEST = "latest"
+
+
+def _trends_grain(columns: Sequence[str]) -> Tuple[str, ...]:
+    return ('date', 'vehicle_category') if 'vehicle_category' in columns else ('date',)
+
+
+def _heatmap_grain(columns: Sequence[str]) -> Tuple[str, ...]:
+    for entity in ('state', 'manufacturer'):
+        if entity in columns and 'vehicle_category' in columns:
+            return entity, 'vehicle_category'
+    return ('date',)
+
+
+# what each chart reads: registrations summed over a grain, the latest-date rows, or
+# (missing here) the frame as given
+CHART_INPUTS: Dict[str, Union[str, Callable[[Sequence[str]], Tuple[str, ...]]]] = {
+    'registration_trends_chart': _trends_grain,
+    'heatmap': _heatmap_grain,
+    'market_share_pie_chart': LATEST,
+    'growth_metrics_chart': LATEST,
+}
+
+
+@dataclass
+class ChartSpec:
+    chart: str
+    args: Tuple[Any, ...] = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ChartBatch:
+    """``timings`` holds seconds per chart; ``shared_seconds`` the rollup and slice."""
+    figures: Dict[str, Any]
+    timings: Dict[str, float]
+    shared_seconds: float
+    wall_seconds: float
+
+
+def _input_kind(spec: ChartSpec, columns: Sequence[str]):
+    kind = CHART_INPUTS.get(spec.chart)
+    if kind is None:
+        return None
+    if kind == LATEST:
+        # a market-share category filter picks its own latest date
+        filtered = spec.chart == 'market_share_pie_chart' and (spec.args or spec.kwargs.get('category'))
+        return None if filtered else LATEST
+    # the rollup only carries summed registrations
+    if spec.chart == 'heatmap' and spec.kwargs.get('value_col', 'registrations') != 'registrations':
+        return None
+    if 'registrations' not in columns:
+        return None
+    return kind(columns)
+
+
+def shared_inputs(df: pd.DataFrame, specs: Dict[str, ChartSpec]) -> Dict[str, pd.DataFrame]:
+    """Input frame per spec name, from one rollup and one latest-date slice."""
+    columns = list(df.columns)
+    kinds = {name: _input_kind(spec, columns) for name, spec in specs.items()}
+    grains = [kind for kind in kinds.values() if isinstance(kind, tuple)]
+    rollup = None
+    if grains:
+        dims = [c for c in columns if any(c in grain for grain in grains)]
+        rollup = df.groupby(dims, observed=True, sort=False)['registrations'].sum().reset_index()
+    latest = df[df['date'] == df['date'].max()] if LATEST in kinds.values() else None
+    inputs = {}
+    for name, kind in kinds.items():
+        inputs[name] = rollup if isinstance(kind, tuple) else latest if kind == LATEST else df
+    return inputs
+
+
+def build_charts(visualizer, df: pd.DataFrame, specs: Dict[str, ChartSpec],
+                 max_workers: Optional[int] = None) -> ChartBatch:
+    """Build every spec (``visualizer.figure(spec.chart, frame, *spec.args, **spec.kwargs)``)."""
+    max_workers = max_workers if max_workers is not None else ANALYTICS_CONFIG["max_workers"]
+    started = time.perf_counter()
+    inputs = shared_inputs(df, specs)
+    shared_seconds = time.perf_counter() - started
+
+    def build(name: str) -> Tuple[Any, float]:
+        spec = specs[name]
+        t0 = time.perf_counter()
+        fig = visualizer.figure(spec.chart, inputs[name], *spec.args, **spec.kwargs)
+        return fig, time.perf_counter() - t0
+
+    names: List[str] = list(specs)
+    if max_workers > 1 and len(names) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(names))) as pool:
+            results = list(pool.map(build, names))
+    else:
+        results = [build(name) for name in names]
+    return ChartBatch(
+        figures={name: fig for name, (fig, _) in zip(names, results)},
+        timings={name: seconds for name, (_, seconds) in zip(names, results)},
+        shared_seconds=shared_seconds,
+        wall_seconds=time.perf_counter() - started
+    )
+
+
+__all__ = [
+    'CHART_INPUTS',
+    'ChartSpec',
+    'ChartBatch',
+    'shared_inputs',
+    'build_charts'
+]
@@ -1,7 +1,7 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import sys
 import os
 
@@ -15,11 +15,16 @@ except ImportError:
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from config.settings import VEHICLE_CATEGORIES, DASHBOARD_CONFIG
+from src.visualizations.downsampling import downsample_columns, line_mode, series_window, trace_class
+from src.visualizations.chart_batch import ChartBatch, ChartSpec, build_charts
+from src.visualizations.figure_cache import FigureCache, SerializedFigure
 
 
 class VehicleDataVisualizer:
     
-    def __init__(self):
+    def __init__(self, cache: Optional[FigureCache] = None, theme: str = 'plotly_white'):
+        self.cache = cache
+        self.theme = theme
         self.color_palette = {
             "2W": "#FF6B6B",
             "3W": "#4ECDC4", 
@@ -29,40 +34,83 @@ class VehicleDataVisualizer:
             "neutral": "#95A5A6"
         }
         
-    def create_registration_trends_chart(self, df: pd.DataFrame, title: str = "Vehicle Registration Trends") -> go.Figure:
+    def figure(self, chart: str, *args, **kwargs) -> go.Figure:
+        """``create_<chart>(*args, **kwargs)``; with a cache, the serialized figure is reused
+        while the inputs match and comes back as a ``SerializedFigure``.
+        """
+        build = getattr(self, f"create_{chart}")
+        if self.cache is None:
+            return build(*args, **kwargs)
+        payload = self.cache.get_or_build(chart, [args, kwargs], self.theme, lambda: build(*args, **kwargs))
+        return SerializedFigure(payload)
+
+    def build_charts(self, df: pd.DataFrame, specs: Dict[str, ChartSpec],
+                     max_workers: Optional[int] = None) -> ChartBatch:
+        """Build several charts over ``df`` concurrently from shared aggregations."""
+        return build_charts(self, df, specs, max_workers)
+
+    @staticmethod
+    def daily_pivot(df: pd.DataFrame, columns: List[str], value_col: str = 'registrations') -> pd.DataFrame:
+        """Date-indexed wide frame with one column per combination of ``columns`` (a tuple
+        for several), built from a single groupby; dates a combination lacks are NaN.
+        """
+        if not columns:
+            return df.groupby('date')[value_col].sum().to_frame(value_col)
+        grouped = df.groupby(['date'] + columns, sort=False, observed=True)[value_col].sum()
+        return grouped.unstack(columns if len(columns) > 1 else columns[0]).sort_index()
+
+    def _add_line_traces(self, fig: go.Figure, pivot: pd.DataFrame,
+                         traces: List[Tuple[Any, str, Dict, int, Optional[str]]],
+                         x_range: Optional[Tuple] = None, max_points: Optional[int] = None) -> None:
+        """One line per (pivot column, name, line, marker size, hovertemplate), cut to
+        ``x_range`` and downsampled; WebGL traces once the figure is large.
+        """
+        window = series_window(pivot, x_range)
+        positions = window.columns.get_indexer([key for key, *_ in traces])
+        values = window.to_numpy(dtype=float)[:, positions]
+        trace = trace_class(int(np.count_nonzero(~np.isnan(values))))
+        reduced = downsample_columns(window.index.values, values, max_points)
+        fig.add_traces([
+            trace(
+                x=x,
+                y=y,
+                mode=line_mode(len(x)),
+                name=name,
+                line=line,
+                marker=dict(size=marker_size),
+                hovertemplate=hovertemplate
+            )
+            for (x, y), (_, name, line, marker_size, hovertemplate) in zip(reduced, traces)
+        ])
+        if x_range is not None:
+            fig.update_xaxes(range=[pd.Timestamp(x_range[0]), pd.Timestamp(x_range[1])])
+
+    @staticmethod
+    def _hovertemplate(name: str) -> str:
+        return (f'<b>{name}</b><br>' +
+                'Date: %{x}<br>' +
+                'Registrations: %{y:,.0f}<br>' +
+                '<extra></extra>')
+
+    def create_registration_trends_chart(self, df: pd.DataFrame, title: str = "Vehicle Registration Trends",
+                                         x_range: Optional[Tuple] = None,
+                                         max_points: Optional[int] = None) -> go.Figure:
         fig = go.Figure()
         if 'vehicle_category' in df.columns:
-            for category in df['vehicle_category'].unique():
-                category_data = df[df['vehicle_category'] == category]
-                daily_data = category_data.groupby('date')['registrations'].sum().reset_index()
-                fig.add_trace(go.Scatter(
-                    x=daily_data['date'],
-                    y=daily_data['registrations'],
-                    mode='lines+markers',
-                    name=category,
-                    line=dict(color=self.color_palette.get(category, "#666666"), width=3),
-                    marker=dict(size=6),
-                    hovertemplate=f'<b>{category}</b><br>' +
-                                 'Date: %{x}<br>' +
-                                 'Registrations: %{y:,.0f}<br>' +
-                                 '<extra></extra>'
-                ))
+            pivot = self.daily_pivot(df, ['vehicle_category'])
+            traces = [(category, category, dict(color=self.color_palette.get(category, "#666666"), width=3), 6,
+                       self._hovertemplate(category))
+                      for category in df['vehicle_category'].unique() if category in pivot.columns]
         else:
-            daily_data = df.groupby('date')['registrations'].sum().reset_index()
-            fig.add_trace(go.Scatter(
-                x=daily_data['date'],
-                y=daily_data['registrations'],
-                mode='lines+markers',
-                name='Total Registrations',
-                line=dict(color=self.color_palette["4W"], width=3),
-                marker=dict(size=6)
-            ))
+            pivot = self.daily_pivot(df, [])
+            traces = [('registrations', 'Total Registrations', dict(color=self.color_palette["4W"], width=3), 6, None)]
+        self._add_line_traces(fig, pivot, traces, x_range, max_points)
         fig.update_layout(
             title=dict(text=title, x=0.5, font=dict(size=20)),
             xaxis_title="Date",
             yaxis_title="Registrations",
             hovermode='x unified',
-            template='plotly_white',
+            template=self.theme,
             height=500,
             showlegend=True,
             legend=dict(
@@ -114,7 +162,7 @@ class VehicleDataVisualizer:
             title=dict(text=f"{metric_title} by {entity_col.title()}", x=0.5, font=dict(size=18)),
             xaxis_title=f"{metric_title} (%)",
             yaxis_title=entity_col.title(),
-            template='plotly_white',
+            template=self.theme,
             height=max(400, len(plot_data) * 30),
             showlegend=False
         )
@@ -123,13 +171,13 @@ class VehicleDataVisualizer:
     
     def create_market_share_pie_chart(self, df: pd.DataFrame, category: str = None) -> go.Figure:
         if category and 'vehicle_category' in df.columns:
-            df_filtered = df[df['vehicle_category'] == category]
+            in_category = (df['vehicle_category'] == category).to_numpy()
             title_suffix = f" - {category}"
         else:
-            df_filtered = df
+            in_category = np.ones(len(df), dtype=bool)
             title_suffix = ""
-        latest_date = df_filtered['date'].max()
-        latest_data = df_filtered[df_filtered['date'] == latest_date]
+        latest_date = df.loc[in_category, 'date'].max()
+        latest_data = df[in_category & (df['date'] == latest_date).to_numpy()]
         entity_col = None
         for col in ['manufacturer', 'state']:
             if col in latest_data.columns:
@@ -159,7 +207,7 @@ class VehicleDataVisualizer:
         ])
         fig.update_layout(
             title=dict(text=f"Market Share{title_suffix}", x=0.5, font=dict(size=18)),
-            template='plotly_white',
+            template=self.theme,
             height=500,
             showlegend=True,
             legend=dict(
@@ -210,11 +258,9 @@ class VehicleDataVisualizer:
                 yaxis_title="Manufacturer"
             )
         else:
-            df_copy = df.copy()
-            df_copy['date'] = pd.to_datetime(df_copy['date'])
-            df_copy['year'] = df_copy['date'].dt.year
-            df_copy['month'] = df_copy['date'].dt.month
-            pivot_data = df_copy.groupby(['year', 'month'])[value_col].sum().unstack(fill_value=0)
+            dates = pd.to_datetime(df['date'])
+            year_month = [dates.dt.year.rename('year'), dates.dt.month.rename('month')]
+            pivot_data = df.groupby(year_month)[value_col].sum().unstack(fill_value=0)
             month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
                           'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
             fig = go.Figure(data=go.Heatmap(
@@ -234,53 +280,56 @@ class VehicleDataVisualizer:
                 yaxis_title="Year"
             )
         fig.update_layout(
-            template='plotly_white',
+            template=self.theme,
+            height=500
+        )
+        return fig
+    
+    def create_correlation_heatmap(self, corr: pd.DataFrame, title: str = "Growth Co-movement") -> go.Figure:
+        labels = [str(c) for c in corr.columns]
+        fig = go.Figure(data=go.Heatmap(
+            z=corr.values,
+            x=labels,
+            y=labels,
+            zmin=-1,
+            zmax=1,
+            colorscale='RdBu',
+            hoverongaps=False,
+            hovertemplate='%{y} / %{x}<br>' +
+                         'Correlation: %{z:.2f}<br>' +
+                         '<extra></extra>'
+        ))
+        fig.update_layout(
+            title=dict(text=title, x=0.5),
+            template=self.theme,
             height=500
         )
         return fig
     
     def create_comparison_chart(self, df: pd.DataFrame, entities: List[str], 
-                              entity_col: str = 'manufacturer') -> go.Figure:
+                              entity_col: str = 'manufacturer', x_range: Optional[Tuple] = None,
+                              max_points: Optional[int] = None) -> go.Figure:
         filtered_df = df[df[entity_col].isin(entities)]
         fig = go.Figure()
-        for entity in entities:
-            entity_data = filtered_df[filtered_df[entity_col] == entity]
-            if 'vehicle_category' in entity_data.columns:
-                daily_data = entity_data.groupby(['date', 'vehicle_category'])['registrations'].sum().reset_index()
-                for category in daily_data['vehicle_category'].unique():
-                    category_data = daily_data[daily_data['vehicle_category'] == category]
-                    fig.add_trace(go.Scatter(
-                        x=category_data['date'],
-                        y=category_data['registrations'],
-                        mode='lines+markers',
-                        name=f"{entity} - {category}",
-                        line=dict(width=2),
-                        marker=dict(size=4),
-                        hovertemplate=f'<b>{entity} - {category}</b><br>' +
-                                     'Date: %{x}<br>' +
-                                     'Registrations: %{y:,.0f}<br>' +
-                                     '<extra></extra>'
-                    ))
-            else:
-                daily_data = entity_data.groupby('date')['registrations'].sum().reset_index()
-                fig.add_trace(go.Scatter(
-                    x=daily_data['date'],
-                    y=daily_data['registrations'],
-                    mode='lines+markers',
-                    name=entity,
-                    line=dict(width=3),
-                    marker=dict(size=6),
-                    hovertemplate=f'<b>{entity}</b><br>' +
-                                 'Date: %{x}<br>' +
-                                 'Registrations: %{y:,.0f}<br>' +
-                                 '<extra></extra>'
-                ))
+        if 'vehicle_category' in filtered_df.columns:
+            pivot = self.daily_pivot(filtered_df, [entity_col, 'vehicle_category'])
+            columns_by_entity: Dict[str, List[Tuple[str, str]]] = {}
+            for entity, category in pivot.columns:
+                columns_by_entity.setdefault(entity, []).append((entity, category))
+            traces = [((entity, category), f"{entity} - {category}", dict(width=2), 4,
+                       self._hovertemplate(f"{entity} - {category}"))
+                      for name in entities for entity, category in columns_by_entity.get(name, [])]
+        else:
+            pivot = self.daily_pivot(filtered_df, [entity_col])
+            traces = [(entity, entity, dict(width=3), 6, self._hovertemplate(entity))
+                      for entity in entities if entity in pivot.columns]
+        self._add_line_traces(fig, pivot, traces, x_range, max_points)
         fig.update_layout(
             title=dict(text=f"{entity_col.title()} Comparison", x=0.5, font=dict(size=18)),
             xaxis_title="Date",
             yaxis_title="Registrations",
             hovermode='x unified',
-            template='plotly_white',
+            template=self.theme,
             height=500,
             showlegend=True,
             legend=dict(
@@ -293,35 +342,38 @@ class VehicleDataVisualizer:
         )
         return fig
     
+    def create_signal_distribution_chart(self, df: pd.DataFrame) -> go.Figure:
+        signal_summary = df.groupby('investment_signal').size().reset_index()
+        signal_summary.columns = ['Signal', 'Count']
+        fig = go.Figure(data=[
+            go.Bar(
+                x=signal_summary['Signal'],
+                y=signal_summary['Count'],
+                marker_color=['#E74C3C' if 'SELL' in signal else '#2ECC71' if 'BUY' in signal else '#95A5A6' 
+                             for signal in signal_summary['Signal']]
+            )
+        ])
+        fig.update_layout(
+            title="Investment Signals Distribution",
+            xaxis_title="Signal",
+            yaxis_title="Count",
+            template=self.theme
+        )
+        return fig
+
     def create_investment_dashboard(self, df: pd.DataFrame) -> Dict[str, go.Figure]:
-        charts = {}
-        charts['trends'] = self.create_registration_trends_chart(df, "Vehicle Registration Trends")
+        specs = {'trends': ChartSpec('registration_trends_chart', ("Vehicle Registration Trends",))}
         if 'yoy_growth' in df.columns:
-            charts['yoy_growth'] = self.create_growth_metrics_chart(df, 'yoy_growth')
+            specs['yoy_growth'] = ChartSpec('growth_metrics_chart', ('yoy_growth',))
         if 'qoq_growth' in df.columns:
-            charts['qoq_growth'] = self.create_growth_metrics_chart(df, 'qoq_growth')
-        charts['market_share'] = self.create_market_share_pie_chart(df)
-        charts['heatmap'] = self.create_heatmap(df)
+            specs['qoq_growth'] = ChartSpec('growth_metrics_chart', ('qoq_growth',))
+        specs['market_share'] = ChartSpec('market_share_pie_chart')
+        specs['heatmap'] = ChartSpec('heatmap')
+        charts = self.build_charts(df, specs).figures
         if 'investment_signal' in df.columns:
-            signal_summary = df.groupby('investment_signal').size().reset_index()
-            signal_summary.columns = ['Signal', 'Count']
-            charts['signals'] = go.Figure(data=[
-                go.Bar(
-                    x=signal_summary['Signal'],
-                    y=signal_summary['Count'],
-                    marker_color=['#E74C3C' if 'SELL' in signal else '#2ECC71' if 'BUY' in signal else '#95A5A6' 
-                                 for signal in signal_summary['Signal']]
-                )
-            ])
-            charts['signals'].update_layout(
-                title="Investment Signals Distribution",
-                xaxis_title="Signal",
-                yaxis_title="Count",
-                template='plotly_white'
-            )
+            charts['signals'] = self.figure('signal_distribution_chart', df[['investment_signal']])
         return charts
 
-
 def main():
     visualizer = VehicleDataVisualizer()
     dates = pd.date_range('2023-01-01', '2023-12-31', freq='D')
@@ -0,0 +1,146 @@
+"""Point reduction for long time-series traces.
+
+Charts never need more points per trace than the plot has pixels across. Series above
+a point budget are reduced with Largest-Triangle-Three-Buckets (keeps visual shape) or
+min/max bucketing (keeps every local extreme); ``series_window`` cuts a series to the
+visible x range first, so zooming in re-fetches full detail for that window. Figures
+whose total point count passes a threshold switch to WebGL (``Scattergl``) traces.
+"""
+from __future__ import annotations
+import os
+import sys
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import plotly.graph_objects as go
+except ImportError:
+    print("Plotly not installed. Run: pip install plotly")
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from config.settings import CHART_CONFIG
+
+METHODS = ("lttb", "minmax")
+
+
+def _as_float(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return x.astype(float)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the ``n_out`` points Largest-Triangle-Three-Buckets keeps (first and last
+    included). A 2-D ``y`` reduces every column against the shared ``x`` in one pass and
+    returns an (n_out, columns) index array.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n) if np.ndim(y) == 1 else np.tile(np.arange(n)[:, None], (1, np.shape(y)[1]))
+    x, y = _as_float(x), np.asarray(y, dtype=float)
+    flat = y.ndim == 1
+    ys = y[:, None] if flat else y
+    columns = np.arange(ys.shape[1])
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)  # n_out - 2 buckets between the end points
+    sizes = np.diff(edges)
+    # reduceat runs the last segment to the end of its input, so stop it before the final point
+    mean_x = np.add.reduceat(x[:edges[-1]], edges[:-1]) / sizes
+    mean_y = np.add.reduceat(ys[:edges[-1]], edges[:-1], axis=0) / sizes[:, None]
+    # each bucket is scored against the mean of the next one; the last uses the final point
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.vstack([mean_y[1:], ys[-1:]])
+    out = np.empty((n_out, len(columns)), dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = np.zeros(len(columns), dtype=np.int64)
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        xa, ya = x[a], ys[a, columns]
+        area = np.abs((xa - next_x[b]) * (ys[lo:hi] - ya) - (xa - x[lo:hi, None]) * (next_y[b] - ya))
+        a = lo + area.argmax(axis=0)
+        out[b + 1] = a
+    return out[:, 0] if flat else out
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of each bucket's minimum and maximum (plus the end points), about ``n_out`` in total."""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    buckets = (n_out - 2) // 2
+    bucket = np.minimum(np.arange(n) * buckets // n, buckets - 1)
+    order = np.lexsort((np.asarray(y, dtype=float), bucket))
+    starts = np.searchsorted(bucket[order], np.arange(buckets), side="left")
+    ends = np.searchsorted(bucket[order], np.arange(buckets), side="right") - 1
+    return np.unique(np.concatenate([[0, n - 1], order[starts], order[ends]]))
+
+
+def downsample(x: Sequence, y: Sequence, max_points: Optional[int] = None,
+               method: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """(x, y) reduced to at most ``max_points`` points; NaN values are dropped first."""
+    max_points = max_points or CHART_CONFIG["max_points_per_trace"]
+    method = method or CHART_CONFIG["downsample_method"]
+    if method not in METHODS:
+        raise ValueError(f"Unsupported downsampling method: {method}")
+    x, y = np.asarray(x), np.asarray(y, dtype=float)
+    keep = ~np.isnan(y)
+    x, y = x[keep], y[keep]
+    idx = lttb_indices(x, y, max_points) if method == "lttb" else minmax_indices(y, max_points)
+    return x[idx], y[idx]
+
+
+def downsample_columns(x: Sequence, values: np.ndarray, max_points: Optional[int] = None,
+                       method: Optional[str] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """``downsample`` for every column of ``values`` against the shared ``x``; with LTTB the
+    gap-free columns are reduced together.
+    """
+    max_points = max_points or CHART_CONFIG["max_points_per_trace"]
+    method = method or CHART_CONFIG["downsample_method"]
+    x, values = np.asarray(x), np.asarray(values, dtype=float)
+    out: List[Optional[Tuple[np.ndarray, np.ndarray]]] = [None] * values.shape[1]
+    dense = np.flatnonzero(~np.isnan(values).any(axis=0)) if method == "lttb" else np.array([], dtype=int)
+    if len(dense):
+        idx = lttb_indices(x, values[:, dense], max_points)
+        for j, column in enumerate(dense):
+            out[column] = (x[idx[:, j]], values[idx[:, j], column])
+    for column, item in enumerate(out):
+        if item is None:
+            out[column] = downsample(x, values[:, column], max_points, method)
+    return out
+
+
+def series_window(series: Union[pd.Series, pd.DataFrame], x_range: Optional[Tuple] = None) -> pd.Series:
+    """The part of a sorted, x-indexed series inside ``x_range`` plus one neighbour on each
+    side, so lines still run to the plot edges.
+    """
+    if x_range is None or series.empty:
+        return series
+    index = series.index
+    lo = max(int(index.searchsorted(pd.Timestamp(x_range[0]), side="left")) - 1, 0)
+    hi = int(index.searchsorted(pd.Timestamp(x_range[1]), side="right")) + 1
+    return series.iloc[lo:hi]
+
+
+def trace_class(total_points: int, threshold: Optional[int] = None):
+    """``go.Scattergl`` once a figure carries more than ``threshold`` points, else ``go.Scatter``."""
+    threshold = threshold if threshold is not None else CHART_CONFIG["webgl_threshold"]
+    return go.Scattergl if total_points > threshold else go.Scatter
+
+
+def line_mode(points: int, threshold: Optional[int] = None) -> str:
+    """Markers only while individual points are still distinguishable."""
+    threshold = threshold if threshold is not None else CHART_CONFIG["marker_threshold"]
+    return 'lines+markers' if points <= threshold else 'lines'
+
+
+__all__ = [
+    'lttb_indices',
+    'minmax_indices',
+    'downsample',
+    'downsample_columns',
+    'series_window',
+    'trace_class',
+    'line_mode'
+]
@@ -0,0 +1,226 @@
+"""Cache of serialized Plotly figures.
+
+Entries are keyed by (chart type, fingerprint of every input frame, call parameters,
+theme) and hold the figure already encoded as JSON bytes, so a rerun whose chart inputs
+did not change skips building and validating the ``go.Figure``. Hits come back as a
+``SerializedFigure``; Streamlit still decodes it to a dict and re-encodes that for the
+browser, which is cheap next to a build. Editing a hit fills it from the payload first.
+Encoding goes through orjson when it is installed. Payloads live in a size-bounded
+in-memory LRU with an optional tier in a shared ``CacheManager`` so other processes and
+restarts reuse them.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import plotly.graph_objects as go
+    import plotly.io as pio
+except ImportError:
+    print("Plotly not installed. Run: pip install plotly")
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from config.settings import CHART_CONFIG
+from src.utils.cache_manager import CacheManager, shared_cache_manager
+from src.utils.memo import _param_token, frame_fingerprint
+
+NAMESPACE = "figures"
+
+
+def serialize_figure(fig) -> bytes:
+    """Plotly JSON for ``fig``, encoded with orjson when available."""
+    return pio.to_json(fig, validate=False, engine="orjson" if orjson is not None else "json").encode()
+
+
+def figure_spec(payload: bytes) -> Dict[str, Any]:
+    """The figure dict decoded from a serialized payload."""
+    return orjson.loads(payload) if orjson is not None else json.loads(payload)
+
+
+def _payload_backed(name: str) -> property:
+    prop = getattr(go.Figure, name)
+
+    def get(self):
+        self._load()
+        return prop.fget(self)
+
+    def set(self, value):
+        self._load()
+        prop.fset(self, value)
+
+    return property(get, set)
+
+
+class SerializedFigure(go.Figure):
+
+    def __init__(self, payload: bytes):
+        # starts as an empty figure around the payload: st.plotly_chart only calls to_dict()
+        # on a go.Figure, so a hit that is just displayed never builds the trace objects
+        self._payload = payload
+        self._loaded = True  # plotly's own setup reads the empty layout
+        # no default template, which the payload's template would otherwise be merged into
+        super().__init__(layout={'template': {}})
+        self._loaded = False
+
+    # anything that reads or edits the figure (update_layout, add_trace, fig.layout.title...)
+    # goes through these, and first fills the figure from the payload in place
+    data = _payload_backed('data')
+    layout = _payload_backed('layout')
+    frames = _payload_backed('frames')
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        spec = figure_spec(self._payload)
+        self.add_traces(spec.get('data', []))
+        layout = go.Figure.layout.fget(self)
+        layout.update(spec.get('layout', {}))
+        if 'template' not in spec.get('layout', {}):
+            layout.template = None
+        go.Figure.frames.fset(self, spec.get('frames', []))
+
+    @property
+    def payload(self) -> bytes:
+        """The serialized figure, re-encoded if it was edited since the cache returned it."""
+        return serialize_figure(self) if self._loaded else self._payload
+
+    def to_dict(self) -> Dict[str, Any]:
+        return super().to_dict() if self._loaded else figure_spec(self._payload)
+
+    def to_plotly_json(self) -> Dict[str, Any]:
+        return self.to_dict()
+
+    def to_json(self, *args, **kwargs) -> str:
+        return super().to_json(*args, **kwargs) if self._loaded else self._payload.decode()
+
+    def materialize(self) -> go.Figure:
+        return go.Figure(self.to_dict())
+
+
+def _token(value: Any) -> str:
+    # charts read columns beyond the usual key columns (growth, share), so hash them all
+    if isinstance(value, pd.DataFrame):
+        return f"df:{frame_fingerprint(value, key_cols=list(value.columns))}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_token(v) for v in value) + "]"
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{k!r}:{_token(v)}" for k, v in sorted(value.items(), key=lambda kv: repr(kv[0]))) + "}"
+    return _param_token(value)
+
+
+class FigureCache:
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 store: Optional[CacheManager] = None):
+        self.max_entries = max_entries if max_entries is not None else CHART_CONFIG["figure_cache_entries"]
+        self.max_bytes = max_bytes if max_bytes is not None else CHART_CONFIG["figure_cache_bytes"]
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.bytes_held = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def make_key(self, chart: str, params: Any, theme: str) -> str:
+        token = "|".join([chart, _token(params), theme])
+        return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return payload
+        payload = self.store.get_bytes(NAMESPACE, key) if self.store is not None else None
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._store(key, payload)
+        return payload
+
+    def put(self, key: str, fig) -> bytes:
+        """Serialize and keep ``fig``; returns the payload."""
+        payload = serialize_figure(fig)
+        with self._lock:
+            self._store(key, payload)
+        if self.store is not None:
+            # keys fingerprint the inputs, so entries stay valid across data refreshes
+            self.store.put_bytes(NAMESPACE, key, payload, versioned=False)
+        return payload
+
+    def get_or_build(self, chart: str, params: Any, theme: str, build: Callable[[], Any]) -> bytes:
+        key = self.make_key(chart, params, theme)
+        payload = self.get(key)
+        return payload if payload is not None else self.put(key, build())
+
+    def clear(self, disk: bool = True) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes_held = 0
+        if disk and self.store is not None:
+            self.store.invalidate(NAMESPACE)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'disk_hits': self.disk_hits,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'bytes_held': self.bytes_held,
+            'max_bytes': self.max_bytes
+        }
+
+    def _store(self, key: str, payload: bytes) -> None:
+        if len(payload) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes_held -= len(old)
+        self._entries[key] = payload
+        self.bytes_held += len(payload)
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes_held > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes_held -= len(evicted)
+
+
+_shared_cache: Optional[FigureCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_figure_cache() -> FigureCache:
+    """Process-wide figure cache so reruns and sessions share serialized charts."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            store = shared_cache_manager() if CHART_CONFIG.get("figure_disk_tier") else None
+            _shared_cache = FigureCache(store=store)
+        return _shared_cache
+
+
+__all__ = [
+    'serialize_figure',
+    'figure_spec',
+    'SerializedFigure',
+    'FigureCache',
+    'shared_figure_cache'
+]
@@ -0,0 +1,106 @@
+import time
+
+import pandas as pd
+import numpy as np
+
+from src.analytics.advanced_analytics import detect_anomalies
+
+
+def _loop_reference(df, entity_cols, window):
+    parts = []
+    for _, g in df.groupby(entity_cols):
+        g = g.sort_values('date')
+        g['rolling_mean'] = g['registrations'].rolling(window, min_periods=window // 2).mean()
+        g['rolling_std'] = g['registrations'].rolling(window, min_periods=window // 2).std()
+        parts.append(g)
+    return pd.concat(parts, ignore_index=True)
+
+
+def test_grouped_rolling_matches_per_group_loop(sample_raw_state_df):
+    df = sample_raw_state_df.copy()
+    df['registrations'] = df['registrations'].astype(float)
+    df.loc[df.index[::37], 'registrations'] = np.nan
+    entity_cols = ['state', 'vehicle_category']
+    expected = _loop_reference(df, entity_cols, 7)
+    out = detect_anomalies(df, entity_cols=entity_cols)
+    np.testing.assert_allclose(out['rolling_mean'], expected['rolling_mean'], rtol=1e-9)
+    np.testing.assert_allclose(out['rolling_std'], expected['rolling_std'], rtol=1e-7)
+
+
+def test_robust_mode_median_mad(sample_raw_state_df):
+    window = 15
+    out = detect_anomalies(sample_raw_state_df, entity_cols=['state', 'vehicle_category'],
+                           rolling_window=window, method='robust')
+    for _, g in out.groupby(['state', 'vehicle_category']):
+        x = g['registrations'].astype(float)
+        med = x.rolling(window, min_periods=window // 2).median()
+        mad = x.rolling(window, min_periods=window // 2).apply(
+            lambda a: np.median(np.abs(a - np.median(a))), raw=True)
+        np.testing.assert_allclose(g['rolling_median'], med)
+        np.testing.assert_allclose(g['rolling_mad'], mad)
+
+
+def test_robust_mode_large_window_matches_pandas_and_does_not_scale_with_it():
+    rng = np.random.default_rng(8)
+    df = pd.DataFrame({'date': np.tile(pd.date_range('2021-01-01', periods=1200), 3),
+                       'state': np.repeat(['KA', 'MH', 'TN'], 1200),
+                       'registrations': rng.poisson(50, 3600).astype(float)})
+    df.loc[rng.choice(3600, 60, replace=False), 'registrations'] = np.nan
+    window = 400
+    out = detect_anomalies(df, entity_cols=['state'], rolling_window=window, method='robust')
+    rolling = df.groupby('state')['registrations'].rolling(window, min_periods=window // 2)
+    np.testing.assert_allclose(out['rolling_median'], rolling.median().to_numpy())
+    np.testing.assert_allclose(out['rolling_mad'], rolling.apply(
+        lambda a: np.nanmedian(np.abs(a - np.nanmedian(a))), raw=True).to_numpy())
+
+    def best_of_three(window):
+        seconds = []
+        for _ in range(3):
+            started = time.perf_counter()
+            detect_anomalies(df, entity_cols=['state'], rolling_window=window, method='robust')
+            seconds.append(time.perf_counter() - started)
+        return min(seconds)
+
+    assert best_of_three(730) < 4 * best_of_three(7)  # a full scan per row would be ~100x
+
+
+def test_robust_mode_flags_spike():
+    df = pd.DataFrame({'date': pd.date_range('2024-01-01', periods=60),
+                       'registrations': np.tile([100.0, 104.0, 98.0, 101.0], 15)})
+    df.loc[45, 'registrations'] = 900.0
+    out = detect_anomalies(df, rolling_window=21, method='robust')
+    assert out['is_anomaly'].sum() == 1 and out.loc[45, 'is_anomaly']
+
+
+def test_online_detector_streams_and_checkpoints(tmp_path, sample_raw_state_df):
+    from src.analytics.streaming import OnlineAnomalyDetector
+    entity_cols = ['state', 'vehicle_category']
+    cutoff = sample_raw_state_df['date'].max()
+    history = sample_raw_state_df[sample_raw_state_df['date'] < cutoff]
+    detector = OnlineAnomalyDetector(entity_cols=entity_cols).fit(history)
+    path = detector.save(tmp_path / 'state.json')
+    restored = OnlineAnomalyDetector.load(path)
+    assert len(restored) == 9
+    new_day = sample_raw_state_df[sample_raw_state_df['date'] == cutoff].copy()
+    new_day.loc[new_day.index[0], 'registrations'] = 100000
+    alerts = restored.update(new_day)
+    assert alerts['is_anomaly'].iloc[0] and alerts['z_score'].notna().all()
+    assert alerts['z_score'].iloc[0] > 10 * alerts['z_score'].iloc[1:].abs().max()
+    replay = restored.update(new_day)
+    assert replay['z_score'].isna().all() and not replay['is_anomaly'].any()
+
+
+def test_online_detector_sums_rows_per_day_and_restores_typed_keys(tmp_path):
+    from src.analytics.streaming import OnlineAnomalyDetector
+    days = np.repeat(pd.date_range('2024-01-01', periods=30), 3)
+    df = pd.DataFrame({'date': days, 'plant': 7, 'launch': pd.Timestamp('2023-05-01'),
+                       'registrations': np.random.default_rng(2).normal(100, 5, 90).round()})
+    df.loc[df.index[-1], 'registrations'] = 5000.0  # third row of the last day
+    alerts = OnlineAnomalyDetector().update(df)
+    assert len(alerts) == 30 and alerts['registrations'].iloc[-1] == df['registrations'].iloc[-3:].sum()
+    assert alerts['is_anomaly'].iloc[-1]
+    assert alerts['z_score'].iloc[-1] > 10 * alerts['z_score'].iloc[:-1].abs().max()
+    detector = OnlineAnomalyDetector(entity_cols=['plant', 'launch']).fit(df.iloc[:-3])
+    restored = OnlineAnomalyDetector.load(detector.save(tmp_path / 'state.json'))
+    assert restored._keys == [(7, pd.Timestamp('2023-05-01'))]
+    assert restored.update(df.iloc[-3:])['is_anomaly'].tolist() == [True]
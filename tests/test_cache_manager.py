@@ -0,0 +1,56 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.utils.cache_manager import CacheManager
+from src.utils.query_cache import SegmentCache
+
+
+def test_budget_eviction_and_persistent_index(tmp_path):
+    frame = pd.DataFrame({'x': np.random.default_rng(0).normal(size=2000)})
+    probe = CacheManager(tmp_path / 'probe')
+    size = probe.put_frame('ns', 'probe', frame).stat().st_size
+    cache = CacheManager(tmp_path / 'cache', max_bytes=int(size * 2.5))
+    for key in ('a', 'b'):
+        cache.put_frame('ns', key, frame)
+        time.sleep(0.01)
+    assert cache.get_frame('ns', 'a') is not None  # 'b' is now least recently used
+    cache.put_frame('ns', 'c', frame)
+    assert cache.get_frame('ns', 'b') is None and cache.stats()['evictions'] == 1
+    reopened = CacheManager(tmp_path / 'cache', max_bytes=int(size * 2.5))
+    pd.testing.assert_frame_equal(reopened.get_frame('ns', 'c'), frame)
+    assert reopened.stats()['bytes'] <= reopened.max_bytes
+    assert sorted(p.name for p in (tmp_path / 'cache' / 'ns').iterdir()) == ['a.parquet', 'c.parquet']
+
+
+def test_hits_defer_index_writes_until_flush(tmp_path):
+    cache = CacheManager(tmp_path, flush_seconds=3600)
+    cache.put_frame('ns', 'a', pd.DataFrame({'x': [1, 2]}))
+    written = cache.index_path.stat().st_mtime_ns
+    for _ in range(3):
+        assert cache.get_frame('ns', 'a') is not None
+    assert cache.index_path.stat().st_mtime_ns == written
+    cache.flush()
+    assert CacheManager(tmp_path).entries['ns/a']['hits'] == 3
+
+
+def test_data_version_invalidates_segments_and_keeps_unversioned(tmp_path):
+    store = CacheManager(tmp_path)
+    store.observe_source('generator-v1')
+    calls = []
+
+    def load(start, end, dims):
+        calls.append((start, end))
+        return pd.DataFrame({'date': pd.date_range(start, end), 'state': dims['state'][0], 'registrations': 1})
+
+    segments = SegmentCache(tmp_path / 'segments', 'sample', dims=['state'], store=store)
+    segments.query('2024-01-01', '2024-01-10', {'state': ['KA']}, load)
+    segments.query('2024-01-01', '2024-01-10', {'state': ['KA']}, load)
+    store.put_bytes('export', 'report', b'abc', versioned=False)
+    assert len(calls) == 1
+    store.bump_version()
+    segments.query('2024-01-01', '2024-01-10', {'state': ['KA']}, load)
+    assert len(calls) == 2 and store.get_bytes('export', 'report') == b'abc'
+    assert not store.observe_source('generator-v1') and store.observe_source('generator-v2')
+    assert store.stats()['entries'] == 1
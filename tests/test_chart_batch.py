@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from src.visualizations.chart_batch import ChartSpec, shared_inputs
+from src.visualizations.charts import VehicleDataVisualizer
+
+
+def _frame():
+    rng = np.random.default_rng(3)
+    index = pd.MultiIndex.from_product(
+        [pd.date_range('2024-01-01', periods=90), ['KA', 'MH'], ['Hero', 'TVS', 'Tata'], ['2W', '4W']],
+        names=['date', 'state', 'manufacturer', 'vehicle_category'])
+    df = index.to_frame(index=False)
+    df['registrations'] = rng.integers(10, 500, len(df))
+    df['yoy_growth'] = rng.normal(10, 5, len(df))
+    df['market_share'] = rng.uniform(5, 25, len(df))
+    return df
+
+
+def test_batch_matches_individual_charts_and_shares_inputs():
+    df = _frame()
+    viz = VehicleDataVisualizer()
+    specs = {
+        'trends': ChartSpec('registration_trends_chart', ("Trends",)),
+        'pie': ChartSpec('market_share_pie_chart'),
+        'pie_2w': ChartSpec('market_share_pie_chart', ('2W',)),
+        'heatmap': ChartSpec('heatmap'),
+        'growth': ChartSpec('growth_metrics_chart', ('yoy_growth',)),
+    }
+    inputs = shared_inputs(df, specs)
+    assert inputs['trends'] is inputs['heatmap'] and len(inputs['trends']) == len(df) // 3
+    assert inputs['pie'] is inputs['growth'] and inputs['pie_2w'] is df
+    for workers in (1, 4):
+        batch = viz.build_charts(df, specs, max_workers=workers)
+        assert set(batch.timings) == set(specs) and batch.wall_seconds >= batch.shared_seconds
+        for name, spec in specs.items():
+            direct = getattr(viz, f"create_{spec.chart}")(df, *spec.args)
+            assert batch.figures[name].to_json() == direct.to_json(), name
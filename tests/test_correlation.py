@@ -0,0 +1,32 @@
+import pandas as pd
+import numpy as np
+
+from src.analytics.correlation import CorrelationEngine, correlation_matrix, top_correlated_pairs
+
+
+def test_blocked_correlation_matches_pandas():
+    rng = np.random.default_rng(3)
+    X = rng.normal(size=(40, 120))
+    np.testing.assert_allclose(correlation_matrix(X, block_size=7), np.corrcoef(X), atol=1e-12)
+    X[5] = X[11] * 3 + rng.normal(scale=0.01, size=120)
+    X[20] = -X[30]
+    assert top_correlated_pairs(X, k=1, block_size=9)[0][:2] == (5, 11)
+    i, j, c = top_correlated_pairs(X, k=1, negative=True)[0]
+    assert (i, j) == (20, 30) and c < -0.99
+
+
+def test_engine_lead_lag_and_rolling():
+    rng = np.random.default_rng(8)
+    dates = pd.date_range('2023-01-02', periods=80, freq='W-MON')
+    leader = 1000 * np.exp(np.cumsum(rng.normal(0, 0.05, 83)))
+    follower = np.roll(leader, 2) * 0.5
+    frame = pd.DataFrame({'date': np.tile(dates, 3), 'manufacturer': np.repeat(['Lead', 'Follow', 'Noise'], 80),
+                          'registrations': np.concatenate([leader[3:], follower[3:],
+                                                           1000 + rng.normal(0, 50, 80)])})
+    engine = CorrelationEngine(frame, freq='W')
+    assert list(engine.matrix().columns) == ['Follow', 'Lead', 'Noise']
+    lags = engine.lead_lag('Lead', max_lag=4).set_index('manufacturer')
+    assert lags.loc['Follow', 'best_lag'] == 2 and lags.loc['Follow', 'correlation'] > 0.9
+    assert lags.loc['Lead', 'best_lag'] == 0
+    rolling = engine.rolling('Lead', window=12)
+    assert rolling.shape == (79, 3) and rolling['Lead'].dropna().gt(0.999).all()
@@ -21,3 +21,11 @@ def test_market_share(data_processor, sample_raw_state_df):
     assert 'market_share' in ms.columns
     grouped = ms.groupby(['date', 'vehicle_category'])['market_share'].sum().round(0)
     assert (grouped.between(95, 105)).all()
+
+
+def test_quarterly_rollup_from_monthly(data_processor, sample_raw_state_df):
+    cleaned = data_processor.clean_raw_data(sample_raw_state_df)
+    group_cols = ['state', 'vehicle_category']
+    monthly = data_processor.aggregate_daily_to_monthly(cleaned, group_cols)
+    pd.testing.assert_frame_equal(data_processor.rollup_monthly_to_quarterly(monthly, group_cols),
+                                  data_processor.aggregate_daily_to_quarterly(cleaned, group_cols))
@@ -0,0 +1,37 @@
+import gc
+
+import pandas as pd
+
+from src.dashboard.data_store import DatasetStore
+
+
+def _frame(value):
+    dates = pd.date_range('2024-01-01', periods=10)
+    return pd.DataFrame({'date': dates.repeat(2), 'state': ['KA', 'MH'] * 10, 'registrations': value})
+
+
+def test_views_are_filters_over_one_shared_table(tmp_path):
+    store = DatasetStore(tmp_path)
+    store.publish(_frame(1), 'v1')
+    first, second = store.lease(), store.lease()
+    assert first.table is second.table
+    view = first.view('2024-01-03', '2024-01-05', state=['MH'])
+    assert list(view['state'].unique()) == ['MH'] and len(view) == 3
+    assert view['date'].min() == pd.Timestamp('2024-01-03')
+    assert store.stats()['versions'] == {'v1': 2}
+
+
+def test_refresh_keeps_leased_versions_until_released(tmp_path):
+    store = DatasetStore(tmp_path)
+    store.ensure('v1', lambda: _frame(1))
+    old = store.lease()
+    store.ensure('v2', lambda: _frame(2))
+    store.ensure('v2', lambda: (_ for _ in ()).throw(AssertionError('rebuilt')))
+    assert old.view()['registrations'].eq(1).all()
+    assert len(list(tmp_path.glob('*.arrow'))) == 2
+    renewed = store.renew(old)
+    assert renewed.version == 'v2' and not old.active
+    assert store.stats()['versions'] == {'v2': 1} and len(list(tmp_path.glob('*.arrow'))) == 1
+    del renewed
+    gc.collect()
+    assert store.stats()['versions'] == {'v2': 0}
@@ -0,0 +1,60 @@
+import pandas as pd
+import numpy as np
+
+from src.analytics.advanced_analytics import detect_anomalies
+from src.analytics.decomposition import decompose_frame
+from src.analytics.holt_winters import forecast_frame
+from src.utils.memo import MemoCache
+
+WEEKLY = np.array([10.0, 20.0, 0.0, -5.0, -10.0, -15.0, 0.0])
+
+
+def _weekly_frame(days, states=('MH', 'KA'), noise=2.0, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2022-01-05', periods=days)
+    return pd.concat([pd.DataFrame({'date': dates, 'state': s,
+                                    'registrations': 200 + 0.1 * np.arange(days) + WEEKLY[dates.dayofweek]
+                                    + rng.normal(0, noise, days)}) for s in states], ignore_index=True)
+
+
+def test_decomposition_recovers_weekly_and_yearly_components():
+    df = _weekly_frame(900)
+    dates = pd.date_range('2022-01-05', periods=900)
+    df.loc[df['state'] == 'MH', 'registrations'] += 30 * np.sin(2 * np.pi * dates.dayofyear / 365.25)
+    cache = MemoCache()
+    dec = decompose_frame(df, ['state'], cache=cache)
+    np.testing.assert_allclose(dec.weekly_profile, np.tile(WEEKLY - WEEKLY.mean(), (2, 1)), atol=1.0)
+    yearly_amplitude = np.abs(dec.yearly_profile).max(axis=1)
+    assert yearly_amplitude[list(dec.keys['state']).index('MH')] > 20
+    assert yearly_amplitude[list(dec.keys['state']).index('KA')] < 5
+    frame = dec.to_frame(['state'])
+    assert len(frame) == len(df)
+    np.testing.assert_allclose(frame[['trend', 'seasonal', 'resid']].sum(axis=1),
+                               df.sort_values(['state', 'date'])['registrations'].to_numpy())
+    decompose_frame(df, ['state'], cache=cache)
+    assert cache.stats()['hits'] == 1
+
+
+def test_deseasonalized_anomalies_and_seeded_forecast():
+    df = _weekly_frame(120, states=('MH',), noise=1.0)
+    spike = df.index[(df['date'].dt.dayofweek == 5)][10]
+    df.loc[spike, 'registrations'] += 40
+    raw = detect_anomalies(df, entity_cols=['state'], rolling_window=21)
+    adjusted = detect_anomalies(df, entity_cols=['state'], rolling_window=21, deseasonalize=True)
+    assert not raw.loc[spike, 'is_anomaly']
+    assert adjusted['is_anomaly'].sum() == 1 and adjusted.loc[spike, 'is_anomaly']
+    fc = forecast_frame(df, ['state'], periods=14, use_decomposition=True)
+    expected = 200 + 0.1 * np.arange(120, 134) + WEEKLY[fc['date'].dt.dayofweek]
+    assert np.mean(np.abs(fc['forecast'] - expected) / expected) < 0.05
+
+
+def test_seasonal_component_scales_to_finer_rows():
+    total = _weekly_frame(120, states=('MH',), noise=0.0)
+    rows = pd.concat([total.assign(manufacturer='A', registrations=total['registrations'] * 0.75),
+                      total.assign(manufacturer='B', registrations=total['registrations'] * 0.25)],
+                     ignore_index=True)
+    whole = detect_anomalies(total, entity_cols=['state'], deseasonalize=True).set_index('date')['seasonal']
+    split = detect_anomalies(rows, entity_cols=['state'], deseasonalize=True)
+    by_maker = split.pivot(index='date', columns='manufacturer', values='seasonal')
+    np.testing.assert_allclose(by_maker['A'], 0.75 * whole.loc[by_maker.index])
+    np.testing.assert_allclose(by_maker['B'], 0.25 * whole.loc[by_maker.index])
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from src.visualizations.charts import VehicleDataVisualizer
+from src.visualizations.downsampling import downsample, downsample_columns, lttb_indices, minmax_indices
+
+
+def test_reducers_respect_budget_and_keep_extremes():
+    x = pd.date_range('2015-01-01', periods=20000, freq='h').values
+    y = np.sin(np.linspace(0, 60, 20000)) + np.random.default_rng(1).normal(0, 0.1, 20000)
+    y[12345] = 40.0
+    y[777] = -40.0
+    idx = lttb_indices(x, y, 500)
+    assert len(idx) == 500 and idx[0] == 0 and idx[-1] == len(y) - 1
+    assert np.all(np.diff(idx) > 0) and {777, 12345} <= set(idx)
+    idx = minmax_indices(y, 500)
+    assert len(idx) <= 500 and {0, 777, 12345, len(y) - 1} <= set(idx)
+    short_x, short_y = downsample(x[:50], y[:50], 500)
+    assert len(short_x) == 50
+
+
+def _reference_lttb(x, y, n_out):
+    every = (len(y) - 2) / (n_out - 2)
+    a, kept = 0, [0]
+    for i in range(n_out - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        next_lo, next_hi = hi, min(int((i + 2) * every) + 1, len(y))
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = [abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])) for j in range(lo, hi)]
+        a = lo + int(np.argmax(area))
+        kept.append(a)
+    return np.array(kept + [len(y) - 1])
+
+
+def test_lttb_matches_reference_implementation():
+    rng = np.random.default_rng(3)
+    for n, n_out in ((1000, 50), (997, 31), (64, 5)):
+        x = np.sort(rng.uniform(0, 100, n))
+        y = rng.normal(size=n).cumsum()
+        y[-1] += 1e4  # an outlying final point shifts the last bucket's mean if it leaks in
+        np.testing.assert_array_equal(lttb_indices(x, y, n_out), _reference_lttb(x, y, n_out))
+
+
+def test_long_comparison_chart_is_downsampled_webgl_and_zoom_restores_detail():
+    dates = pd.date_range('2010-01-01', '2024-12-31', freq='D')
+    rows = [pd.DataFrame({'date': dates, 'manufacturer': m, 'vehicle_category': c, 'registrations': 100})
+            for m in ('A', 'B') for c in ('2W', '4W')]
+    df = pd.concat(rows, ignore_index=True)
+    viz = VehicleDataVisualizer()
+    fig = viz.create_comparison_chart(df, ['A', 'B'], max_points=800)
+    assert len(fig.data) == 4 and all(t.type == 'scattergl' and len(t.x) <= 800 for t in fig.data)
+    zoomed = viz.create_comparison_chart(df, ['A', 'B'], x_range=('2020-03-01', '2020-03-31'), max_points=800)
+    assert all(t.type == 'scatter' and len(t.x) == 33 for t in zoomed.data)  # 31 days plus a neighbour each side
+
+
+def test_batched_columns_match_single_series():
+    x = pd.date_range('2020-01-01', periods=3000, freq='D').values
+    values = np.random.default_rng(2).normal(size=(3000, 4)).cumsum(axis=0)
+    values[100:140, 2] = np.nan
+    batched = downsample_columns(x, values, 300)
+    for column, (bx, by) in enumerate(batched):
+        sx, sy = downsample(x, values[:, column], 300)
+        np.testing.assert_array_equal(bx, sx)
+        np.testing.assert_array_equal(by, sy)
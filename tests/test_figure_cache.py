@@ -0,0 +1,34 @@
+import pandas as pd
+
+from src.utils.cache_manager import CacheManager
+from src.visualizations.charts import VehicleDataVisualizer
+from src.visualizations.figure_cache import FigureCache
+
+
+def test_figures_rebuild_only_when_inputs_change(sample_raw_state_df, monkeypatch):
+    viz = VehicleDataVisualizer(cache=FigureCache())
+    builds = []
+    original = viz.create_heatmap
+    monkeypatch.setattr(viz, 'create_heatmap', lambda *a, **k: builds.append(1) or original(*a, **k))
+    first = viz.figure('heatmap', sample_raw_state_df)
+    again = viz.figure('heatmap', sample_raw_state_df.copy())
+    assert len(builds) == 1 and first.payload == again.payload
+    spec = first.to_dict()
+    assert spec['data'][0]['type'] == 'heatmap' and spec['layout']['template']
+    assert first.materialize().data[0].type == 'heatmap'
+    again.update_layout(title_text='edited')  # edits land on the cached chart, not an empty figure
+    assert again.data[0].type == 'heatmap' and again.to_dict()['layout']['title']['text'] == 'edited'
+    assert again.payload != first.payload and first.to_dict() == spec
+    changed = sample_raw_state_df.assign(registrations=sample_raw_state_df['registrations'] + 1)
+    viz.figure('heatmap', changed)
+    viz.figure('heatmap', sample_raw_state_df, value_col='registrations')
+    assert len(builds) == 3 and viz.cache.stats()['hits'] == 1
+
+
+def test_disk_tier_is_shared_across_caches(tmp_path):
+    df = pd.DataFrame({'date': pd.date_range('2024-01-01', periods=30), 'registrations': range(30)})
+    store = CacheManager(tmp_path)
+    first = VehicleDataVisualizer(cache=FigureCache(store=store)).figure('registration_trends_chart', df)
+    other = FigureCache(store=store)
+    assert VehicleDataVisualizer(cache=other).figure('registration_trends_chart', df).payload == first.payload
+    assert other.stats()['disk_hits'] == 1
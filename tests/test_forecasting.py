@@ -0,0 +1,110 @@
+import warnings
+
+import pandas as pd
+import numpy as np
+import pytest
+
+from src.analytics.advanced_analytics import batch_forecast
+from src.analytics.holt_winters import fit_batch, forecast_batch, forecast_frame
+
+
+def _seasonal_series(rng, length):
+    t = np.arange(length)
+    return (500 + rng.uniform(0, 2) * t + rng.uniform(20, 80) * np.sin(2 * np.pi * t / 7 + rng.uniform(0, 6))
+            + rng.normal(0, 15, length))
+
+
+def test_accuracy_parity_with_statsmodels():
+    holtwinters = pytest.importorskip("statsmodels.tsa.holtwinters")
+    rng = np.random.default_rng(7)
+    horizon, train_len = 28, 240
+    series = np.stack([_seasonal_series(rng, train_len + horizon) for _ in range(6)])
+    train, test = series[:, :train_len], series[:, train_len:]
+    fit = fit_batch(train, np.full(len(train), train_len))
+    mean, lower, upper = forecast_batch(fit, horizon)
+    ours, reference = [], []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for i in range(len(train)):
+            model = holtwinters.ExponentialSmoothing(train[i], seasonal_periods=7, trend='add', seasonal='add',
+                                                     initialization_method='estimated').fit(optimized=True)
+            reference.append(np.mean(np.abs(model.forecast(horizon) - test[i]) / test[i]))
+            ours.append(np.mean(np.abs(mean[i] - test[i]) / test[i]))
+    assert np.mean(ours) <= np.mean(reference) * 1.2 + 0.002
+    assert np.mean((test >= lower) & (test <= upper)) > 0.85
+
+
+def test_forecast_frame_batches_keys_and_falls_back():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2024-01-01', periods=90)
+    long_rows = pd.DataFrame({'date': np.tile(dates, 2), 'vehicle_category': np.repeat(['2W', '4W'], 90),
+                              'registrations': np.concatenate([_seasonal_series(rng, 90)] * 2)})
+    short_rows = pd.DataFrame({'date': dates[-5:], 'vehicle_category': '3W', 'registrations': 10.0})
+    fc = forecast_frame(pd.concat([long_rows, short_rows]), ['vehicle_category'], periods=14)
+    assert len(fc) == 42 and set(fc['vehicle_category']) == {'2W', '3W', '4W'}
+    assert (fc['date'] > dates[-1]).all()
+    short_fc = fc[fc['vehicle_category'] == '3W']
+    assert (short_fc['forecast'] == 10.0).all()
+    out = batch_forecast(long_rows, ['2W', '4W'], periods=14)
+    assert list(out['2W'].columns) == ['date', 'vehicle_category', 'forecast', 'lower', 'upper']
+    assert (out['4W']['upper'] >= out['4W']['lower']).all()
+
+
+def test_forecast_manager_reuses_and_warm_starts(tmp_path):
+    from src.analytics.forecast_service import ForecastManager
+    rng = np.random.default_rng(1)
+    dates = pd.date_range('2024-01-01', periods=120)
+    frames = [pd.DataFrame({'date': dates, 'state': s, 'registrations': _seasonal_series(rng, 120)})
+              for s in ['MH', 'KA', 'TN']]
+    full = pd.concat(frames, ignore_index=True)
+    history = full[full['date'] < dates[-7]]
+    store = tmp_path / 'models.parquet'
+    manager = ForecastManager(store_path=store, max_workers=2, chunk_size=2)
+    first = manager.forecast(history, ['state'], periods=14, data_version='v1')
+    again = manager.forecast(history, ['state'], periods=14, data_version='v1')
+    pd.testing.assert_frame_equal(first, again)
+    assert manager.stats()['full'] == 3 and manager.stats()['horizon_hits'] == 1
+    restarted = ForecastManager(store_path=store, max_workers=1)
+    pd.testing.assert_frame_equal(restarted.forecast(history, ['state'], periods=14, data_version='v1'), first)
+    assert restarted.stats()['reused'] == 3 and restarted.stats()['full'] == 0
+    updated = restarted.forecast(full, ['state'], periods=14, data_version='v2')
+    assert restarted.stats()['incremental'] == 3 and restarted.stats()['full'] == 0
+    assert updated['date'].min() == dates[-1] + pd.Timedelta(days=1)
+    scaled = full.assign(registrations=full['registrations'] * 2)
+    restarted.forecast(scaled, ['state'], periods=14, data_version='v2')  # same label, other data
+    assert restarted.stats()['reused'] == 3 and restarted.stats()['full'] == 3
+
+
+def test_rolling_origin_backtest_reports_accuracy_and_cost():
+    from src.analytics.backtesting import backtest
+    rng = np.random.default_rng(4)
+    dates = pd.date_range('2024-01-01', periods=100)
+    df = pd.concat([pd.DataFrame({'date': dates, 'state': s, 'registrations': _seasonal_series(rng, 100)})
+                    for s in ['MH', 'KA']], ignore_index=True)
+    result = backtest(df, ['state'], methods=('holt_winters', 'naive'), horizon=7, n_folds=2, max_workers=2)
+    folds, summary = result['folds'], result['summary']
+    assert len(folds) == 2 * 2 * 2
+    assert set(summary['method']) == {'holt_winters', 'naive'}
+    assert summary[['mape', 'smape', 'coverage', 'seconds_per_fit', 'peak_memory_mb']].notna().all().all()
+    assert (folds.groupby(['method', 'state'])['cutoff_date'].nunique() == 2).all()
+
+
+def test_hierarchical_forecasts_are_coherent():
+    pytest.importorskip("scipy")
+    from src.analytics.hierarchy import forecast_hierarchy
+    rng = np.random.default_rng(5)
+    dates = pd.date_range('2024-01-01', periods=60)
+    rows = [pd.DataFrame({'date': dates, 'state': s, 'vehicle_category': c, 'manufacturer': m,
+                          'registrations': _seasonal_series(rng, 60)})
+            for s in ['MH', 'KA'] for c in ['2W', '4W'] for m in ['Honda', 'Tata']]
+    df = pd.concat(rows, ignore_index=True)
+    for method in ['bottom_up', 'ols', 'wls_struct', 'mint_diag']:
+        result = forecast_hierarchy(df, periods=10, method=method)
+        fc = result.frame()
+        assert len(fc) == (1 + 2 + 4 + 8) * 10
+        total = result.view()['forecast'].to_numpy()
+        bottom = fc[fc['depth'] == 3].groupby('date')['forecast'].sum().to_numpy()
+        np.testing.assert_allclose(total, bottom)
+        np.testing.assert_allclose(result.view(vehicle_category='2W')['forecast'] + result.view(vehicle_category='4W')['forecast'], total)
+        mh = result.view(state='MH')
+        assert (mh['upper'] >= mh['forecast']).all()
@@ -36,3 +36,68 @@ def test_volatility(growth_analyzer):
     df = _build_sample_growth_df()
     vol = growth_analyzer.calculate_volatility_metrics(df, group_cols=['manufacturer', 'vehicle_category'])
     assert {'volatility_30d', 'cv_30d', 'max_drawdown_30d'} <= set(vol.columns)
+
+
+def test_growth_leaders_partial_selection(growth_analyzer):
+    df = pd.DataFrame({
+        'date': pd.Timestamp('2024-06-01'),
+        'manufacturer': ['A', 'B', 'C', 'D', 'A', 'B'],
+        'vehicle_category': ['2W', '2W', '2W', '2W', '4W', '4W'],
+        'yoy_growth': [30.0, 10.0, 8.0, -5.0, 1.0, np.nan]
+    })
+    leaders = growth_analyzer.identify_growth_leaders(df, 'yoy_growth', top_n=2)
+    assert list(leaders['2W_leaders']['manufacturer']) == ['A', 'B']
+    assert list(leaders['2W_laggards']['manufacturer']) == ['C', 'D']
+    assert list(leaders['4W_leaders']['manufacturer']) == ['A']
+    assert leaders['overall_leaders']['yoy_growth'].iloc[0] == 15.5
+
+
+def test_rank_entities_ties_and_metrics():
+    from src.analytics.ranking import rank_entities
+    df = pd.DataFrame({
+        'manufacturer': ['A', 'B', 'C', 'D'],
+        'yoy_growth': [5.0, 9.0, 9.0, 1.0],
+        'qoq_growth': [4.0, 3.0, 2.0, 1.0]
+    })
+    ranked = rank_entities(df, ['yoy_growth', 'qoq_growth'], k=1, group_col=None, keep='all')
+    top_yoy = ranked[(ranked['metric'] == 'yoy_growth') & (ranked['side'] == 'top')]
+    assert set(top_yoy['manufacturer']) == {'B', 'C'} and (top_yoy['rank'] == 1).all()
+    bottom_qoq = ranked[(ranked['metric'] == 'qoq_growth') & (ranked['side'] == 'bottom')]
+    assert list(bottom_qoq['manufacturer']) == ['D']
+
+
+def _signal_frame(seed=0, days=400):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2023-01-01', periods=days)
+    parts = [pd.DataFrame({'date': dates, 'manufacturer': m, 'vehicle_category': c,
+                           'registrations': rng.integers(50, 500, days),
+                           'yoy_growth': rng.normal(10, 15, days), 'qoq_growth': rng.normal(0, 15, days),
+                           'market_share': rng.uniform(0, 30, days), 'cv_30d': rng.uniform(0, 1, days)})
+             for m in ['A', 'B'] for c in ['2W', '4W']]
+    df = pd.concat(parts, ignore_index=True)
+    df.loc[::7, 'yoy_growth'] = np.nan
+    return df
+
+
+def test_vectorized_signals_match_generate_investment_signals(growth_analyzer):
+    from src.analytics.signal_backtest import score_signals
+    df = _signal_frame()
+    expected = growth_analyzer.generate_investment_signals(df)
+    scored = score_signals(df)
+    assert (scored['investment_signal'] == expected['investment_signal']).all()
+    assert (scored['signal_strength'] == expected['signal_strength']).all()
+    partial = score_signals(df.drop(columns=['cv_30d', 'market_share']))
+    assert (partial['investment_signal'] == growth_analyzer.generate_investment_signals(
+        df.drop(columns=['cv_30d', 'market_share']))['investment_signal']).all()
+
+
+def test_signal_backtest_outcomes_and_sweep():
+    from src.analytics.signal_backtest import SignalBacktester
+    df = _signal_frame(1)
+    bt = SignalBacktester(df, horizon=14)
+    per_class = bt.evaluate()
+    assert per_class['rows'].sum() == 4 * (400 - 2 * 14 + 1)
+    sweep = bt.sweep({'yoy_strong': [15, 20, 25], 'qoq_strong': [10, 15]}, max_workers=2, chunk_size=2)
+    assert len(sweep) == 6 and sweep['spread'].is_monotonic_decreasing
+    default = sweep[(sweep['yoy_strong'] == 20) & (sweep['qoq_strong'] == 15)].iloc[0]
+    assert default['n_buy'] == per_class['rows'].iloc[3:].sum()
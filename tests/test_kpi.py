@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from src.analytics.kpi import KPIEngine
+
+
+def _frame():
+    index = pd.MultiIndex.from_product(
+        [pd.date_range('2022-01-01', '2024-06-30'), ['KA', 'MH'], ['Hero', 'TVS', 'Tata'], ['2W', '4W']],
+        names=['date', 'state', 'manufacturer', 'vehicle_category'])
+    df = index.to_frame(index=False)
+    df['registrations'] = np.random.default_rng(4).integers(0, 100, len(df))
+    # Tata only starts selling 4W in MH in 2024
+    late = (df['manufacturer'] == 'Tata') & (df['date'] < '2024-02-01')
+    df.loc[late, 'registrations'] = 0
+    return df
+
+
+def test_incremental_ingest_matches_scan_of_the_rows():
+    df = _frame()
+    engine = KPIEngine()
+    for cutoff in ('2022-12-31', '2023-09-30', '2024-06-30'):
+        engine.update(df[df['date'] <= cutoff])  # overlapping history is skipped
+    assert engine.rows_ingested == len(df)
+    snap = engine.snapshot('2024-01-01', '2024-03-31', ['4W'], ['MH'])
+    rows = df[(df['vehicle_category'] == '4W') & (df['state'] == 'MH')]
+
+    def total(start, end):
+        return rows.loc[rows['date'].between(start, end), 'registrations'].sum()
+
+    current = total('2024-01-01', '2024-03-31')
+    assert snap.total_registrations == current
+    assert np.isclose(snap.yoy_growth, (current / total('2023-01-01', '2023-03-31') - 1) * 100)
+    assert np.isclose(snap.period_change, (current / total('2023-10-02', '2023-12-31') - 1) * 100)
+    assert (snap.active_categories, snap.manufacturers, snap.new_manufacturers) == (1, 3, 1)
+    assert engine.snapshot('2024-01-01', '2024-03-31', ['4W'], ['MH']) is snap
+    assert engine.snapshot('2022-01-01', '2022-03-31').yoy_growth is None
+
+
+def test_manufacturers_are_counted_by_activity_not_span():
+    df = pd.DataFrame({
+        'date': pd.to_datetime(['2024-01-05', '2024-03-05', '2024-02-10', '2024-02-11', '2024-02-12', '2024-02-13']),
+        'vehicle_category': ['2W', '2W', '2W', None, '2W', '2W'],
+        'state': ['KA', 'KA', 'KA', 'KA', np.nan, 'KA'],
+        'manufacturer': ['Hero', 'Hero', 'TVS', 'Bajaj', 'Bajaj', None],
+        'registrations': [10, 10, 5, 7, 7, 3],
+    })
+    engine = KPIEngine()
+    assert engine.update(df) == 4  # rows without a category or state cannot be placed
+    february = engine.snapshot('2024-02-01', '2024-02-29')
+    # Hero is active in January and March only; the unnamed manufacturer adds registrations only
+    assert (february.total_registrations, february.manufacturers, february.new_manufacturers) == (8, 1, 1)
+    assert engine.snapshot('2024-01-01', '2024-03-31').manufacturers == 2
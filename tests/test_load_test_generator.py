@@ -0,0 +1,20 @@
+import pandas as pd
+
+from src.data_extraction.load_test_generator import estimate_rows, generate_dataset, load_dataset
+
+
+def test_partitioned_output_is_deterministic_across_workers(tmp_path):
+    states = ['Goa', 'Sikkim']
+    serial = generate_dataset(tmp_path / 'serial', states, start_year=2023, years=2, seed=7, max_workers=1)
+    parallel = generate_dataset(tmp_path / 'parallel', states, start_year=2023, years=2, seed=7, max_workers=2)
+    pd.testing.assert_frame_equal(serial.drop(columns='path'), parallel.drop(columns='path'))
+    assert serial['rows'].sum() == estimate_rows(states, 2023, 2)
+    assert (tmp_path / 'serial' / 'year=2024' / 'state_code=GA' / 'part-0.parquet').exists()
+    pd.testing.assert_frame_equal(load_dataset(tmp_path / 'serial'), load_dataset(tmp_path / 'parallel'))
+
+    goa = load_dataset(tmp_path / 'serial', states=['Goa'], years=[2023])
+    assert set(goa['state']) == {'Goa'} and goa['date'].dt.year.eq(2023).all()
+    daily = goa.groupby('date')['registrations'].sum()
+    assert daily.loc['2023-11-10'] > 2 * daily.median()  # Dhanteras
+    reused = generate_dataset(tmp_path / 'serial', states, start_year=2023, years=2, seed=7, max_workers=1)
+    pd.testing.assert_frame_equal(reused, serial)
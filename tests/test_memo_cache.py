@@ -0,0 +1,58 @@
+import pandas as pd
+import numpy as np
+
+from src.analytics.growth_calculator import GrowthAnalyzer
+from src.utils.cache_manager import CacheManager
+from src.utils.memo import MemoCache, frame_fingerprint
+
+
+def test_fingerprint_tracks_content(sample_raw_state_df):
+    fp = frame_fingerprint(sample_raw_state_df)
+    assert fp == frame_fingerprint(sample_raw_state_df.copy())
+    changed = sample_raw_state_df.copy()
+    changed.loc[changed.index[0], 'registrations'] += 1
+    assert fp != frame_fingerprint(changed)
+    # columns outside the usual keys count too
+    assert frame_fingerprint(changed.assign(signal=1.0)) != frame_fingerprint(changed.assign(signal=-1.0))
+    versioned, subset = sample_raw_state_df.copy(), sample_raw_state_df.iloc[::-1].copy()
+    versioned.attrs['data_version'] = subset.attrs['data_version'] = 'v1'
+    assert frame_fingerprint(versioned) != frame_fingerprint(subset)
+
+
+def test_analyzer_memoizes_results(sample_raw_state_df):
+    cache = MemoCache()
+    analyzer = GrowthAnalyzer(cache=cache)
+    first = analyzer.calculate_mom_growth(sample_raw_state_df, group_cols=['state', 'vehicle_category'])
+    second = analyzer.calculate_mom_growth(sample_raw_state_df, group_cols=['state', 'vehicle_category'])
+    pd.testing.assert_frame_equal(first, second)
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+    assert cache.stats()['bytes_held'] > 0
+
+
+def test_lru_bound_and_version_invalidation():
+    cache = MemoCache(max_entries=2)
+    for i in range(3):
+        cache.put(f"k{i}", pd.DataFrame({'x': np.arange(10) * i}))
+    assert len(cache) == 2 and 'k0' not in cache
+    cache.observe_version('2024-06-01')
+    assert len(cache) == 0 and cache.stats()['bytes_held'] == 0
+
+
+def test_disk_tier_roundtrip(tmp_path):
+    frame = pd.DataFrame({'x': np.arange(5)}, index=pd.Index(list('abcde'), name='key'))
+    MemoCache(disk_dir=tmp_path).put('k', frame)
+    fresh = MemoCache(disk_dir=tmp_path)
+    pd.testing.assert_frame_equal(fresh.get('k'), frame)
+    assert fresh.stats()['disk_hits'] == 1
+    MemoCache(store=CacheManager(tmp_path / 'store')).put('k', frame)
+    pd.testing.assert_frame_equal(MemoCache(store=CacheManager(tmp_path / 'store')).get('k'), frame)
+
+
+def test_memo_key_sees_non_key_columns():
+    analyzer = GrowthAnalyzer(cache=MemoCache())
+    keys = pd.DataFrame({'date': pd.to_datetime(['2024-01-01']), 'state': ['KA'],
+                         'vehicle_category': ['2W'], 'registrations': [100]})
+    strong = analyzer.generate_investment_signals(keys.assign(yoy_growth=30.0, qoq_growth=20.0))
+    weak = analyzer.generate_investment_signals(keys.assign(yoy_growth=-30.0, qoq_growth=-20.0))
+    assert strong['investment_signal'].iloc[0] == 'STRONG_BUY'
+    assert weak['investment_signal'].iloc[0] == 'STRONG_SELL'
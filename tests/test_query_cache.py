@@ -0,0 +1,52 @@
+import json
+import pandas as pd
+
+from src.utils.query_cache import SegmentCache
+
+
+def _loader(calls):
+    def load(start, end, dims):
+        calls.append((start, end, tuple(dims['state'])))
+        dates = pd.date_range(start, end)
+        rows = [{'date': d, 'state': s, 'vehicle_category': c, 'registrations': d.day * 10 + len(s)}
+                for d in dates for s in dims['state'] for c in dims['vehicle_category']]
+        return pd.DataFrame(rows)
+    return load
+
+
+def test_superset_slicing_gap_fill_and_merge(tmp_path):
+    calls = []
+    cache = SegmentCache(tmp_path, 'sample', dims=['vehicle_category', 'state'],
+                         key_cols=['date', 'state', 'vehicle_category'])
+    everything = {'vehicle_category': ['2W', '4W'], 'state': ['KA', 'MH', 'TN']}
+    full = cache.query('2024-01-01', '2024-01-31', everything, _loader(calls))
+    assert len(full) == 31 * 6 and len(calls) == 1
+    narrow = cache.query('2024-01-10', '2024-01-15', {'vehicle_category': ['2W'], 'state': ['MH']}, _loader(calls))
+    assert len(calls) == 1 and len(narrow) == 6
+    expected = full[(full['state'] == 'MH') & (full['vehicle_category'] == '2W')
+                    & full['date'].between('2024-01-10', '2024-01-15')].reset_index(drop=True)
+    pd.testing.assert_frame_equal(narrow, expected)
+    extended = cache.query('2024-01-20', '2024-02-10', everything, _loader(calls))
+    assert calls[-1][:2] == (pd.Timestamp('2024-02-01').date(), pd.Timestamp('2024-02-10').date())
+    assert len(extended) == 22 * 6 and extended['date'].is_monotonic_increasing
+    assert cache.stats()['segments'] == 1 and cache.stats()['merges'] == 1
+    reopened = SegmentCache(tmp_path, 'sample', dims=['vehicle_category', 'state'],
+                            key_cols=['date', 'state', 'vehicle_category'])
+    reopened.query('2024-01-05', '2024-02-05', {'vehicle_category': ['4W'], 'state': ['TN', 'KA']}, _loader(calls))
+    assert len(calls) == 2 and reopened.stats()['hits'] == 1
+    bumped = SegmentCache(tmp_path, 'sample', dims=['vehicle_category', 'state'], version='v2')
+    assert bumped.stats()['segments'] == 0
+
+
+def test_unreadable_segment_is_dropped_from_the_manifest(tmp_path):
+    calls = []
+    cache = SegmentCache(tmp_path, 'sample', dims=['vehicle_category', 'state'])
+    cache.query('2024-01-01', '2024-01-31', {'vehicle_category': ['2W', '4W'], 'state': ['KA', 'MH']}, _loader(calls))
+    cache.query('2024-01-01', '2024-01-31', {'vehicle_category': ['2W'], 'state': ['GJ', 'MH']}, _loader(calls))
+    broken = cache.segments[0]
+    (tmp_path / broken['file']).write_bytes(b'not parquet')
+    narrow = cache.query('2024-01-10', '2024-01-15', {'vehicle_category': ['2W'], 'state': ['MH']}, _loader(calls))
+    assert len(narrow) == 6 and len(calls) == 2  # the other segment still covers the span
+    manifest = json.loads(cache.manifest_path.read_text())
+    assert [s['file'] for s in manifest['segments']] == [cache.segments[0]['file']] != [broken['file']]
+    assert not (tmp_path / broken['file']).exists()
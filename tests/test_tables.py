@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from src.dashboard.tables import PagedTable, TableQuery
+
+
+def test_pages_match_sorted_filtered_frame_and_prefetch_ahead():
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({
+        'manufacturer': rng.choice(['Hero MotoCorp', 'TVS Motor', 'Tata Motors', None], 1000),
+        'state': rng.choice(['Karnataka', 'Maharashtra'], 1000),
+        'registrations': rng.integers(0, 500, 1000),
+    })
+    table = PagedTable(df, prefetch_pages=2)
+    expected = df[df['manufacturer'].str.contains('motor', case=False, na=False)
+                  | df['state'].str.contains('motor', case=False)]
+    expected = expected.sort_values('registrations', ascending=False, kind='stable')
+    query = TableQuery('registrations', False, ' MOTOR ', 0, 40)
+    for number in range(3):
+        page = table.page(TableQuery('registrations', False, 'MOTOR', number, 40))
+        pd.testing.assert_frame_equal(page.rows, expected.iloc[number * 40:(number + 1) * 40])
+    assert (page.matched_rows, page.total_rows, page.first_row) == (len(expected), 1000, 80)
+    assert table.counters == {"hits": 2, "misses": 1, "prefetched": 4}
+    last = table.page(TableQuery('registrations', False, 'motor', 999, 40))
+    assert last.page == page.pages - 1 and len(last.rows) == len(expected) - last.first_row
+    assert len(table.rows(query)) == len(expected)
+
+    summary = df.groupby(['state', 'manufacturer'])['registrations'].sum().to_frame()
+    grouped = PagedTable(summary).page(TableQuery('state', True, 'karnataka', 0, 50))
+    assert list(grouped.rows.columns) == ['state', 'manufacturer', 'registrations']
+    assert set(grouped.rows['state']) == {'Karnataka'}
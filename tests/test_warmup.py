@@ -0,0 +1,39 @@
+import time
+from datetime import date
+
+from src.dashboard.warmup import FilterCombo, UsageTracker, WarmupScheduler
+
+
+def _filters(days, view='Overview', granularity='Daily'):
+    return {'date_range': (date(2024, 6, 30 - days), date(2024, 6, 30)), 'categories': ['4W', '2W'],
+            'states': ['Karnataka'], 'granularity': granularity, 'analysis_type': view}
+
+
+def test_popular_combinations_persist_and_warm_within_budget(tmp_path):
+    path = tmp_path / "usage.json"
+    tracker = UsageTracker(path, flush_seconds=3600)
+    today = date(2024, 7, 1)
+    for filters, uses in ((_filters(28), 3), (_filters(7, 'Growth Trends'), 5), (_filters(14, granularity='Monthly'), 1)):
+        for _ in range(uses):
+            tracker.record(FilterCombo.from_filters(filters, today))
+    tracker.flush()
+    reloaded = UsageTracker(path)
+    top = reloaded.top(5, min_hits=2)
+    assert [c.view for c in top] == ['Growth Trends', 'Overview']
+    assert top[0].categories == ('2W', '4W') and top[0].filters(today)['date_range'] == _filters(7)['date_range']
+
+    warmed = []
+
+    def warm(combo):
+        warmed.append(combo)
+        time.sleep(0.2)
+
+    scheduler = WarmupScheduler(reloaded, top_n=5, budget_seconds=0.1, max_workers=1, min_hits=2)
+    assert scheduler.schedule("v1", warm)
+    assert not scheduler.schedule("v1", warm)  # once per data version
+    run = scheduler.join(5)
+    assert run.reason == "startup" and warmed == top[:1] and run.skipped == 1
+    scheduler.budget_seconds = 10
+    assert scheduler.schedule("v2", warm)
+    run = scheduler.join(5)
+    assert run.reason == "refresh" and len(run.warmed) == 2 and warmed[1:] == top